@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+"""
+Measures the cost of the asymmetric wind field against the symmetric one on the Maria track.
+
+Usage:
+    python benchmarks/bench_asymmetric.py [--grid_resolution 0.01 0.005] [--wind_model holland1980]
+"""
+
+import argparse
+import contextlib
+import io
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grid_resolution', type=float, nargs='+', default=[0.02, 0.01, 0.005])
+    parser.add_argument('--wind_model', type=str, default='jelesnianski')
+    parser.add_argument('--wind_threshold', type=float, default=None)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    print('{:>10} {:>10} {:>14} {:>15} {:>8}'.format('resolution', 'cells', 'symmetric[s]', 'asymmetric[s]',
+                                                      'factor'))
+    for grid_resolution in args.grid_resolution:
+        timings = {}
+        for asymmetric in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings[asymmetric], (swath, _, _) = timeit(generate_swath_data, df, PUERTO_RICO, grid_resolution,
+                                                            wind_model=args.wind_model, asymmetric=asymmetric,
+                                                            wind_threshold=args.wind_threshold, repeat=3)
+        print('{:>10} {:>10d} {:>14.3f} {:>15.3f} {:>7.1f}x'.format(grid_resolution, swath.size, timings[False],
+                                                                   timings[True], timings[True] / timings[False]))
+
+
+if __name__ == '__main__':
+    main()
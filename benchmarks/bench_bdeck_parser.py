@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+Compares the vectorized b-deck conversion of `generate_intermediate_data` with the former row-wise one
+on a synthetic million-row b-deck.
+
+Usage:
+    python benchmarks/bench_bdeck_parser.py [--n_rows 1000000] [--legacy_rows 10000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from common import timeit
+from src.raincoat_takehome_science.data import convert
+from src.raincoat_takehome_science.data.reader_bdeck import load_b_deck_file, generate_intermediate_data
+
+TEMPLATE = ('AL, 15, {time}, , BEST, 0, {lat:>4d}N, {lon:>5d}W, {vmax:>3d}, 994, TS, 34, NEQ, 50, 40, 0, 50, '
+            '1010, 150, 20, 65, 0, L, 0, , 0, 0, MARIA, M, 12, NEQ, 90, 30, 0, 90,\n')
+
+
+def write_synthetic_bdeck(path, n_rows, seed=0):
+    """
+    Writes a synthetic b-deck file of `n_rows` rows with random positions and intensities.
+    """
+    rng = np.random.default_rng(seed)
+    lats = rng.integers(100, 400, n_rows)
+    lons = rng.integers(200, 800, n_rows)
+    vmax = rng.integers(30, 150, n_rows)
+    with open(path, 'w') as f:
+        f.writelines(TEMPLATE.format(time=2017091700 + 6 * (i % 4), lat=lat, lon=lon, vmax=v)
+                     for i, (lat, lon, v) in enumerate(zip(lats, lons, vmax)))
+
+
+def legacy_conversion(df):
+    """
+    Former row-wise coordinate conversion of `generate_intermediate_data`.
+    """
+    latlons = df[['LATN/S', 'LONE/W']].apply(lambda x: convert.convert_latlon_hemi_2_degree(x[0].strip(), x[1].strip()),
+                                             axis=1, raw=True)
+    return latlons.apply(lambda v: convert.latlon_2_xy(v[0], v[1]), axis=1, raw=True)
+
+
+def vectorized_conversion(df):
+    """
+    Vectorized coordinate conversion of `generate_intermediate_data`.
+    """
+    lats, lons = convert.convert_latlon_hemi_2_degree_array(df['LATN/S'], df['LONE/W'])
+    return convert.latlon_2_xy(lats, lons)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n_rows', type=int, default=1_000_000)
+    parser.add_argument('--legacy_rows', type=int, default=10_000,
+                        help='Rows converted with the (slow) row-wise path, extrapolated to n_rows.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bal992099.dat')
+        write_synthetic_bdeck(path, args.n_rows)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_read, df = timeit(load_b_deck_file, path, skip_rows=0)
+            t_pipeline, _ = timeit(generate_intermediate_data, path, tmp)
+        t_vectorized, _ = timeit(vectorized_conversion, df)
+        t_legacy, _ = timeit(legacy_conversion, df.iloc[:args.legacy_rows])
+
+    t_legacy *= args.n_rows / min(args.n_rows, args.legacy_rows)
+    print('rows:                              {:d}'.format(args.n_rows))
+    print('load_b_deck_file:                  {:.2f} s'.format(t_read))
+    print('generate_intermediate_data:        {:.2f} s'.format(t_pipeline))
+    print('coordinate conversion, vectorized: {:.2f} s'.format(t_vectorized))
+    print('coordinate conversion, row-wise:   {:.2f} s (extrapolated from {} rows)'.format(t_legacy, args.legacy_rows))
+    print('speedup:                           {:.0f}x'.format(t_legacy / t_vectorized))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""
+Compares the batched ensemble evaluation with one `generate_swath_data` call per perturbed track.
+
+Both paths evaluate the same members of the Maria track over Puerto Rico; the loop keeps every member swath to
+compute the statistics, the batched path reduces them tile by tile.
+
+Usage:
+    python benchmarks/bench_ensemble.py [--members 100] [--grid_resolution 0.1]
+"""
+
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data, track_fixes
+from src.raincoat_takehome_science.data.ensemble import (DEFAULT_PERCENTILES, DEFAULT_THRESHOLDS,
+                                                         generate_ensemble_data, perturb_track)
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def member_loop(df, area, grid_resolution, n_members, seed):
+    """
+    Ensemble statistics from one swath per member, all kept in memory.
+    """
+    members = perturb_track(track_fixes(df), n_members, seed=seed)
+    swaths = np.array([generate_swath_data(member.drop(columns='MEMBER'), area, grid_resolution)[0]
+                       for _, member in members.groupby('MEMBER')])
+    return {'wind_speed': swaths[0],
+            'exceedance_probability': np.stack([(swaths >= t).mean(axis=0) for t in DEFAULT_THRESHOLDS]),
+            'wind_speed_percentile': np.percentile(swaths, DEFAULT_PERCENTILES, axis=0)}, swaths.nbytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=100)
+    parser.add_argument('--grid_resolution', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_batched, (batched, grid_lat, _) = timeit(generate_ensemble_data, df, PUERTO_RICO, args.grid_resolution,
+                                                   n_members=args.members, seed=args.seed)
+        t_loop, (looped, member_bytes) = timeit(member_loop, df, PUERTO_RICO, args.grid_resolution, args.members,
+                                                args.seed)
+
+    error = max(np.max(np.abs(batched[name] - looped[name])) for name in batched)
+    assert error < 1e-9, 'Batched ensemble differs from the member loop: {}'.format(error)
+    print('{} members, {} fixes each, {} cells'.format(args.members, len(track_fixes(df)), grid_lat.size))
+    print('member loop: {:.3f} s, {:.1f} MB of member swaths'.format(t_loop, member_bytes / 1e6))
+    print('batched:     {:.3f} s ({:.1f}x), max abs difference {:.1e}'.format(t_batched, t_loop / t_batched, error))
+
+
+if __name__ == '__main__':
+    main()
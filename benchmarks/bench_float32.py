@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""
+Measures the float32 precision of the swath engine against float64: speedup and maximum wind error.
+
+The swath of synthetic tracks is computed in both precisions over grids of growing size, for every wind model
+and without pruning, so that every (fix, cell) pair goes through the distance and profile math. The maximum
+absolute difference of the float32 swath from the float64 one is checked against the documented
+`swath_engine.FLOAT32_WIND_TOLERANCE`, also on the asymmetric field of the bundled Maria track.
+
+Usage:
+    python benchmarks/bench_float32.py [--cells 1e4 1e5 1e6] [--n_fixes 60] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+from common import read_interim_track, synthetic_area, synthetic_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.data.swath_engine import FLOAT32_WIND_TOLERANCE
+from src.raincoat_takehome_science.data.wind_models import WIND_MODELS
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+GRID_RESOLUTION = 0.01
+
+
+def compare(df, area, grid_resolution, repeat, **swath_options):
+    """
+    Times the swath in both precisions.
+
+    Returns:
+        - float64_time, float32_time (float): Best wall times, seconds.
+        - error (float): Maximum absolute wind difference, m/s.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        float64_time, (swath64, _, _) = timeit(generate_swath_data, df, area, grid_resolution, repeat=repeat,
+                                               **swath_options)
+        float32_time, (swath32, _, _) = timeit(generate_swath_data, df, area, grid_resolution, repeat=repeat,
+                                               dtype='float32', **swath_options)
+    assert swath64.dtype == np.float64 and swath32.dtype == np.float32
+    return float64_time, float32_time, float(np.max(np.abs(swath32.astype(float) - swath64)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=float, nargs='+', default=[1e4, 1e5, 1e6])
+    parser.add_argument('--n_fixes', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_track(args.n_fixes)
+    cases = [('jelesnianski', n_cells, df, synthetic_area(n_cells, GRID_RESOLUTION), {}) for n_cells in args.cells]
+    cases += [(name, args.cells[-1], df, synthetic_area(args.cells[-1], GRID_RESOLUTION), {'wind_model': name})
+              for name in sorted(WIND_MODELS) if name != 'jelesnianski']
+    cases.append(('maria asymmetric', None, read_interim_track(), PUERTO_RICO, {'asymmetric': True}))
+
+    print('{:<18} {:>10} {:>12} {:>12} {:>8} {:>12}'.format('case', 'cells', 'float64[s]', 'float32[s]', 'speedup',
+                                                          'error[m/s]'))
+    max_error = 0.0
+    for case, n_cells, track, area, swath_options in cases:
+        float64_time, float32_time, error = compare(track, area, GRID_RESOLUTION, args.repeat, **swath_options)
+        max_error = max(max_error, error)
+        cells = '-' if n_cells is None else '{:.0e}'.format(n_cells)
+        print('{:<18} {:>10} {:>12.4f} {:>12.4f} {:>8.2f} {:>12.2e}'.format(case, cells, float64_time, float32_time,
+                                                                           float64_time / float32_time, error))
+
+    assert max_error < FLOAT32_WIND_TOLERANCE, 'float32 error {:.2e} m/s exceeds the documented {:.0e} m/s'.format(
+        max_error, FLOAT32_WIND_TOLERANCE)
+    print('Maximum float32 error {:.2e} m/s, within the documented {:.0e} m/s'.format(max_error,
+                                                                                      FLOAT32_WIND_TOLERANCE))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+"""
+Measures building a grid geometry against loading it memory-mapped from a previous run.
+
+Usage:
+    python benchmarks/bench_grid_geometry.py [--cells 1e5 1e6 1e7] [--dtype float32]
+"""
+
+import argparse
+import os
+import tempfile
+
+from common import synthetic_area, timeit
+from src.raincoat_takehome_science.data.grid_geometry import GridGeometry, geometry_key
+
+GRID_RESOLUTION = 0.01
+
+
+def build_grids(area, dtype):
+    """
+    Builds a geometry and materializes its flattened cell coordinates, as a first run does.
+    """
+    geometry = GridGeometry.build(area, GRID_RESOLUTION, dtype)
+    return geometry, geometry.lat, geometry.lon
+
+
+def load_grids(directory):
+    """
+    Loads a saved geometry and touches its cell coordinates.
+    """
+    geometry = GridGeometry.load(directory)
+    lat, lon = geometry.grids()
+    return geometry, lat[0, 0], lon[-1, -1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=float, nargs='+', default=[1e5, 1e6, 1e7])
+    parser.add_argument('--dtype', type=str, default='float64')
+    args = parser.parse_args()
+
+    print('{:>10} {:>10} {:>10} {:>10} {:>12}'.format('cells', 'build[s]', 'save[s]', 'load[s]', 'size[MB]'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_cells in args.cells:
+            area = synthetic_area(int(n_cells), GRID_RESOLUTION)
+            directory = os.path.join(tmp, geometry_key(area, GRID_RESOLUTION, args.dtype))
+            build_time, (geometry, _, _) = timeit(build_grids, area, args.dtype)
+            save_time, _ = timeit(geometry.save, directory)
+            load_time, _ = timeit(load_grids, directory, repeat=3)
+            size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 1024**2
+            print('{:>10d} {:>10.4f} {:>10.4f} {:>10.4f} {:>12.1f}'.format(geometry.lat.size, build_time, save_time,
+                                                                         load_time, size))
+
+
+if __name__ == '__main__':
+    main()
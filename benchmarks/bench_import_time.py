@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+"""
+Measures the start-up time of the CLI and of the package, and fails if it exceeds a budget.
+
+Every measurement runs in a fresh interpreter. Importing the package and parsing the CLI arguments must not
+load the dependencies of the optional stages (plotting, NetCDF output, geodesic engine, coordinate conversion).
+
+Usage:
+    python benchmarks/bench_import_time.py [--budget 1.0] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Dependencies only the optional stages may import
+LAZY_MODULES = ['matplotlib', 'cartopy', 'netCDF4', 'geopy', 'pyproj', 'geopandas', 'shapely', 'xarray', 'dask', 'zarr',
+                'rasterio']
+
+PACKAGE_MODULES = ['src.raincoat_takehome_science.data.reader_bdeck',
+                   'src.raincoat_takehome_science.data.data_processor',
+                   'src.raincoat_takehome_science.data.save_to_netcdf',
+                   'src.raincoat_takehome_science.plotting.swath_plotter',
+                   'src.raincoat_takehome_science.batch',
+                   'src.raincoat_takehome_science.data.lazy_swath']
+
+# Imports the modules and prints the lazy dependencies that were loaded
+PACKAGE_SCRIPT = """
+import json, sys
+{imports}
+print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({lazy}))))
+"""
+
+# Parses the CLI arguments and prints the lazy dependencies that were loaded
+CLI_SCRIPT = """
+import json, runpy, sys
+sys.argv = ['bdeck_cli.py', '--help']
+try:
+    runpy.run_path('scripts/bdeck_cli.py', run_name='__main__')
+except SystemExit:
+    pass
+print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({lazy}))))
+"""
+
+
+def run_fresh(script, repeat):
+    """
+    Runs a script in `repeat` fresh interpreters and returns the best wall time and the last line of its output.
+    """
+    best, output = float('inf'), ''
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+        best = min(best, time.perf_counter() - start)
+        output = result.stdout.strip().splitlines()[-1]
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget', type=float, default=1.0, help='Largest start-up time, seconds.')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    interpreter, _ = run_fresh('print("[]")', args.repeat)
+    package, package_loaded = run_fresh(PACKAGE_SCRIPT.format(
+        imports='\n'.join('import ' + m for m in PACKAGE_MODULES), lazy=LAZY_MODULES), args.repeat)
+    cli, cli_loaded = run_fresh(CLI_SCRIPT.format(lazy=LAZY_MODULES), args.repeat)
+
+    print('{:>24} {:>10} {:>30}'.format('target', 'time[s]', 'lazy modules loaded'))
+    print('{:>24} {:>10.3f} {:>30}'.format('interpreter', interpreter, '-'))
+    print('{:>24} {:>10.3f} {:>30}'.format('package import', package, ', '.join(json.loads(package_loaded)) or '-'))
+    print('{:>24} {:>10.3f} {:>30}'.format('bdeck_cli.py --help', cli, ', '.join(json.loads(cli_loaded)) or '-'))
+
+    failures = []
+    if package > args.budget or cli > args.budget:
+        failures.append('start-up exceeds the budget of {:.3f} s'.format(args.budget))
+    if json.loads(package_loaded) or json.loads(cli_loaded):
+        failures.append('optional dependencies are imported at start-up')
+    for failure in failures:
+        print('FAILED: {}'.format(failure))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
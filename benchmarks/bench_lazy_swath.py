@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""
+Compares the peak memory and time of the lazy xarray/dask backend with the eager engine writing the NetCDF output.
+
+Each run happens in a fresh interpreter, which reports its own peak resident memory. The eager path builds the
+swath in memory and writes it with `generate_nc`; the lazy path streams the chunks of its task graph into the
+file, so its peak memory stays flat as the grid grows.
+
+Usage:
+    python benchmarks/bench_lazy_swath.py [--cells 1e6 4e6 1.6e7] [--chunks 1024] [--scheduler threads]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import netCDF4 as nc
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Runs one backend on a synthetic track and grid and prints its time and peak memory
+RUN_SCRIPT = """
+import contextlib, io, json, resource, sys, time
+sys.path.insert(0, 'benchmarks')
+from common import synthetic_area, synthetic_track
+df, area = synthetic_track({n_fixes}), synthetic_area({n_cells}, {grid_resolution})
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if '{backend}' == 'lazy':
+        from src.raincoat_takehome_science.data.lazy_swath import generate_lazy_swath_data
+        generate_lazy_swath_data(df, area, {grid_resolution}, ['{to_file}'], chunks={chunks}, scheduler='{scheduler}',
+                                 wind_threshold={wind_threshold})
+    else:
+        from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+        from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
+        swath, grid_lat, grid_lon = generate_swath_data(df, area, {grid_resolution}, wind_threshold={wind_threshold})
+        generate_nc(swath, grid_lon, grid_lat, df['YYYYMMDDHH'].values, '{to_file}')
+print(json.dumps([time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024]))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cells', type=float, nargs='+', default=[1e6, 4e6, 1.6e7])
+    parser.add_argument('--n_fixes', type=int, default=60)
+    parser.add_argument('--grid_resolution', type=float, default=0.01)
+    parser.add_argument('--wind_threshold', type=float, default=17.49)
+    parser.add_argument('--chunks', type=int, default=1024)
+    parser.add_argument('--scheduler', choices=['threads', 'processes', 'synchronous'], default='threads')
+    args = parser.parse_args()
+
+    print('{:>10} {:>10} {:>10} {:>12} {:>12}'.format('cells', 'eager[s]', 'lazy[s]', 'eager[MB]', 'lazy[MB]'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_cells in args.cells:
+            results = {}
+            for backend in ['eager', 'lazy']:
+                script = RUN_SCRIPT.format(backend=backend, n_fixes=args.n_fixes, n_cells=n_cells,
+                                           grid_resolution=args.grid_resolution, chunks=args.chunks,
+                                           scheduler=args.scheduler, wind_threshold=args.wind_threshold,
+                                           to_file=os.path.join(tmp, backend + '.nc'))
+                output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True,
+                                        check=True).stdout
+                results[backend] = json.loads(output.strip().splitlines()[-1])
+            with nc.Dataset(os.path.join(tmp, 'eager.nc')) as eager, nc.Dataset(os.path.join(tmp, 'lazy.nc')) as lazy:
+                assert np.allclose(eager['wind_speed'][:], lazy['wind_speed'][:], atol=1e-4)
+            print('{:>10.0e} {:>10.2f} {:>10.2f} {:>12.0f} {:>12.0f}'.format(n_cells, results['eager'][0],
+                                                                            results['lazy'][0], results['eager'][1],
+                                                                            results['lazy'][1]))
+
+
+if __name__ == '__main__':
+    main()
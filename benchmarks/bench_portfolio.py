@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+"""
+Measures the portfolio exposure of the Maria track at random point locations.
+
+Usage:
+    python benchmarks/bench_portfolio.py [--points 1000000] [--time_step 1h]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.portfolio import generate_portfolio_exposure
+
+# Caribbean box holding the Maria track
+AREA = {'lat_max': 25.0, 'lat_min': 10.0, 'lon_max': -55.0, 'lon_min': -75.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--time_step', type=str, default=None)
+    parser.add_argument('--chunk_size', type=int, default=250_000)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    rng = np.random.default_rng(0)
+    print('{:>10} {:>10} {:>16}'.format('points', 'time[s]', 'points/s'))
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_points in args.points:
+            locations = os.path.join(tmp, 'locations.parquet')
+            pd.DataFrame({'lat': rng.uniform(AREA['lat_min'], AREA['lat_max'], n_points),
+                          'lon': rng.uniform(AREA['lon_min'], AREA['lon_max'], n_points)}).to_parquet(locations)
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed, _ = timeit(generate_portfolio_exposure, df, locations, os.path.join(tmp, 'exposure.parquet'),
+                                    time_step=args.time_step, chunk_size=args.chunk_size)
+            print('{:>10d} {:>10.3f} {:>16.0f}'.format(n_points, elapsed, n_points / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""
+Measures rendering swath maps as indexed-colour PNGs against matplotlib figures on the Maria track.
+
+The figure baseline is a 50-level `contourf`, as formerly drawn by `plot_swath_wind_speed`, against the 50-band
+`imshow` it draws now, both saved with matplotlib without the cartopy map features, which need the Natural Earth
+data to be downloaded.
+
+Usage:
+    python benchmarks/bench_rendering.py [--maps 100] [--grid_resolution 0.01]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.plotting.raster_renderer import render_swath_png, render_swath_tiles
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def render_figures(swath, grid_lon, grid_lat, directory, n_maps, track):
+    """
+    Saves `n_maps` contourf figures of the swath.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    for i in range(n_maps):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        cf = ax.contourf(grid_lon, grid_lat, swath, cmap=plt.get_cmap('jet'),
+                         levels=np.linspace(0, np.around(np.max(swath)), 50), extend='max')
+        plt.colorbar(cf, ax=ax)
+        ax.scatter(track[1], track[0], s=25, c='r')
+        fig.savefig(os.path.join(directory, 'figure_{}.png'.format(i)))
+        plt.close(fig)
+
+
+def render_image_figures(swath, grid_lon, grid_lat, directory, n_maps, track):
+    """
+    Saves `n_maps` figures of the swath drawn as one image of 50 colour bands, like `plot_swath_wind_speed`.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import BoundaryNorm
+
+    cmap = plt.get_cmap('jet')
+    norm = BoundaryNorm(np.linspace(0, np.around(np.max(swath)), 50), cmap.N, extend='max')
+    extent = (grid_lon[0, 0], grid_lon[-1, 0], grid_lat[0, 0], grid_lat[0, -1])
+    for i in range(n_maps):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        im = ax.imshow(np.asarray(swath).T, origin='lower', extent=extent, cmap=cmap, norm=norm,
+                       interpolation='bilinear', interpolation_stage='data', aspect='auto')
+        plt.colorbar(im, ax=ax)
+        ax.scatter(track[1], track[0], s=25, c='r')
+        fig.savefig(os.path.join(directory, 'image_{}.png'.format(i)))
+        plt.close(fig)
+
+
+def render_rasters(swath, grid_lon, grid_lat, directory, n_maps, track):
+    """
+    Saves `n_maps` indexed-colour PNGs of the swath.
+    """
+    for i in range(n_maps):
+        render_swath_png(swath, grid_lat[0, :], grid_lon[:, 0], os.path.join(directory, 'raster_{}.png'.format(i)),
+                         pixels_per_cell=2, track=track)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--maps', type=int, default=100)
+    parser.add_argument('--grid_resolution', type=float, default=0.01)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    track = (df['LATN/S'].values, df['LONE/W'].values)
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath, grid_lat, grid_lon = generate_swath_data(df, PUERTO_RICO, args.grid_resolution)
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        figure_time, _ = timeit(render_figures, swath, grid_lon, grid_lat, tmp, args.maps, track)
+        image_time, _ = timeit(render_image_figures, swath, grid_lon, grid_lat, tmp, args.maps, track)
+        raster_time, _ = timeit(render_rasters, swath, grid_lon, grid_lat, tmp, args.maps, track)
+        tiles_time, n_tiles = timeit(render_swath_tiles, swath, grid_lat[0, :], grid_lon[:, 0],
+                                     os.path.join(tmp, 'tiles'), range(5, 11))
+
+    print('{} maps of {} cells'.format(args.maps, swath.size))
+    print('{:>16} {:>10} {:>12}'.format('renderer', 'total[s]', 'per map[ms]'))
+    print('{:>16} {:>10.3f} {:>12.2f}'.format('contourf figure', figure_time, 1e3 * figure_time / args.maps))
+    print('{:>16} {:>10.3f} {:>12.2f}'.format('imshow figure', image_time, 1e3 * image_time / args.maps))
+    print('{:>16} {:>10.3f} {:>12.2f}'.format('indexed png', raster_time, 1e3 * raster_time / args.maps))
+    print('{:>16} {:>10.3f} {:>12}'.format('xyz tiles', tiles_time, '{} tiles'.format(n_tiles)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+
+"""
+Benchmark suite of the pipeline stages with a regression check against a stored baseline.
+
+Each stage is timed on its own: `load_b_deck_file` and `generate_intermediate_data` on synthetic b-decks of
+10 to 10k fixes, `generate_swath_data` on synthetic tracks and grids of 1e3 to 1e7 cells (a sweep over the grid
+size and one over the number of fixes) and `generate_nc` on the resulting swaths, plus every stage on the
+bundled Maria track over Puerto Rico. Everything runs offline.
+
+Results are written as JSON (best wall time of `--repeat` runs per case) and compared with the baseline:
+a case regresses when it is slower than its baseline time by more than `--threshold` (relative) and
+`--min_seconds` (absolute, to ignore timer noise on tiny cases). Any regression makes the suite exit with 1.
+Baselines are machine specific, refresh them with `--save_baseline` on the reference machine.
+
+Usage:
+    python benchmarks/bench_suite.py [--scale quick|full] [--stages swath nc] [--output results.json]
+                                     [--baseline benchmarks/baseline.json] [--threshold 0.25] [--save_baseline]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from common import synthetic_area, synthetic_track, timeit
+from bench_bdeck_parser import write_synthetic_bdeck
+from src.raincoat_takehome_science.data.reader_bdeck import load_b_deck_file, generate_intermediate_data
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+STAGES = ['load', 'convert', 'swath', 'nc']
+
+# Fix counts and grid sizes of each scale
+SCALES = {'quick': {'fixes': [10, 100, 1000], 'cells': [1e3, 1e4, 1e5]},
+          'full': {'fixes': [10, 100, 1000, 10000], 'cells': [1e3, 1e4, 1e5, 1e6, 1e7]}}
+
+# Fixed dimension of the swath sweeps: fixes of the grid size sweep, cells of the fix count sweep
+SWATH_FIXES = 100
+SWATH_CELLS = 1e4
+GRID_RESOLUTION = 0.01
+
+
+def run_cases(stages, scale, repeat, tmp):
+    """
+    Times every case of the selected stages.
+
+    Returns:
+        - dict: Results keyed by `stage/case`, with the stage, the fixes and cells of the case and its time.
+    """
+    results = {}
+
+    def record(stage, case, fixes, cells, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, result = timeit(func, *args, repeat=repeat, **kwargs)
+        key = '{}/{}'.format(stage, case)
+        results[key] = {'stage': func.__name__, 'fixes': fixes, 'cells': cells, 'seconds': seconds}
+        print('{:<44} {:>10.4f} s'.format(key, seconds), flush=True)
+        return result
+
+    # B-deck parsing and conversion
+    bdeck_files = [('maria', EXTERNAL_FILE, 2)]
+    for n_fixes in SCALES[scale]['fixes']:
+        path = os.path.join(tmp, 'bal{:06d}.dat'.format(n_fixes))
+        write_synthetic_bdeck(path, n_fixes)
+        bdeck_files.append(('fixes={}'.format(n_fixes), path, 0))
+    for case, path, skip_rows in bdeck_files:
+        with open(path) as f:
+            n_fixes = sum(1 for _ in f) - skip_rows
+        if 'load' in stages:
+            record('load', case, n_fixes, None, load_b_deck_file, path, skip_rows=skip_rows)
+        if 'convert' in stages:
+            record('convert', case, n_fixes, None, generate_intermediate_data, path, tmp)
+
+    if not {'swath', 'nc'} & set(stages):
+        return results
+
+    # Swath generation and NetCDF output
+    with contextlib.redirect_stdout(io.StringIO()):
+        maria = generate_intermediate_data(EXTERNAL_FILE, tmp)
+    swath_cases = [('maria', maria, PUERTO_RICO, True)]
+    swath_cases += [('cells={:.0e}'.format(n_cells), synthetic_track(SWATH_FIXES),
+                     synthetic_area(n_cells, GRID_RESOLUTION), True) for n_cells in SCALES[scale]['cells']]
+    swath_cases += [('fixes={}'.format(n_fixes), synthetic_track(n_fixes),
+                     synthetic_area(SWATH_CELLS, GRID_RESOLUTION), False) for n_fixes in SCALES[scale]['fixes']]
+    for case, df, area, write_nc in swath_cases:
+        if 'swath' in stages:
+            swath, grid_lat, grid_lon = record('swath', case, len(df), None, generate_swath_data, df, area,
+                                               GRID_RESOLUTION)
+            results['swath/' + case]['cells'] = int(swath.size)
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                swath, grid_lat, grid_lon = generate_swath_data(df, area, GRID_RESOLUTION)
+        if 'nc' in stages and write_nc:
+            record('nc', case, len(df), int(swath.size), generate_nc, swath, grid_lon, grid_lat,
+                   df['YYYYMMDDHH'].values, os.path.join(tmp, 'swath.nc'))
+    return results
+
+
+def environment():
+    """
+    Describes the machine the suite ran on, stored next to the results.
+    """
+    return {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpu_count': os.cpu_count()}
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """
+    Compares the results with the baseline.
+
+    Returns:
+        - list: Keys of the regressed cases.
+    """
+    regressions = []
+    print('\n{:<44} {:>10} {:>10} {:>8}'.format('case', 'base[s]', 'now[s]', 'ratio'))
+    for key, result in results.items():
+        if key not in baseline:
+            print('{:<44} {:>10} {:>10.4f} {:>8}'.format(key, '-', result['seconds'], 'new'))
+            continue
+        base, now = baseline[key]['seconds'], result['seconds']
+        regressed = now > base * (1 + threshold) and now - base > min_seconds
+        if regressed:
+            regressions.append(key)
+        print('{:<44} {:>10.4f} {:>10.4f} {:>8.2f}{}'.format(key, base, now, now / base,
+                                                             '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='quick')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON file the results are written to.')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Relative slowdown beyond which a case regresses, 0.25 by default.')
+    parser.add_argument('--min_seconds', type=float, default=0.005,
+                        help='Absolute slowdown below which a case never regresses, seconds.')
+    parser.add_argument('--save_baseline', action='store_true', help='Replace the baseline with the results.')
+    args = parser.parse_args()
+
+    # The Maria b-deck has more fields than the parsed columns
+    warnings.filterwarnings('ignore', category=pd.errors.ParserWarning)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_cases(args.stages, args.scale, args.repeat, tmp)
+    report = {'environment': environment(), 'scale': args.scale, 'repeat': args.repeat, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('Results saved to {}'.format(args.output))
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('Baseline saved to {}'.format(args.baseline))
+        return
+
+    if not os.path.isfile(args.baseline):
+        print('No baseline in {}, run with --save_baseline to create it'.format(args.baseline))
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['environment']['machine'] != report['environment']['machine'] or \
+            baseline['environment']['cpu_count'] != report['environment']['cpu_count']:
+        print('Warning: the baseline was measured on another machine ({platform}, {cpu_count} CPUs)'.format(
+            **baseline['environment']))
+
+    regressions = compare(results, baseline['results'], args.threshold, args.min_seconds)
+    if regressions:
+        print('\n{} of {} cases regressed by more than {:.0%}: {}'.format(len(regressions), len(results),
+                                                                            args.threshold, ', '.join(regressions)))
+        sys.exit(1)
+    print('\nNo regression beyond {:.0%}'.format(args.threshold))
+
+
+if __name__ == '__main__':
+    main()
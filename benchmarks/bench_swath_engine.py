@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""
+Compares the vectorized swath engine with the per-point geodesic reference at several grid sizes.
+
+Usage:
+    python benchmarks/bench_swath_engine.py [--max_geodesic_cells 5000]
+"""
+
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+from common import synthetic_track, synthetic_area, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.data.swath_engine import SWATH_RELATIVE_TOLERANCE
+
+GRID_CELLS = [1e3, 1e4, 1e5, 1e6]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n_fixes', type=int, default=60)
+    parser.add_argument('--grid_resolution', type=float, default=0.01)
+    parser.add_argument('--max_geodesic_cells', type=float, default=5e3,
+                        help='Largest grid evaluated with the (slow) geodesic reference.')
+    args = parser.parse_args()
+
+    df = synthetic_track(args.n_fixes)
+    print('{:>10} {:>14} {:>14} {:>10} {:>12}'.format('cells', 'vectorized[s]', 'geodesic[s]', 'speedup', 'max rel err'))
+    for n_cells in GRID_CELLS:
+        area = synthetic_area(n_cells, args.grid_resolution)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t_vec, (swath_vec, grid_lat, _) = timeit(generate_swath_data, df, area, args.grid_resolution, repeat=3)
+            if n_cells <= args.max_geodesic_cells:
+                t_geo, (swath_geo, _, _) = timeit(generate_swath_data, df, area, args.grid_resolution,
+                                                  engine='geodesic')
+            else:
+                t_geo, swath_geo = float('nan'), None
+
+        if swath_geo is not None:
+            rel_err = np.max(np.abs(swath_vec - swath_geo) / np.maximum(swath_geo, 1e-9))
+            assert rel_err < SWATH_RELATIVE_TOLERANCE, 'Vectorized swath out of tolerance: {}'.format(rel_err)
+        else:
+            rel_err = float('nan')
+        print('{:>10d} {:>14.4f} {:>14.4f} {:>10.1f} {:>12.2e}'.format(grid_lat.size, t_vec, t_geo, t_geo / t_vec, rel_err))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+"""
+Measures the scaling of the parallel swath engine from 1 to N worker processes.
+
+Usage:
+    python benchmarks/bench_swath_parallel.py [--max_workers 8] [--n_cells 4e6]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+
+import numpy as np
+
+from common import synthetic_track, synthetic_area, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--n_fixes', type=int, default=60)
+    parser.add_argument('--n_cells', type=float, default=4e6)
+    parser.add_argument('--grid_resolution', type=float, default=0.01)
+    parser.add_argument('--max_workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    df = synthetic_track(args.n_fixes)
+    area = synthetic_area(args.n_cells, args.grid_resolution)
+
+    workers = sorted({1, *[2 ** i for i in range(1, args.max_workers.bit_length())], args.max_workers})
+    print('{:>8} {:>10} {:>10} {:>12}'.format('workers', 'time[s]', 'speedup', 'identical'))
+    reference, t_serial = None, None
+    for n in workers:
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, (swath, _, _) = timeit(generate_swath_data, df, area, args.grid_resolution, workers=n)
+        if reference is None:
+            reference, t_serial = swath, elapsed
+        identical = np.array_equal(swath, reference)
+        assert identical, 'Parallel swath with {} workers differs from the serial one'.format(n)
+        print('{:>8d} {:>10.3f} {:>10.2f} {:>12}'.format(n, elapsed, t_serial / elapsed, str(identical)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+"""
+Measures the track prefilter and the swath time it saves on the Maria track over Puerto Rico.
+
+The swath is computed without pruning, as with the default configuration, and checked to be unchanged
+wherever it reaches 34 knots.
+
+Usage:
+    python benchmarks/bench_track_filter.py [--grid_resolution 0.01 0.005] [--buffer 50000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+
+import numpy as np
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import RAD34, filter_track_near_area, generate_swath_data
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grid_resolution', type=float, nargs='+', default=[0.02, 0.01, 0.005])
+    parser.add_argument('--buffer', type=float, default=0.0)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    with contextlib.redirect_stdout(io.StringIO()):
+        filter_time, filtered = timeit(filter_track_near_area, df, PUERTO_RICO, RAD34, args.buffer, repeat=5)
+    print('Filter: {:.4f} s, {} of {} fixes kept'.format(filter_time, filtered['YYYYMMDDHH'].nunique(),
+                                                        df['YYYYMMDDHH'].nunique()))
+
+    print('{:>10} {:>10} {:>10} {:>12} {:>8}'.format('resolution', 'cells', 'full[s]', 'filtered[s]', 'factor'))
+    identical = True
+    for grid_resolution in args.grid_resolution:
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_time, (full, _, _) = timeit(generate_swath_data, df, PUERTO_RICO, grid_resolution,
+                                             repeat=3)
+            filtered_time, (swath, _, _) = timeit(generate_swath_data, filtered, PUERTO_RICO, grid_resolution,
+                                                  repeat=3)
+        identical &= np.array_equal(full, swath)
+        print('{:>10} {:>10d} {:>10.4f} {:>12.4f} {:>8.2f}'.format(grid_resolution, full.size, full_time,
+                                                                   filtered_time, full_time / filtered_time))
+
+    print('Swaths identical above 34 knots: {}'.format(identical))
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+"""
+Measures swath generation on the Maria track interpolated to sub-hourly time steps.
+
+Usage:
+    python benchmarks/bench_track_interpolation.py [--grid_resolution 0.01] [--wind_threshold 15]
+"""
+
+import argparse
+import contextlib
+import io
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data, interpolate_track
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+TIME_STEPS = [None, '1h', '15min', '5min']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grid_resolution', type=float, default=0.01)
+    parser.add_argument('--wind_threshold', type=float, default=None)
+    args = parser.parse_args()
+
+    df = read_interim_track()
+    print('{:>10} {:>8} {:>10} {:>14}'.format('time step', 'fixes', 'time[s]', 'per fix[ms]'))
+    for time_step in TIME_STEPS:
+        n_fixes = len(df) if time_step is None else len(interpolate_track(df, time_step))
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed, _ = timeit(generate_swath_data, df, PUERTO_RICO, args.grid_resolution, time_step=time_step,
+                                wind_threshold=args.wind_threshold, repeat=3)
+        print('{:>10} {:>8d} {:>10.3f} {:>14.3f}'.format(time_step or '6h (raw)', n_fixes, elapsed,
+                                                        1e3 * elapsed / n_fixes))
+
+
+if __name__ == '__main__':
+    main()
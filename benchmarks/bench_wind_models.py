@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""
+Measures the array wind models against their scalar references and checks that both agree.
+
+Usage:
+    python benchmarks/bench_wind_models.py [--points 1000000] [--model holland1980]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from common import timeit
+from src.raincoat_takehome_science.data.wind_models import WIND_MODELS
+
+# Largest relative difference accepted between the array model and its scalar reference
+RELATIVE_TOLERANCE = 1e-12
+
+# Wind threshold the influence radius is checked at, m/s
+WIND_THRESHOLD = 17.5
+
+
+def check_model(name, model, rmax, vmax, r):
+    """
+    Returns the largest relative difference to the scalar reference and whether the wind beyond
+    the influence radius stays below `WIND_THRESHOLD`.
+    """
+    expected = np.vectorize(model.reference)(r, rmax, vmax)
+    actual = model.profile(r, rmax, vmax)
+    error = np.max(np.abs(actual - expected) / np.maximum(np.abs(expected), 1e-12))
+
+    radius = model.influence_radius(np.array([rmax]), np.array([vmax]), WIND_THRESHOLD)
+    beyond = radius[0] * np.linspace(1.0, 20.0, 1000)
+    return error, bool(np.all(model.profile(beyond, rmax, vmax) <= WIND_THRESHOLD))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--model', type=str, nargs='+', default=sorted(WIND_MODELS))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rmax, vmax = 3.0e4, 60.0
+    r = np.concatenate([[0.0, rmax], rng.uniform(0.0, 1.0e6, args.points)])
+    # The scalar references are slow, they are timed on a sample
+    sample = r[:min(len(r), 100_000)]
+
+    failed = False
+    print('{:>12} {:>12} {:>14} {:>10} {:>12} {:>8}'.format('model', 'array[s]', 'scalar[s/1M]', 'speedup',
+                                                             'max rel err', 'radius'))
+    for name in args.model:
+        model = WIND_MODELS[name]
+        array_time, _ = timeit(model.profile, r, rmax, vmax, repeat=3)
+        scalar_time, _ = timeit(np.vectorize(model.reference), sample, rmax, vmax)
+        scalar_time *= len(r) / len(sample)
+        error, radius_ok = check_model(name, model, rmax, vmax, sample)
+        ok = error <= RELATIVE_TOLERANCE and radius_ok
+        failed |= not ok
+        print('{:>12} {:>12.4f} {:>14.3f} {:>9.0f}x {:>12.2e} {:>8}'.format(name, array_time, scalar_time,
+                                                                          scalar_time / array_time, error,
+                                                                          'ok' if radius_ok else 'FAIL'))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""
+Measures windowed reads of the cloud-optimized GeoTIFF and Zarr exports against reading the whole swath.
+
+The swath of the Maria track is exported tile by tile from the engine to both layouts. A small window (a city
+sized box) is then read from each, along with the whole raster and, for the GeoTIFF, a coarse overview. The
+number of blocks (chunks) intersecting the window is what a remote reader fetches instead of the whole file.
+
+Usage:
+    python benchmarks/bench_windowed_read.py [--grid_resolution 0.002] [--window 64] [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from common import read_interim_track, timeit
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def blocks_in_window(row, col, size, block_size):
+    """
+    Number of blocks of edge `block_size` intersecting a square window.
+    """
+    return ((row + size - 1) // block_size - row // block_size + 1) * \
+        ((col + size - 1) // block_size - col // block_size + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--grid_resolution', type=float, default=0.002)
+    parser.add_argument('--window', type=int, default=64, help='Edge of the window read, cells.')
+    parser.add_argument('--block_size', type=int, default=256)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.windows import Window
+    import zarr
+
+    df = read_interim_track()
+    with tempfile.TemporaryDirectory() as tmp:
+        tif, store = os.path.join(tmp, 'swath.tif'), os.path.join(tmp, 'swath.zarr')
+        export_options = {'block_size': args.block_size}
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain_time, (swath, _, _) = timeit(generate_swath_data, df, PUERTO_RICO, args.grid_resolution)
+            export_time, _ = timeit(generate_swath_data, df, PUERTO_RICO, args.grid_resolution,
+                                    export_files=[tif, store], export_options=export_options)
+
+        n_lat, n_lon = swath.shape[1], swath.shape[0]
+        row, col = n_lat // 2, n_lon // 2
+        size = min(args.window, n_lat - row, n_lon - col)
+        window = Window(col, row, size, size)
+
+        with rasterio.open(tif) as dataset:
+            overviews = dataset.overviews(1)
+            full_tif, full = timeit(dataset.read, 1, repeat=args.repeat)
+            window_tif, windowed = timeit(dataset.read, 1, window=window, repeat=args.repeat)
+            factor = overviews[-1] if overviews else 1
+            overview_tif, _ = timeit(dataset.read, 1, out_shape=(n_lat // factor, n_lon // factor),
+                                     resampling=Resampling.nearest, repeat=args.repeat)
+        wind_speed = zarr.open_group(store, mode='r')['wind_speed']
+        full_zarr, full_z = timeit(lambda: wind_speed[:], repeat=args.repeat)
+        window_zarr, windowed_z = timeit(lambda: wind_speed[n_lat - row - size:n_lat - row, col:col + size],
+                                         repeat=args.repeat)
+        tif_size = os.path.getsize(tif)
+        zarr_size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(store) for f in files)
+
+    # The GeoTIFF is north up, the Zarr store south up like the swath
+    expected = swath.T[::-1]
+    assert np.allclose(full, expected, atol=1e-4) and np.allclose(full_z[::-1], expected, atol=1e-4)
+    assert np.array_equal(windowed, full[row:row + size, col:col + size])
+    assert np.array_equal(windowed_z[::-1], windowed)
+
+    n_blocks = -(-n_lat // args.block_size) * -(-n_lon // args.block_size)
+    print('{} x {} cells, {}-cell blocks, {}-cell window, overviews {}'.format(n_lat, n_lon, args.block_size, size,
+                                                                               overviews))
+    print('swath {:.3f} s, with both exports {:.3f} s; GeoTIFF {:.1f} kB, Zarr {:.1f} kB'.format(
+        plain_time, export_time, tif_size / 1e3, zarr_size / 1e3))
+    print('{:>18} {:>10} {:>10} {:>8}'.format('read', 'cog[ms]', 'zarr[ms]', 'blocks'))
+    print('{:>18} {:>10.2f} {:>10.2f} {:>8}'.format('whole swath', 1e3 * full_tif, 1e3 * full_zarr, n_blocks))
+    print('{:>18} {:>10.2f} {:>10.2f} {:>8}'.format('window', 1e3 * window_tif, 1e3 * window_zarr,
+                                                    blocks_in_window(row, col, size, args.block_size)))
+    print('{:>18} {:>10.2f} {:>10} {:>8}'.format('overview 1/{}'.format(factor), 1e3 * overview_tif, '-', '-'))
+
+
+if __name__ == '__main__':
+    main()
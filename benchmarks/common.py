@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+INTERIM_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim')
+
+
+def read_interim_track():
+    """
+    Returns the converted track of Maria (2017), as read back from the interim file by the pipeline. The interim
+    file is a product of `generate_intermediate_data`, regenerated from the b-deck file.
+    """
+    import contextlib
+    import io
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_intermediate_data(EXTERNAL_FILE, INTERIM_PATH)
+    return pd.read_csv(os.path.join(INTERIM_PATH, 'bal152017.dat'))
+
+
+def synthetic_track(n_fixes, seed=0):
+    """
+    Generates a synthetic converted track, as returned by `generate_intermediate_data`.
+
+    The storm moves north-west across the Caribbean with a 6-hourly time step.
+
+    Parameters:
+      - n_fixes (int): Number of track fixes.
+      - seed (int): Random seed.
+
+    Returns:
+      - DataFrame: Track with YYYYMMDDHH, LATN/S, LONE/W, VMAX [m/s] and RMW [m] columns.
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.arange(n_fixes)
+    return pd.DataFrame({'YYYYMMDDHH': pd.Timestamp('2017-09-16') + pd.to_timedelta(6 * steps, unit='h'),
+                         'LATN/S': 12.0 + 10.0 * steps / max(1, n_fixes - 1) + rng.normal(0, 0.05, n_fixes),
+                         'LONE/W': -50.0 - 25.0 * steps / max(1, n_fixes - 1) + rng.normal(0, 0.05, n_fixes),
+                         'VMAX': rng.uniform(20.0, 75.0, n_fixes),
+                         'RMW': rng.uniform(1.5e4, 6.0e4, n_fixes),
+                         })
+
+
+def synthetic_area(n_cells, grid_resolution, center=(18.0, -66.5)):
+    """
+    Returns a square area holding about `n_cells` grid cells at `grid_resolution` degrees.
+    """
+    half = 0.5 * np.sqrt(n_cells) * grid_resolution
+    return {'lat_min': center[0] - half, 'lat_max': center[0] + half,
+            'lon_min': center[1] - half, 'lon_max': center[1] + half}
+
+
+def timeit(func, *args, repeat=1, **kwargs):
+    """
+    Returns the best wall time of `repeat` calls and the result of the last call.
+    """
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
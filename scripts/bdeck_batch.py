@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import click
+from config import config
+
+@click.command()
+@click.option('--manifest', type=click.Path(exists=True), required=True, help='CSV or YAML manifest of jobs with storm_file, lat_min, lat_max, lon_min, lon_max and grid_resolution columns.')
+@click.option('--config_file', type=click.Path(exists=True),  default='config/config.yaml', help='Path to the YAML configuration file.')
+@click.option('--output_dir', type=click.Path(), default='output/batch/', help='Directory of the per-job outputs and of the batch report.')
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Number of processes, all CPUs by default.')
+@click.option('--plot/--no-plot', default=False, help='Plot the swath of each job.')
+def run(manifest, config_file, output_dir, workers, plot):
+    """
+    Process a batch of storms on a pool of worker processes.
+
+    Parameters:
+    - manifest (str): Path to the manifest of (storm file, area, resolution) jobs.
+    - config_file (str): Path to the YAML configuration file.
+    - output_dir (str): Directory of the outputs and of the report.
+    - workers (int): Number of processes.
+    - plot (bool): Plot the swath of each job.
+    """
+    # Imported once the arguments are parsed, so that `--help` stays fast
+    from src.raincoat_takehome_science.batch import read_manifest, run_batch
+
+    try:
+        # Read configuration parameters
+        params = config.read_config(config_file)
+
+        report = run_batch(read_manifest(manifest), params, output_dir, workers, plot)
+        for _, failed in report[report['status'] != 'ok'].iterrows():
+            click.echo("Job {} failed: {}".format(failed['job_id'], failed['error']))
+
+        click.echo("Batch complete. Report saved to: {}".format(os.path.join(output_dir, 'batch_report.csv')))
+    except Exception as e:
+        click.echo(f"Error processing batch: {str(e)}")
+
+if __name__=='__main__':
+    run()
@@ -2,73 +2,184 @@
 
 import sys
 import os
+import time
 
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
-from src.raincoat_takehome_science.data.data_processor import generate_swath_data
-from src.raincoat_takehome_science.plotting.swath_plotter import plot_swath_wind_speed
-from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
-
-
 import click
 from config import config
 
 @click.command()
 @click.option('--input_file', type=click.Path(exists=True), default='data/external/bal152017.dat', help='Path to the input file.')
 @click.option('--config_file', type=click.Path(exists=True),  default='config/config.yaml', help='Path to the YAML configuration file.')
-def run(input_file, config_file):
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Number of processes for swath generation. Overrides `swath.workers` of the configuration.')
+@click.option('--state_file', type=click.Path(), default=None, help='Path to the .npz swath state of an active storm. Only fixes appended since the previous run are evaluated.')
+@click.option('--netcdf/--no-netcdf', default=None, help='Write the NetCDF output. Overrides `netcdf.enabled` of the configuration.')
+@click.option('--plot/--no-plot', default=None, help='Plot the swath. Overrides `plotting.enabled` of the configuration.')
+@click.option('--export', 'export_files', type=click.Path(), multiple=True, help='Cloud-optimized GeoTIFF (.tif) or Zarr (.zarr) output, repeatable. Overrides `export.files` of the configuration.')
+@click.option('--lazy/--no-lazy', default=None, help='Compute the swath as a chunked dask graph streamed into the NetCDF, .zarr and .tif outputs. Overrides `lazy.enabled` of the configuration.')
+@click.option('--metrics', 'metrics_file', type=click.Path(), default=None, help='Path to a JSON report of the stage timers and counters of the run.')
+@click.option('--profile', 'profile_dir', type=click.Path(), default=None, help='Directory the cProfile stats of each stage are saved to, summarized in the metrics report.')
+def run(input_file, config_file, workers, state_file, netcdf, plot, export_files, lazy, metrics_file, profile_dir):
     """
     Process input file and save the output.
 
     Parameters:
     - input_file (str): Path to the input file.
     - config_file (str): Path to the YAML configuration file.
+    - workers (int): Number of processes for swath generation.
+    - state_file (str): Path to the swath state for incremental updates.
+    - netcdf (bool): Write the NetCDF output.
+    - plot (bool): Plot the swath.
+    - export_files (tuple): GeoTIFF and Zarr outputs.
+    - lazy (bool): Use the lazy xarray/dask backend.
+    - metrics_file (str): Path to the JSON metrics report.
+    - profile_dir (str): Directory of the per-stage profiles.
     """
+    # Pipeline modules are imported once the arguments are parsed, so that `--help` and argument errors stay
+    # fast; matplotlib, cartopy and netCDF4 are only loaded by the stages using them
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+    from src.raincoat_takehome_science.data.data_processor import generate_swath_data, update_swath_data, prefilter_track
+    from src.raincoat_takehome_science.data.cache import ProductCache
+    from src.raincoat_takehome_science import instrumentation
+
+    if profile_dir is not None:
+        instrumentation.enable_profiling(profile_dir)
+    start = time.perf_counter()
+    status = 'ok'
     try:
         # Read configuration parameters
         params = config.read_config(config_file)
-            
+        nc_options = dict(params.get('netcdf') or {})
+        plot_options = dict(params.get('plotting') or {})
+        if netcdf is None:
+            netcdf = nc_options.get('enabled', True)
+        if plot is None:
+            plot = plot_options.get('enabled', True)
+        nc_options.pop('enabled', None)
+        export_options = dict(params.get('export') or {})
+        configured_exports = export_options.pop('files', None) or []
+        export_files = list(export_files) or list(configured_exports)
+        lazy_options = dict(params.get('lazy') or {})
+        if lazy is None:
+            lazy = lazy_options.get('enabled', False)
+        lazy_options.pop('enabled', None)
+
+        # Cache of intermediate and swath products
+        cache_params = params.get('cache') or {}
+        cache = None
+        if cache_params.get('enabled', False):
+            cache = ProductCache(cache_params.get('directory', 'data/cache/'),
+                                 cache_params.get('max_bytes', 2 * 1024**3))
+
         # Load data from the b-deck file as dataframe
     #    df1 = load_b_deck_file(input_file)
 
         # Convert parameters units and Generate the converted data
         df2 = generate_intermediate_data(input_file,
-                                        params['files']['path_bdeck_intermediate']
+                                        params['files']['path_bdeck_intermediate'],
+                                        cache=cache
                                         )
 
-        # Choose area of interest from the data
-        #df_filtered = filter_track_inside_area(df_converted)
+        swath_options = dict(params.get('swath') or {})
+        if workers is not None:
+            swath_options['workers'] = workers
+
+        # Choose area of interest from the data: fixes whose influence radius reaches the area
+        df_filtered = prefilter_track(df2, params['area'], params.get('track_filter'), swath_options)
 
         # DELIVERIES:
         # 1. Generate swath data
+        stream_nc = netcdf and state_file is None and (lazy or nc_options.get('per_fix', False))
+        nc_file = params['files']['output_ncfile'] if stream_nc else None
 
-        swath_max_wind_speed, grid_lat, grid_lon = generate_swath_data(df2,
-                                                                    params['area'],
-                                                                    params['grid_resolution']
-                                                                    )
+        if lazy:
+            import numpy as np
+            from src.raincoat_takehome_science.data.lazy_swath import generate_lazy_swath_data
 
-        # 2. Generate netcdf and save it
-        generate_nc(swath_max_wind_speed,
-                    grid_lon,
-                    grid_lat,
-                    df2['YYYYMMDDHH'].values,
-                    params['files']['output_ncfile']
-                    )
+            if state_file is not None:
+                raise ValueError('Incremental updates are not supported by the lazy backend.')
+            # The swath is streamed into the outputs and read back from them for the plot
+            if workers is not None:
+                lazy_options['workers'] = workers
+            swath = generate_lazy_swath_data(df_filtered,
+                                             params['area'],
+                                             params['grid_resolution'],
+                                             ([nc_file] if nc_file else []) + export_files,
+                                             nc_options=nc_options,
+                                             export_options=export_options,
+                                             **dict(swath_options, **lazy_options)
+                                             )
+            swath_max_wind_speed = swath.values.T if plot else None
+            grid_lat, grid_lon = np.meshgrid(swath['lat'].values, swath['lon'].values)
+        elif state_file is None:
+            swath_max_wind_speed, grid_lat, grid_lon = generate_swath_data(df_filtered,
+                                                                        params['area'],
+                                                                        params['grid_resolution'],
+                                                                        cache=cache,
+                                                                        nc_file=nc_file,
+                                                                        nc_options=nc_options,
+                                                                        export_files=export_files,
+                                                                        export_options=export_options,
+                                                                        **swath_options
+                                                                        )
+        else:
+            swath_max_wind_speed, grid_lat, grid_lon = update_swath_data(df_filtered,
+                                                                      params['area'],
+                                                                      params['grid_resolution'],
+                                                                      state_file,
+                                                                      **swath_options
+                                                                      )
+            # The state holds the whole swath, exported once it is updated
+            if export_files:
+                from src.raincoat_takehome_science.data.save_to_raster import export_swath
+
+                for export_file in export_files:
+                    export_swath(swath_max_wind_speed, grid_lon, grid_lat, export_file, **export_options)
+        outputs = list(export_files)
+
+        # 2. Generate netcdf and save it, unless streamed during swath generation
+        if netcdf and not stream_nc:
+            from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
+
+            nc_options.pop('per_fix', None)
+            nc_options.pop('chunks', None)
+            generate_nc(swath_max_wind_speed,
+                        grid_lon,
+                        grid_lat,
+                        df_filtered['YYYYMMDDHH'].values,
+                        params['files']['output_ncfile'],
+                        **nc_options
+                        )
+        if netcdf:
+            outputs.append(params['files']['output_ncfile'])
 
         # 3. Plot the wind intensity map
-        plot_swath_wind_speed(swath_max_wind_speed, 
-                            grid_lon,
-                            grid_lat,
-                            [-68., -65., 17., 19.],
-                            params['files']['output_plot_swath_wind_speed'],
-                            params['plotting']['showfig']
-                            )
-
-        click.echo("Processing complete. Outputs saved to: {} and {}".format(params['files']['output_plot_swath_wind_speed'], params['files']['output_ncfile']))
+        if plot:
+            from src.raincoat_takehome_science.plotting.swath_plotter import save_swath_map
+
+            plot_options.pop('enabled', None)
+            outputs.append(save_swath_map(swath_max_wind_speed,
+                                          grid_lon,
+                                          grid_lat,
+                                          [-68., -65., 17., 19.],
+                                          params['files']['output_plot_swath_wind_speed'],
+                                          track=(df_filtered['LATN/S'].values, df_filtered['LONE/W'].values),
+                                          **plot_options
+                                          ))
+
+        if cache is not None:
+            click.echo("Cache hits/misses: {}".format(cache.stats()))
+        click.echo("Processing complete. Outputs saved to: {}".format(', '.join(outputs) or 'none'))
     except Exception as e:
+        status = 'failed: {}'.format(e)
         click.echo(f"Error processing file: {str(e)}")
 
+    if metrics_file is not None:
+        instrumentation.save_report(metrics_file, input_file=input_file, status=status,
+                                    time_total=time.perf_counter() - start)
+        click.echo("Metrics saved to: {}".format(metrics_file))
+
 if __name__=='__main__':
     run()
\ No newline at end of file
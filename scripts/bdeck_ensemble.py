@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import click
+from config import config
+
+@click.command()
+@click.option('--input_file', type=click.Path(exists=True), default='data/external/bal152017.dat', help='Path to the input file.')
+@click.option('--output_file', type=click.Path(), default='output/ensemble_swath_over_Puerto_Rico.nc', help='Output NetCDF file of the ensemble statistics.')
+@click.option('--config_file', type=click.Path(exists=True),  default='config/config.yaml', help='Path to the YAML configuration file.')
+@click.option('--members', type=click.IntRange(min=1), default=None, help='Number of ensemble members. Overrides `ensemble.n_members` of the configuration.')
+@click.option('--seed', type=int, default=None, help='Random seed of the perturbations. Overrides `ensemble.seed` of the configuration.')
+def run(input_file, output_file, config_file, members, seed):
+    """
+    Evaluate the exceedance probabilities and percentiles of the swath over an ensemble of perturbed tracks.
+
+    Parameters:
+    - input_file (str): Path to the input file.
+    - output_file (str): Path to the output NetCDF file.
+    - config_file (str): Path to the YAML configuration file.
+    - members (int): Number of ensemble members.
+    - seed (int): Random seed.
+    """
+    # Imported once the arguments are parsed, so that `--help` stays fast
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+    from src.raincoat_takehome_science.data.ensemble import generate_ensemble_data
+
+    try:
+        # Read configuration parameters
+        params = config.read_config(config_file)
+        ensemble_options = dict(params.get('ensemble') or {})
+        if members is not None:
+            ensemble_options['n_members'] = members
+        if seed is not None:
+            ensemble_options['seed'] = seed
+
+        df = generate_intermediate_data(input_file, params['files']['path_bdeck_intermediate'])
+        swath_params = params.get('swath') or {}
+        nc_options = {k: v for k, v in (params.get('netcdf') or {}).items() if k != 'enabled'}
+        generate_ensemble_data(df, params['area'], params['grid_resolution'],
+                               time_step=swath_params.get('time_step'),
+                               wind_model=swath_params.get('wind_model', 'jelesnianski'),
+                               model_params=swath_params.get('model_params'),
+                               geometry_dir=swath_params.get('geometry_dir'),
+                               nc_file=output_file, nc_options=nc_options,
+                               **ensemble_options)
+
+        click.echo("Processing complete. Ensemble statistics saved to: {}".format(output_file))
+    except Exception as e:
+        click.echo(f"Error processing ensemble: {str(e)}")
+
+if __name__=='__main__':
+    run()
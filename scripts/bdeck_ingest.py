@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import click
+from config import config
+
+@click.command()
+@click.option('--source', type=str, default='data/external/', help='Directory of b*.dat files or glob pattern, e.g. "archive/2017/bal*.dat".')
+@click.option('--config_file', type=click.Path(exists=True),  default='config/config.yaml', help='Path to the YAML configuration file.')
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Number of processes, all CPUs by default.')
+def run(source, config_file, workers):
+    """
+    Ingest b-deck files into the partitioned track dataset.
+
+    Parameters:
+    - source (str): Directory of b-deck files or glob pattern.
+    - config_file (str): Path to the YAML configuration file.
+    - workers (int): Number of processes.
+    """
+    # Imported once the arguments are parsed, so that `--help` stays fast
+    from src.raincoat_takehome_science.data.bulk_ingest import ingest_bdeck_files
+
+    try:
+        # Read configuration parameters
+        params = config.read_config(config_file)
+
+        report = ingest_bdeck_files(source, params['files']['path_track_dataset'], workers)
+        for _, failed in report[report['error'].notna()].iterrows():
+            click.echo("Failed to ingest {}: {}".format(failed['file'], failed['error']))
+
+        click.echo("Ingestion complete. Track dataset saved to: {}".format(params['files']['path_track_dataset']))
+    except Exception as e:
+        click.echo(f"Error ingesting files: {str(e)}")
+
+if __name__=='__main__':
+    run()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import click
+from config import config
+
+@click.command()
+@click.option('--input_file', type=click.Path(exists=True), default='data/external/bal152017.dat', help='Path to the input file.')
+@click.option('--locations', type=click.Path(exists=True), required=True, help='CSV or Parquet file of the point locations.')
+@click.option('--output_file', type=click.Path(), default='output/portfolio_exposure.parquet', help='Output .parquet or .csv file.')
+@click.option('--config_file', type=click.Path(exists=True),  default='config/config.yaml', help='Path to the YAML configuration file.')
+def run(input_file, locations, output_file, config_file):
+    """
+    Evaluate the peak wind, time of peak and hours above thresholds of a storm at point locations.
+
+    Parameters:
+    - input_file (str): Path to the input file.
+    - locations (str): Path to the locations file.
+    - output_file (str): Path to the output file.
+    - config_file (str): Path to the YAML configuration file.
+    """
+    # Imported once the arguments are parsed, so that `--help` stays fast
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+    from src.raincoat_takehome_science.data.portfolio import generate_portfolio_exposure
+
+    try:
+        # Read configuration parameters
+        params = config.read_config(config_file)
+
+        df = generate_intermediate_data(input_file, params['files']['path_bdeck_intermediate'])
+        swath_params = params.get('swath') or {}
+        generate_portfolio_exposure(df, locations, output_file,
+                                    time_step=swath_params.get('time_step'),
+                                    influence_radius=swath_params.get('influence_radius', 'profile'),
+                                    wind_model=swath_params.get('wind_model', 'jelesnianski'),
+                                    model_params=swath_params.get('model_params'),
+                                    **(params.get('portfolio') or {}))
+
+        click.echo("Processing complete. Exposure saved to: {}".format(output_file))
+    except Exception as e:
+        click.echo(f"Error processing portfolio: {str(e)}")
+
+if __name__=='__main__':
+    run()
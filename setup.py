@@ -12,7 +12,8 @@ setup(
     author="Bahtiyor Zohidov",
     author_email="bakhtiyor87@gmail.com",
     packages=find_packages(),
-    scripts=["scripts/bdeck_cli.py"],
+    scripts=["scripts/bdeck_cli.py", "scripts/bdeck_ingest.py", "scripts/bdeck_batch.py",
+             "scripts/bdeck_portfolio.py", "scripts/bdeck_ensemble.py"],
     #license="LICENSE.txt",
     long_description=readme(),
     long_description_content_type='text/markdown',
@@ -24,6 +25,7 @@ setup(
         "xarray>=2023.7.0",
         "pyyaml>=6.0.1",
         "argparse>=1.1",
-        "netCDF4>=1.6.5"
+        "netCDF4>=1.6.5",
+        "pyarrow>=12.0.0"
     ],
 )
\ No newline at end of file
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+import contextlib
+import importlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import yaml
+
+# Modules imported once per worker process instead of once per job. The pipeline modules load their heavy
+# dependencies lazily, so the ones of the enabled stages are listed as well
+HEAVY_MODULES = ['src.raincoat_takehome_science.data.reader_bdeck',
+                 'src.raincoat_takehome_science.data.data_processor',
+                 'src.raincoat_takehome_science.data.save_to_netcdf',
+                 'pyproj']
+NETCDF_MODULES = ['netCDF4']
+PLOT_MODULES = {'figure': ['src.raincoat_takehome_science.plotting.swath_plotter', 'matplotlib.pyplot', 'cartopy.crs',
+                           'cartopy.feature'],
+                'raster': ['src.raincoat_takehome_science.plotting.swath_plotter', 'matplotlib', 'cartopy.feature'],
+                'tiles': ['src.raincoat_takehome_science.plotting.swath_plotter', 'matplotlib']}
+
+AREA_KEYS = ['lat_min', 'lat_max', 'lon_min', 'lon_max']
+
+# Largest number of jobs sharing a grid that are sent to a worker at once
+MAX_JOBS_PER_TASK = 8
+
+
+def read_manifest(manifest_file):
+    """
+    Reads a batch manifest of (storm file, area, resolution) jobs.
+
+    The manifest is a CSV file, or a YAML list, with the columns `storm_file`, `lat_min`, `lat_max`,
+    `lon_min`, `lon_max` and `grid_resolution`, and an optional `job_id` (storm file name and row number
+    by default).
+
+    Parameters:
+        - manifest_file (str): Path to the `.csv` or `.yaml` manifest.
+
+    Returns:
+        - list: Jobs as dicts with job_id, storm_file, area and grid_resolution keys.
+    """
+    if manifest_file.endswith(('.yaml', '.yml')):
+        with open(manifest_file) as f:
+            manifest = pd.DataFrame(yaml.safe_load(f))
+    else:
+        manifest = pd.read_csv(manifest_file, skipinitialspace=True)
+
+    missing = {'storm_file', 'grid_resolution', *AREA_KEYS} - set(manifest.columns)
+    if missing:
+        raise ValueError('Manifest {} lacks the columns {}.'.format(manifest_file, sorted(missing)))
+
+    jobs = []
+    for i, row in enumerate(manifest.to_dict('records')):
+        storm = os.path.splitext(os.path.basename(row['storm_file']))[0]
+        job_id = row.get('job_id')
+        jobs.append({'job_id': str(job_id) if pd.notna(job_id) else '{}-{:05d}'.format(storm, i),
+                     'storm_file': row['storm_file'],
+                     'area': {key: float(row[key]) for key in AREA_KEYS},
+                     'grid_resolution': float(row['grid_resolution'])})
+    return jobs
+
+
+def _init_worker(modules=HEAVY_MODULES):
+    """
+    Imports the heavy pipeline modules once per worker process.
+    """
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _run_jobs(jobs, params, output_dir, plot):
+    """
+    Runs jobs sharing an area and resolution in a worker and returns one report record per job.
+    """
+    return [_run_job(job, params, output_dir, plot) for job in jobs]
+
+
+def _run_job(job, params, output_dir, plot):
+    """
+    Runs the pipeline of one job. Failures are caught and reported, so they do not affect other jobs.
+    """
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+    from src.raincoat_takehome_science.data.data_processor import generate_swath_data, prefilter_track
+    from src.raincoat_takehome_science.data.cache import ProductCache
+    from src.raincoat_takehome_science import instrumentation
+
+    record = {'job_id': job['job_id'], 'storm_file': job['storm_file'], 'grid_resolution': job['grid_resolution'],
+              **job['area'], 'status': 'ok', 'error': None, 'pid': os.getpid()}
+    nc_file = os.path.join(output_dir, job['job_id'] + '.nc')
+    log_file = os.path.join(output_dir, 'logs', job['job_id'] + '.log')
+    start = time.perf_counter()
+    # Counters are per job, a worker runs several jobs
+    instrumentation.reset()
+
+    cache_params = params.get('cache') or {}
+    cache = None
+    if cache_params.get('enabled', False):
+        cache = ProductCache(cache_params.get('directory', 'data/cache/'),
+                             cache_params.get('max_bytes', 2 * 1024**3))
+
+    # Progress messages of the pipeline go to the job log
+    with open(log_file, 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            stage = time.perf_counter()
+            df = generate_intermediate_data(job['storm_file'], params['files']['path_bdeck_intermediate'],
+                                            cache=cache)
+            record['time_intermediate'] = time.perf_counter() - stage
+
+            # Jobs run one per process; the memory-mapped output is per job
+            swath_options = dict(params.get('swath') or {}, workers=1)
+            if swath_options.get('out_file'):
+                swath_options['out_file'] = os.path.join(output_dir, job['job_id'] + '.npy')
+
+            export_options = dict(params.get('export') or {})
+            export_files = [os.path.join(output_dir, job['job_id'] + os.path.splitext(f.rstrip('/'))[1])
+                            for f in export_options.pop('files', None) or []]
+
+            stage = time.perf_counter()
+            df = prefilter_track(df, job['area'], params.get('track_filter'), swath_options)
+            swath, grid_lat, grid_lon = generate_swath_data(df, job['area'], job['grid_resolution'], cache=cache,
+                                                            export_files=export_files,
+                                                            export_options=export_options, **swath_options)
+            record['time_swath'] = time.perf_counter() - stage
+
+            nc_options = dict(params.get('netcdf') or {})
+            if nc_options.pop('enabled', True):
+                from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
+
+                stage = time.perf_counter()
+                nc_options = {k: v for k, v in nc_options.items() if k not in ('per_fix', 'chunks')}
+                generate_nc(swath, grid_lon, grid_lat, df['YYYYMMDDHH'].values, nc_file, **nc_options)
+                record['time_netcdf'] = time.perf_counter() - stage
+            record['max_wind_speed'] = float(swath.max()) if swath.size else float('nan')
+
+            if plot:
+                from src.raincoat_takehome_science.plotting.swath_plotter import save_swath_map
+
+                stage = time.perf_counter()
+                area = job['area']
+                plot_options = {k: v for k, v in (params.get('plotting') or {}).items()
+                                if k not in ('enabled', 'showfig')}
+                save_swath_map(swath, grid_lon, grid_lat,
+                               [area['lon_min'], area['lon_max'], area['lat_min'], area['lat_max']],
+                               os.path.join(output_dir, job['job_id'] + '.png'),
+                               track=(df['LATN/S'].values, df['LONE/W'].values), **plot_options)
+                record['time_plot'] = time.perf_counter() - stage
+        except Exception as e:
+            traceback.print_exc(file=log)
+            record['status'] = 'failed'
+            record['error'] = '{}: {}'.format(type(e).__name__, e)
+
+    record['time_total'] = time.perf_counter() - start
+    record.update(instrumentation.report()['counters'])
+    return record
+
+
+def _tasks(jobs):
+    """
+    Groups jobs sharing an area and resolution into tasks of at most `MAX_JOBS_PER_TASK` jobs,
+    so that a worker builds the grid once for all of them.
+    """
+    groups = {}
+    for job in jobs:
+        key = (tuple(job['area'][k] for k in AREA_KEYS), job['grid_resolution'])
+        groups.setdefault(key, []).append(job)
+    return [group[i:i + MAX_JOBS_PER_TASK] for group in groups.values()
+            for i in range(0, len(group), MAX_JOBS_PER_TASK)]
+
+
+def _run_pool(tasks, workers, modules, params, output_dir, plot):
+    """
+    Runs tasks on a fresh pool of worker processes.
+
+    Returns:
+        - list: Report records of the tasks which completed or failed on their own.
+        - list: Tasks whose worker pool broke, whether they crashed it or were pending when another one did.
+    """
+    records, broken = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(modules,)) as pool:
+        futures = {pool.submit(_run_jobs, task, params, output_dir, plot): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                records.extend(future.result())
+            except BrokenProcessPool:
+                broken.append(task)
+            except Exception as e:
+                records.extend({'job_id': job['job_id'], 'storm_file': job['storm_file'],
+                                'status': 'failed', 'error': '{}: {}'.format(type(e).__name__, e)}
+                               for job in task)
+    return records, broken
+
+
+def run_batch(jobs, params, output_dir='output/batch/', workers=None, plot=False):
+    """
+    Runs swath jobs on a pool of worker processes and writes a timing and status report.
+
+    Heavy modules are imported once per worker and jobs sharing an area and resolution are sent to the
+    same worker. A failing job only fails itself. When a worker crashes, the pool is restarted and the jobs it
+    broke are retried one by one; a job still crashing a worker is then run alone, and reported as failed only
+    if it crashes that one too, so that the rest of the batch goes on.
+
+    Parameters:
+        - jobs (list): Jobs as returned by `read_manifest`.
+        - params (dict): Configuration parameters (files, swath, netcdf and cache sections are used).
+        - output_dir (str): Directory of the per-job NetCDF files, plots, logs and of the report.
+        - workers (int): Number of processes, all CPUs by default.
+        - plot (bool): Plot the swath of each job.
+
+    Returns:
+        - DataFrame: Report with one row per job.
+    """
+    os.makedirs(os.path.join(output_dir, 'logs'), exist_ok=True)
+    print('Batch of {} jobs started....'.format(len(jobs)))
+
+    modules = HEAVY_MODULES + (NETCDF_MODULES if (params.get('netcdf') or {}).get('enabled', True) else []) + \
+        (PLOT_MODULES.get((params.get('plotting') or {}).get('mode', 'figure'), []) if plot else [])
+    records = []
+    pending, isolated = _tasks(jobs), []
+    while pending or isolated:
+        if pending:
+            tasks, pending = pending, []
+            pool_workers = workers
+        else:
+            # A job is only reported as crashed if it crashes a worker of its own
+            tasks, pool_workers = [isolated.pop(0)], 1
+        task_records, broken = _run_pool(tasks, pool_workers, modules, params, output_dir, plot)
+        records.extend(task_records)
+        for task in broken:
+            if len(task) > 1:
+                # Retry the jobs one by one to find the one which crashed the worker
+                pending.extend([job] for job in task)
+            elif pool_workers == 1 and len(tasks) == 1:
+                records.append({'job_id': task[0]['job_id'], 'storm_file': task[0]['storm_file'],
+                                'status': 'failed', 'error': 'Worker process crashed'})
+            else:
+                isolated.append(task)
+
+    report = pd.DataFrame(records)
+    report.to_csv(os.path.join(output_dir, 'batch_report.csv'), index=False)
+    with open(os.path.join(output_dir, 'batch_report.json'), 'w') as f:
+        json.dump(report.to_dict('records'), f, indent=2, default=str)
+
+    failed = (report['status'] != 'ok').sum() if len(report) else 0
+    print('Batch finished: {} jobs succeeded, {} failed. Report saved in {}....'.format(len(report) - failed,
+                                                                                     failed, output_dir))
+    return report
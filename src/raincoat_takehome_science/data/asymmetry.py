@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+"""
+Parameters of the asymmetric wind field: storm translation and profile scales fitted to the quadrant wind radii.
+
+B-deck files give, for every fix, the radius of 34-kt winds in the NE, SE, SW and NW quadrants (RAD1-RAD4).
+The asymmetric field (`swath_engine.asymmetric_wind_speed`) adds the translation of the storm to a symmetric
+profile whose radial coordinate is stretched per quadrant. The stretch of each quadrant is fitted so that the
+total wind is 34 knots at the observed radius of the quadrant center. All parameters are computed in one
+vectorized pass over the track.
+"""
+
+import numpy as np
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.convert as convert
+import src.raincoat_takehome_science.data.wind_models as wind_models
+
+# Wind speed of the RAD1-RAD4 radii the quadrant scales are fitted to, m/s
+RAD34 = convert.speed_knots_2_ms(34)
+
+# Bearing of the center of the RAD1 (NE), RAD2 (SE), RAD3 (SW) and RAD4 (NW) quadrants, degrees
+QUADRANT_BEARINGS = np.array([45.0, 135.0, 225.0, 315.0])
+
+# Bounds of the fitted quadrant scales, to keep inconsistent radii from distorting the field
+MIN_QUADRANT_SCALE = swath_engine.MIN_QUADRANT_SCALE
+MAX_QUADRANT_SCALE = swath_engine.MAX_QUADRANT_SCALE
+
+
+def translation_velocity(df):
+    """
+    Returns the eastward and northward translation speed of the storm for every row of the track data.
+
+    The b-deck DIR (compass heading) and SPEED columns are used when they are reported; many best tracks leave
+    them at 0, in which case the motion is derived from the fix positions with centered differences in time.
+
+    Parameters:
+        - df (DataFrame): Converted track data with YYYYMMDDHH, LATN/S, LONE/W and optionally DIR, SPEED [m/s].
+
+    Returns:
+        - u, v (1D array): Eastward and northward translation speed, m/s.
+    """
+    if 'DIR' in df and 'SPEED' in df and (df['SPEED'].fillna(0) > 0).any():
+        heading = np.radians(df['DIR'].fillna(0).values.astype(float))
+        speed = df['SPEED'].fillna(0).values.astype(float)
+        return speed * np.sin(heading), speed * np.cos(heading)
+
+    track = df[['YYYYMMDDHH', 'LATN/S', 'LONE/W']].assign(YYYYMMDDHH=pd.to_datetime(df['YYYYMMDDHH']))
+    track = track.drop_duplicates(subset='YYYYMMDDHH').sort_values('YYYYMMDDHH')
+    if len(track) < 2:
+        return np.zeros(len(df)), np.zeros(len(df))
+
+    seconds = track['YYYYMMDDHH'].values.astype('datetime64[ns]').astype(np.int64) / 1e9
+    lats = track['LATN/S'].values.astype(float)
+    lons = np.unwrap(track['LONE/W'].values.astype(float), period=360.0)
+    meters_per_degree = np.radians(1.0) * swath_engine.EARTH_RADIUS
+    u = pd.Series(np.gradient(lons, seconds) * meters_per_degree * np.cos(np.radians(lats)),
+                  index=track['YYYYMMDDHH'].values)
+    v = pd.Series(np.gradient(lats, seconds) * meters_per_degree, index=track['YYYYMMDDHH'].values)
+
+    times = pd.to_datetime(df['YYYYMMDDHH']).values
+    return u.reindex(times).values, v.reindex(times).values
+
+
+def rad34_quadrants(df):
+    """
+    Returns the RAD1-RAD4 34-kt wind radii for every row of the track data, taken from the 34-kt row of the
+    same timestamp (0 where none).
+
+    Returns:
+        - ndarray: Radii of shape (row, 4), meter.
+    """
+    is_rad34 = np.isclose(df['RAD'].values.astype(float), RAD34)[:, np.newaxis]
+    quadrants = np.where(is_rad34, df[['RAD1', 'RAD2', 'RAD3', 'RAD4']].values.astype(float), 0.0)
+    quadrants = pd.DataFrame(np.nan_to_num(quadrants), index=df.index)
+    return quadrants.groupby(pd.to_datetime(df['YYYYMMDDHH']).values).transform('max').values
+
+
+def asymmetric_parameters(df, wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None):
+    """
+    Computes the parameters of the asymmetric field of every row of the track data.
+
+    The symmetric maximum wind is VMAX minus the translation speed. For each quadrant, the symmetric wind which,
+    added to the translation, gives 34 knots at the quadrant center is solved in closed form, and the quadrant
+    scale is the ratio of the radius where the wind model reaches that wind to the observed radius.
+    Quadrants without a usable radius take the largest scale of the fix (the most compact quadrant), and fixes
+    without any usable radius stay symmetric (scale 1).
+
+    Parameters:
+        - df (DataFrame): Converted track data with YYYYMMDDHH, LATN/S, LONE/W, VMAX, RMW, RAD and RAD1-RAD4 columns.
+        - wind_model (str): Wind profile model, see `wind_models`.
+        - model_params (dict): Optional parameters of the wind model.
+
+    Returns:
+        - DataFrame: VMAX_SYM [m/s], UT, VT [m/s] and SCALE1-SCALE4 columns, aligned with `df`.
+    """
+    model_params = model_params or {}
+    u, v = translation_velocity(df)
+    u, v = np.nan_to_num(u), np.nan_to_num(v)
+    vmax = df['VMAX'].values.astype(float)
+    rmax = df['RMW'].values.astype(float)[:, np.newaxis]
+    vmax_sym = np.maximum(vmax - np.hypot(u, v), 0.0)
+
+    radii = rad34_quadrants(df)
+    bearing = np.radians(QUADRANT_BEARINGS)[np.newaxis, :]
+    hemisphere = np.where(df['LATN/S'].values < 0, -1.0, 1.0)[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decay = 2.0 * rmax * radii / (rmax**2 + radii**2)
+        # Translation projected on the direction of the rotational wind at the quadrant center
+        along = decay * hemisphere * (-u[:, np.newaxis] * np.cos(bearing) + v[:, np.newaxis] * np.sin(bearing))
+        translation = decay**2 * (u**2 + v**2)[:, np.newaxis]
+        rotation = -along + np.sqrt(along**2 - translation + RAD34**2)
+
+        fitted = wind_models.influence_radius(wind_model, np.broadcast_to(rmax, radii.shape),
+                                              np.broadcast_to(vmax_sym[:, np.newaxis], radii.shape),
+                                              rotation, **model_params)
+        scales = fitted / radii
+    valid = (radii > 0) & np.isfinite(scales) & (scales > 0)
+    scales = np.clip(np.where(valid, scales, np.nan), MIN_QUADRANT_SCALE, MAX_QUADRANT_SCALE)
+
+    # Quadrants without 34-kt winds are the most compact ones
+    fill = np.nanmax(np.where(valid, scales, -np.inf), axis=1)
+    fill = np.where(np.isfinite(fill), fill, 1.0)
+    scales = np.where(valid, scales, fill[:, np.newaxis])
+
+    parameters = pd.DataFrame(scales, columns=['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4'], index=df.index)
+    parameters.insert(0, 'VMAX_SYM', vmax_sym)
+    parameters.insert(1, 'UT', u)
+    parameters.insert(2, 'VT', v)
+    return parameters
+
+
+def min_interpolated_scale(scales):
+    """
+    Lower bound of the quadrant scales interpolated in azimuth by `swath_engine.asymmetric_wind_speed`.
+
+    The interpolating polynomial dips below the smallest quadrant scale between contrasted quadrants; it is
+    bounded by `c0 - sqrt(c1**2 + c2**2) - |c3| / 2` and clipped to `MIN_QUADRANT_SCALE` like the field.
+
+    Parameters:
+        - scales (ndarray): Quadrant scales of shape (fix, 4).
+
+    Returns:
+        - 1D array: Lower bound of the scale of every fix.
+    """
+    c0, c1, c2, c3 = swath_engine.quadrant_scale_coefficients(scales)
+    return np.clip(c0 - np.hypot(c1, c2) - 0.5 * np.abs(c3), MIN_QUADRANT_SCALE, MAX_QUADRANT_SCALE)
+
+
+def asymmetric_influence_radius(rmax, vmax_sym, u, v, scales, wind_threshold,
+                                wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None):
+    """
+    Distance beyond which the asymmetric wind stays below a threshold in every direction.
+
+    The translation adds at most its speed to the rotational wind, and the rotational wind reaches the remaining
+    margin at the model radius divided by the smallest interpolated scale (see `min_interpolated_scale`).
+
+    Returns:
+        - 1D array: Influence radius, meter. Infinite when the translation alone exceeds the threshold.
+    """
+    margin = wind_threshold - np.hypot(u, v)
+    radius = wind_models.influence_radius(wind_model, rmax, vmax_sym, np.maximum(margin, 1e-6),
+                                          **(model_params or {}))
+    return np.where(margin > 0, radius / min_interpolated_scale(scales), np.inf)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+
+import glob
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# from local lib
+from src.raincoat_takehome_science.data.reader_bdeck import COLUMNS, load_b_deck_file, convert_bdeck_data
+
+# Partition keys of the track dataset
+PARTITION_COLUMNS = ['BASIN', 'YEAR', 'CY']
+
+
+def find_bdeck_files(source):
+    """
+    Lists b-deck files of a directory or a glob pattern.
+
+    Parameters:
+        - source (str or list): Directory holding `b*.dat` files, glob pattern (e.g. `archive/2017/bal*.dat`)
+                                or list of files.
+
+    Returns:
+        - list: Sorted b-deck file paths.
+    """
+    if isinstance(source, (list, tuple)):
+        return sorted(source)
+    if os.path.isdir(source):
+        source = os.path.join(source, 'b*.dat')
+    return sorted(glob.glob(source))
+
+
+def parse_bdeck_file(file_path):
+    """
+    Reads a whole b-deck file and converts it into the measurement units of SI.
+
+    Rows with more columns than `reader_bdeck.COLUMNS` are truncated and rows with fewer are padded
+    with missing values, so that files of different ATCF vintages share one schema. Rows without
+    a valid timestamp or position are dropped.
+
+    Parameters:
+        - file_path (str): Path to the b-deck file.
+
+    Returns:
+        - DataFrame: Converted data (see `convert_bdeck_data`) with the BASIN, YEAR and CY storm keys.
+    """
+    # Normalize the number of columns of each row before parsing
+    with open(file_path) as f:
+        lines = [','.join(line.rstrip('\r\n').split(',', len(COLUMNS))[:len(COLUMNS)]) for line in f]
+    df = load_b_deck_file(io.StringIO('\n'.join(lines)), skip_rows=0)
+
+    newdf = convert_bdeck_data(df, errors='coerce')
+    valid = newdf['YYYYMMDDHH'].notna() & newdf['LATN/S'].notna() & newdf['LONE/W'].notna()
+    if not valid.any():
+        raise ValueError('No valid b-deck rows found in {}'.format(file_path))
+    df, newdf = df[valid.values], newdf[valid].copy()
+
+    newdf.insert(0, 'BASIN', df['BASIN'].astype(str).str.strip().str.upper().values)
+    newdf.insert(1, 'CY', pd.to_numeric(df['CY'], errors='coerce').astype('Int64').values)
+    # Storms crossing the new year stay in the partition of their season
+    newdf.insert(2, 'YEAR', int(newdf['YYYYMMDDHH'].dt.year.min()))
+    return newdf
+
+
+def _ingest_file(file_path, root_path):
+    """
+    Parses one b-deck file and writes it into the partitioned dataset.
+
+    Returns:
+        - (str, int, str): File path, number of rows written and error message, if any.
+    """
+    try:
+        newdf = parse_bdeck_file(file_path)
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        pq.write_to_dataset(pa.Table.from_pandas(newdf, preserve_index=False),
+                            root_path,
+                            partition_cols=PARTITION_COLUMNS,
+                            basename_template=stem + '-{i}.parquet',
+                            existing_data_behavior='delete_matching')
+        return file_path, len(newdf), None
+    except Exception as e:
+        return file_path, 0, str(e)
+
+
+def ingest_bdeck_files(source, root_path='data/processed/tracks/', workers=None):
+    """
+    Parses b-deck files in parallel into one Parquet dataset partitioned by basin, year and storm number.
+
+    Re-ingesting a storm replaces its partition. Files which fail to parse are reported and skipped.
+
+    Parameters:
+        - source (str or list): Directory, glob pattern or list of b-deck files (see `find_bdeck_files`).
+        - root_path (str): Root directory of the dataset.
+        - workers (int): Number of processes, all CPUs by default.
+
+    Returns:
+        - DataFrame: Ingestion report with file, rows and error columns.
+    """
+    files = find_bdeck_files(source)
+    print('Ingesting {} b-deck files into {}....'.format(len(files), root_path))
+
+    os.makedirs(root_path, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_ingest_file, files, [root_path] * len(files)))
+    report = pd.DataFrame(results, columns=['file', 'rows', 'error'])
+
+    failed = report['error'].notna()
+    print('Ingestion finished: {} rows from {} files, {} failed....'.format(report['rows'].sum(),
+                                                                            (~failed).sum(),
+                                                                            failed.sum()))
+    return report
+
+
+def read_track_dataset(root_path='data/processed/tracks/', columns=None, basin=None, year=None, storm=None):
+    """
+    Reads converted tracks back from the partitioned dataset.
+
+    Only the requested columns and the partitions matching the filters are read.
+
+    Parameters:
+        - root_path (str): Root directory of the dataset.
+        - columns (list): Columns to read, all by default.
+        - basin (str): Basin filter, e.g. `AL`.
+        - year (int): Year filter.
+        - storm (int): Storm number (CY) filter.
+
+    Returns:
+        - DataFrame: Track data.
+    """
+    dataset = ds.dataset(root_path, format='parquet', partitioning='hive')
+
+    expression = None
+    for name, value in (('BASIN', basin), ('YEAR', year), ('CY', storm)):
+        if value is not None:
+            condition = ds.field(name) == value
+            expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
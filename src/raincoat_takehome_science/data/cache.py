@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+
+
+def code_version():
+    """
+    Returns a hash of the source code of the data package, so that cached products are
+    invalidated whenever the conversion or swath logic changes.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_file(file_path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hash of the bytes of a file.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_frame(df):
+    """
+    Returns a hash of the content (values, index and column names) of a DataFrame.
+    """
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    return digest.hexdigest()
+
+
+class ProductCache:
+    """
+    Content-addressed cache of the pipeline products (parsed track, converted track, swath field).
+
+    Every product is keyed on its stage, the hash of its inputs, its parameters and the code version.
+    Arrays are stored as `.npy` files loaded with memory mapping, tables as Parquet files. The cache
+    is bounded to `max_bytes` by evicting the least recently used products. Several processes may share
+    the directory: products are written atomically, and products evicted by another process are misses.
+
+    Parameters:
+        - directory (str): Cache directory.
+        - max_bytes (int): Size limit of the cache directory, 2 GB by default.
+    """
+
+    def __init__(self, directory='data/cache/', max_bytes=2 * 1024**3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = {}
+        self.misses = {}
+        self._code_version = code_version()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, stage, inputs=(), params=None):
+        """
+        Builds the cache key of a product.
+
+        Parameters:
+            - stage (str): Pipeline stage, e.g. `converted_track`.
+            - inputs (list): Hashes of the input data (see `hash_file`, `hash_frame`).
+            - params (dict): JSON-serializable parameters of the stage.
+
+        Returns:
+            - str: Cache key.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([stage, list(inputs), params, self._code_version], sort_keys=True,
+                                 default=str).encode())
+        return '{}-{}'.format(stage, digest.hexdigest()[:32])
+
+    def get_array(self, key):
+        """
+        Returns the cached array, memory-mapped read-only, or None on a miss.
+        """
+        return self._lookup(key, '.npy', lambda path: np.load(path, mmap_mode='r'))
+
+    def put_array(self, key, array):
+        """
+        Stores an array and returns it memory-mapped from the cache.
+        """
+        path = self._write(key, '.npy', lambda f: np.save(f, np.asarray(array)))
+        try:
+            return np.load(path, mmap_mode='r')
+        except FileNotFoundError:
+            # Evicted by another process meanwhile
+            return np.asarray(array)
+
+    def get_frame(self, key):
+        """
+        Returns the cached DataFrame or None on a miss.
+        """
+        return self._lookup(key, '.parquet', pd.read_parquet)
+
+    def put_frame(self, key, df):
+        """
+        Stores a DataFrame.
+        """
+        self._write(key, '.parquet', lambda f: df.to_parquet(f, index=False))
+        return df
+
+    def stats(self):
+        """
+        Returns the hit and miss counters per stage.
+        """
+        stages = sorted(set(self.hits) | set(self.misses))
+        return {stage: {'hits': self.hits.get(stage, 0), 'misses': self.misses.get(stage, 0)} for stage in stages}
+
+    def _lookup(self, key, suffix, loader):
+        stage = key.rsplit('-', 1)[0]
+        path = os.path.join(self.directory, key + suffix)
+        try:
+            # The modification time orders the products for LRU eviction
+            os.utime(path)
+            product = loader(path)
+        except FileNotFoundError:
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+            instrumentation.count('cache_misses')
+            return None
+        self.hits[stage] = self.hits.get(stage, 0) + 1
+        instrumentation.count('cache_hits')
+        return product
+
+    def _write(self, key, suffix, writer):
+        path = os.path.join(self.directory, key + suffix)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(('.npy', '.parquet')):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    # Evicted by another process meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 
 
-from pandas import to_datetime
-import pyproj as proj
+from functools import lru_cache
+
+import numpy as np
+from pandas import to_datetime, factorize, Series
 
 
 def convert_latlon_hemi_2_degree(lat_str, lon_str):
@@ -28,6 +30,30 @@ def convert_latlon_hemi_2_degree(lat_str, lon_str):
     return lat_degrees, lon_degrees
 
 
+def convert_latlon_hemi_2_degree_array(lat_str, lon_str):
+    """
+    Vectorized `convert_latlon_hemi_2_degree` for whole columns of hemispheric coordinates.
+
+    Parameters:
+        - lat_str (Series of str): latitude, e.g. ` 124N`.
+        - lon_str (Series of str): longitude, e.g. `  531W`.
+
+    Returns:
+        - lat_degrees (1D array)
+        - lon_degrees (1D array)
+    """
+    def _to_degree(values, positive_hemisphere):
+        # Coordinates repeat a lot within an archive, so only the distinct strings are parsed
+        codes, uniques = factorize(values)
+        uniques = Series(uniques, dtype=str).str.strip()
+        degrees = uniques.str[:-1].astype(float).values / 10.
+        degrees *= np.where(uniques.str[-1].str.upper().values == positive_hemisphere, 1., -1.)
+        # Missing coordinates (code -1) pick the trailing NaN
+        return np.append(degrees, np.nan)[codes]
+
+    return _to_degree(lat_str, 'N'), _to_degree(lon_str, 'E')
+
+
 def speed_knots_2_ms(data):
     """
     Converts windspeed unit in knot [knt] into meter per second [ms] unit.
@@ -48,14 +74,15 @@ def nautical_miles_2_meter(data):
     return data * 1852.0
 
 
-def timestamp_str_2_datetime(time):
+def timestamp_str_2_datetime(time, errors='raise'):
     """
     Converts string formatted timestamp into pandas datetime format.
 
     Parameters:
         - time (str or Series): Timestamp in yyyymmddhh (year, month, day, hour) order. Example, 20171230
+        - errors (str): `raise` on a malformed timestamp, or `coerce` it to NaT.
     """
-    return to_datetime(time, format='%Y%m%d%H')
+    return to_datetime(time, format='%Y%m%d%H', errors=errors)
 
 
 def latlon_2_xy(lat, lon):
@@ -70,6 +97,16 @@ def latlon_2_xy(lat, lon):
     - x, y: Cartesian coordinates
     """
     # Puerto Rico zone 20
-    p = proj.Proj(proj='utm',zone=20,ellps='WGS84', preserve_units=False)
+    return _utm_transformer(20).transform(lon, lat)
+
+
+@lru_cache(maxsize=None)
+def _utm_transformer(zone):
+    """
+    Returns a cached lon/lat -> UTM transformer, which is expensive to build.
+    """
+    # Imported here, pyproj is only needed by the coordinate conversion
+    import pyproj as proj
 
-    return p(lon, lat)
\ No newline at end of file
+    utm = proj.CRS.from_dict({'proj': 'utm', 'zone': zone, 'ellps': 'WGS84'})
+    return proj.Transformer.from_crs(utm.geodetic_crs, utm, always_xy=True)
\ No newline at end of file
@@ -1,10 +1,25 @@
 #!/usr/bin/env python
 
+import json
+import os
+from functools import partial
+
 import numpy as np
-import geopandas as gpd
-from shapely.geometry import Polygon
-from geopy.distance import geodesic
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.convert as convert
+import src.raincoat_takehome_science.data.wind_models as wind_models
+import src.raincoat_takehome_science.data.asymmetry as asymmetry
+from src.raincoat_takehome_science.data.grid_geometry import get_grid_geometry
+from src.raincoat_takehome_science.data.cache import hash_frame
+from src.raincoat_takehome_science.data.save_to_netcdf import SwathNetCDFWriter
+from src.raincoat_takehome_science.data.save_to_raster import DEFAULT_BLOCK_SIZE, export_swath, open_swath_writer
 
+# RAD value of the b-deck rows holding the 34-kt wind radii, m/s
+RAD34 = convert.speed_knots_2_ms(34)
 
 
 
@@ -27,29 +42,97 @@ def calculate_gradient_wind_speed_jelesnianski(r, rmax, vmax):
     return vg
 
 
-def filter_track_inside_area(trackdata, area):
+def filter_track_inside_area(trackdata, area, buffer=0.0):
   """
   Filters track data and returns the data that are only inside a given area with coordinates.
 
   Parameters:
     - trackdata  (DataFrame): Wind track data.
     - area  (dict):  Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+    - buffer (float): Optional distance, meter, the area is extended by in every direction.
+  """
+  inside = area_reach_mask(trackdata['LATN/S'].values, trackdata['LONE/W'].values, area, buffer)
+  return trackdata[inside]
+
+
+def area_reach_mask(lats, lons, area, reach):
+  """
+  Tests which points lie within a distance of an area with range tests on latitude and longitude.
+
+  The area is extended by the reach converted to degrees: exactly in latitude, and in longitude with the
+  haversine bound `sin(dlon / 2) <= sin(reach / 2R) / cos(lat)` at the highest latitude involved. The test
+  is conservative, i.e. a point within the reach of the area is never rejected.
+
+  Parameters:
+    - lats, lons (1D array): Latitude and longitude of the points, degrees.
+    - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+    - reach (float or 1D array): Distance, meter, from the area within which points are kept.
+
+  Returns:
+    - 1D array: Boolean mask of the points within reach of the area.
   """
+  lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+  angle = np.maximum(np.asarray(reach, dtype=float), 0.0) / swath_engine.EARTH_RADIUS
+  dlat = np.degrees(angle)
+  inside_lat = (lats >= area['lat_min'] - dlat) & (lats <= area['lat_max'] + dlat)
 
-  # Create a Polygon representing the area of Puerto Rico
-  area_puerto_rico = Polygon([(area['lon_min'], area['lat_min']),
-                              (area['lon_max'], area['lat_min']),
-                              (area['lon_max'], area['lat_max']),
-                              (area['lon_min'], area['lat_max'])
-                              ])
+  max_abs_lat = np.radians(np.minimum(np.maximum(np.abs(lats), max(abs(area['lat_min']), abs(area['lat_max']))), 90.0))
+  with np.errstate(divide='ignore', invalid='ignore'):
+      ratio = np.sin(np.minimum(angle, np.pi) * 0.5) / np.cos(max_abs_lat)
+  dlon = np.where((ratio < 1.0) & (ratio >= 0.0), np.degrees(2.0 * np.arcsin(np.clip(ratio, 0.0, 1.0))), 360.0)
 
-  # Create a GeoDataFrame from the DataFrame
-  gdf = gpd.GeoDataFrame(trackdata, geometry=gpd.points_from_xy(trackdata['LONE/W'], trackdata['LATN/S']))
+  center = 0.5 * (area['lon_min'] + area['lon_max'])
+  half_width = 0.5 * (area['lon_max'] - area['lon_min'])
+  offset = np.abs((lons - center + 180.0) % 360.0 - 180.0) - half_width
+  return inside_lat & (offset <= dlon)
 
-  # Filter data within the area of Puerto Rico
-  gdf_within_area = gdf[gdf.geometry.within(area_puerto_rico)]
 
-  return gdf_within_area
+def filter_track_near_area(trackdata, area, wind_threshold=RAD34, buffer=0.0, time_step=None,
+                           influence_radius='profile', wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None,
+                           asymmetric=False):
+  """
+  Keeps the fixes of the track whose influence radius reaches the area, before any distance is evaluated
+  on the grid.
+
+  Each fix is tested with `area_reach_mask` against its influence radius (see `track_fixes`) plus the buffer,
+  so that no geometry library is involved. Dropped fixes have wind speeds below `wind_threshold` everywhere
+  in the area, i.e. the swath is unchanged wherever it reaches the threshold.
+  With a time step, the corridor of the interpolated track is tested instead: both fixes of every segment
+  with an interpolated fix reaching the area are kept, so that interpolating the filtered track yields the
+  same fixes inside the area.
+
+  Parameters:
+    - trackdata (DataFrame): Converted track data.
+    - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+    - wind_threshold (float): Wind speed threshold, m/s, the influence radius is derived for, 34 knots by default.
+    - buffer (float): Distance, meter, added to the influence radius of every fix.
+    - time_step (str or Timedelta): Optional time step the track is interpolated to by `generate_swath_data`.
+    - influence_radius, wind_model, model_params, asymmetric: See `generate_swath_data`.
+
+  Returns:
+    - DataFrame: Rows of the fixes reaching the area.
+  """
+  times = pd.to_datetime(trackdata['YYYYMMDDHH'])
+  track = interpolate_track(trackdata, time_step) if time_step is not None else trackdata
+  fixes = track_fixes(track, wind_threshold, influence_radius, wind_model, model_params, asymmetric)
+  fixes = fixes.assign(YYYYMMDDHH=pd.to_datetime(fixes['YYYYMMDDHH']))
+  fixes['REACH'] = area_reach_mask(fixes['LATN/S'].values, fixes['LONE/W'].values, area,
+                                   fixes['RADIUS'].values + buffer)
+  reaching = fixes.groupby('YYYYMMDDHH')['REACH'].any()
+
+  if time_step is None:
+      kept = reaching.index[reaching.values]
+  else:
+      # Original fixes bounding each interpolated fix reaching the area
+      fix_times = np.unique(times.values.astype('datetime64[ns]'))
+      reach_times = reaching.index.values[reaching.values].astype('datetime64[ns]')
+      after = np.clip(np.searchsorted(fix_times, reach_times, side='left'), 0, len(fix_times) - 1)
+      before = np.clip(np.searchsorted(fix_times, reach_times, side='right') - 1, 0, len(fix_times) - 1)
+      kept = np.union1d(fix_times[after], fix_times[before])
+
+  filtered = trackdata[times.isin(kept).values]
+  print('{} of {} fixes reach the area....'.format(filtered['YYYYMMDDHH'].nunique(), trackdata['YYYYMMDDHH'].nunique()))
+  return filtered
 
 
 def calculate_distances(lat_array, lon_array, lat_point, lon_point):
@@ -64,14 +147,161 @@ def calculate_distances(lat_array, lon_array, lat_point, lon_point):
   Returns:
   - Array of distances between each point in the array and the single point (in kilometers)
   """
+  # Imported here, geopy is only needed by the geodesic reference engine
+  from geopy.distance import geodesic
+
   coord_array = list(zip(lat_array, lon_array))
   coord_point = (lat_point, lon_point)
   return np.array([geodesic(coord, coord_point).meters for coord in coord_array])
 
 
-def generate_swath_data(df, area, grid_resolution):
+def rad34_radii(df):
+  """
+  Returns the largest 34-kt wind radius of the RAD1-RAD4 quadrants for every row of the track data.
+
+  B-deck files hold one row per wind intensity (34, 50, 64 knots) and fix, so the radii of
+  the 34-kt row are assigned to all rows of the same timestamp. Fixes without 34-kt winds get 0.
+
+  Parameters:
+    - df (DataFrame): Converted track data with YYYYMMDDHH, RAD and RAD1-RAD4 [meter] columns.
+
+  Returns:
+    - 1D array: 34-kt wind radius, meter.
+  """
+  radius = df[['RAD1', 'RAD2', 'RAD3', 'RAD4']].max(axis=1).where(np.isclose(df['RAD'], RAD34), 0.0)
+  return radius.groupby(df['YYYYMMDDHH']).transform('max').values.astype(float)
+
+
+@instrumentation.stage('prefilter_track')
+def prefilter_track(trackdata, area, track_filter=None, swath_options=None):
+  """
+  Applies `filter_track_near_area` as configured by the `track_filter` and `swath` sections of the configuration.
+
+  The influence radius is derived for the swath `wind_threshold` when set, so that the swath is identical with
+  and without the filter, and for the `track_filter` threshold (34 knots by default) otherwise.
+
+  Parameters:
+    - trackdata (DataFrame): Converted track data.
+    - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+    - track_filter (dict): `enabled` (True by default), `wind_threshold` [m/s] and `buffer` [meter].
+    - swath_options (dict): Options of `generate_swath_data`.
+
+  Returns:
+    - DataFrame: Filtered track data, or the track data itself if the filter is disabled.
+  """
+  track_filter = track_filter or {}
+  swath_options = swath_options or {}
+  if not track_filter.get('enabled', True):
+      return trackdata
+
+  wind_threshold = swath_options.get('wind_threshold')
+  if wind_threshold is None:
+      wind_threshold = track_filter.get('wind_threshold') or RAD34
+  return filter_track_near_area(trackdata, area, wind_threshold,
+                                buffer=track_filter.get('buffer') or 0.0,
+                                time_step=swath_options.get('time_step'),
+                                influence_radius=swath_options.get('influence_radius', 'profile'),
+                                wind_model=swath_options.get('wind_model', wind_models.DEFAULT_WIND_MODEL),
+                                model_params=swath_options.get('model_params'),
+                                asymmetric=swath_options.get('asymmetric', False))
+
+
+def interpolate_track(df, time_step):
+  """
+  Interpolates the track data linearly in time to a regular time step. The original fixes are kept.
+
+  Rows of the same timestamp are reduced to one fix, preferring the row holding the 34-kt wind radii.
+  Latitude, longitude, VMAX, RMW and, if present, RAD1-RAD4, DIR and SPEED are interpolated; RAD is set to 34 knots.
+
+  Parameters:
+    - df (DataFrame): Converted track data with YYYYMMDDHH, LATN/S, LONE/W, VMAX and RMW columns.
+    - time_step (str or Timedelta): Time step, e.g. `15min` or `1h`.
+
+  Returns:
+    - DataFrame: Interpolated track data.
+  """
+  time_step = pd.Timedelta(time_step)
+  if time_step <= pd.Timedelta(0):
+      raise ValueError('Time step must be positive, got {}.'.format(time_step))
+
+  track = df.assign(YYYYMMDDHH=pd.to_datetime(df['YYYYMMDDHH']))
+  if 'RAD' in track:
+      track = track.assign(_is_rad34=~np.isclose(track['RAD'], RAD34)).sort_values(['YYYYMMDDHH', '_is_rad34'], kind='stable')
+  track = track.drop_duplicates(subset='YYYYMMDDHH').sort_values('YYYYMMDDHH')
+
+  times = track['YYYYMMDDHH'].values.astype('datetime64[ns]').astype(np.int64)
+  # Regular steps, keeping the original (possibly off-synoptic) fixes
+  new_times = np.union1d(np.arange(times[0], times[-1] + 1, time_step.value, dtype=np.int64), times)
+
+  columns = [c for c in ['LATN/S', 'LONE/W', 'VMAX', 'RMW', 'RAD1', 'RAD2', 'RAD3', 'RAD4', 'DIR', 'SPEED']
+             if c in track]
+  interpolated = {'YYYYMMDDHH': pd.to_datetime(new_times)}
+  for column in columns:
+      values = track[column].values.astype(float)
+      if column == 'LONE/W' and np.any(np.abs(np.diff(values)) > 180.0):
+          # Interpolate across the antimeridian along the shortest path
+          values = np.unwrap(values, period=360.0)
+          interpolated[column] = (np.interp(new_times, times, values) + 180.0) % 360.0 - 180.0
+      elif column == 'DIR' and np.any(np.abs(np.diff(values)) > 180.0):
+          # Turn through north along the shortest path
+          interpolated[column] = np.interp(new_times, times, np.unwrap(values, period=360.0)) % 360.0
+      else:
+          interpolated[column] = np.interp(new_times, times, values)
+  if 'RAD' in track:
+      interpolated['RAD'] = RAD34
+  return pd.DataFrame(interpolated)
+
+
+def track_fixes(df, wind_threshold=None, influence_radius='profile', wind_model=wind_models.DEFAULT_WIND_MODEL,
+                model_params=None, asymmetric=False):
+  """
+  Extracts the fixes evaluated by the swath engine from the track data.
+
+  Rows of the same fix at different wind intensities (34, 50, 64 knots) yield the same wind field
+  and are reduced to one fix.
+
+  Parameters:
+    - df (DataFrame): Converted track data.
+    - wind_threshold (float): Optional wind speed threshold, m/s, the influence radius is derived for.
+    - influence_radius (str): `profile` or `rad34`, see `generate_swath_data`.
+    - wind_model (str): Wind model the `profile` influence radius is derived from, see `wind_models`.
+    - model_params (dict): Optional parameters of the wind model.
+    - asymmetric (bool): Add the parameters of the asymmetric field (see `asymmetry.asymmetric_parameters`).
+
+  Returns:
+    - DataFrame: YYYYMMDDHH (if present), LATN/S, LONE/W, VMAX, RMW, with `asymmetric` VMAX_SYM, UT, VT and
+                 SCALE1-SCALE4, and, with a threshold, RADIUS [meter] columns.
+  """
+  columns = [c for c in ['YYYYMMDDHH', 'LATN/S', 'LONE/W', 'VMAX', 'RMW'] if c in df]
+  fixes = df[columns].astype({c: float for c in ['LATN/S', 'LONE/W', 'VMAX', 'RMW']})
+  if asymmetric:
+      fixes = pd.concat([fixes, asymmetry.asymmetric_parameters(df, wind_model, model_params)], axis=1)
+
+  if wind_threshold is not None:
+      if asymmetric:
+          scales = fixes[['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4']].values
+          fixes['RADIUS'] = asymmetry.asymmetric_influence_radius(fixes['RMW'].values, fixes['VMAX_SYM'].values,
+                                                                  fixes['UT'].values, fixes['VT'].values, scales,
+                                                                  wind_threshold, wind_model, model_params)
+      elif influence_radius == 'profile':
+          fixes['RADIUS'] = wind_models.influence_radius(wind_model, fixes['RMW'].values, fixes['VMAX'].values,
+                                                         wind_threshold, **(model_params or {}))
+      elif influence_radius == 'rad34':
+          fixes['RADIUS'] = rad34_radii(df)
+      else:
+          raise ValueError("Unknown influence radius `{}`. Use `profile` or `rad34`.".format(influence_radius))
+
+  return fixes.drop_duplicates().reset_index(drop=True)
+
+
+@instrumentation.stage('generate_swath_data')
+def generate_swath_data(df, area, grid_resolution, engine='vectorized', tile_size=None, out_file=None,
+                        wind_threshold=None, influence_radius='profile', workers=1, time_step=None, cache=None,
+                        nc_file=None, nc_options=None, wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None,
+                        asymmetric=False, geometry_dir=None, export_files=None, export_options=None, dtype='float64'):
     """
     Generates a wind intensity swath based on the provided b-deck data in a given area.
+     The returned grids are read-only views which do not allocate memory of their own.
 
     Parameters:
       #/      - lats (1D array): Latitude, degrees.
@@ -81,20 +311,176 @@ def generate_swath_data(df, area, grid_resolution):
       - df (DataFrame): Time series of wind speed data containing latitude, longitude, maximum wind speed and radius of maximum wind values.
       - area (dict): Geographic area of interest for swath. Usually, latitude max, min, and longitude max, min values.
       - grid_resolution (float): Grid resolution, 0.1 by default.
+      - engine (str): `vectorized` (default) evaluates the swath with array operations over haversine distances,
+                      `geodesic` is the per-point geodesic reference. Both agree within
+                      `swath_engine.SWATH_RELATIVE_TOLERANCE`.
+      - tile_size (int or tuple): Enables the tiled mode of the `vectorized` engine. The grid is split into tiles
+                      of `tile_size` x `tile_size` cells (or a (lon, lat) tile shape) evaluated one at a time,
+                      so that peak memory depends on the tile size rather than the grid size.
+      - out_file (str): Optional `.npy` file the swath is memory-mapped to instead of being held in memory.
+      - wind_threshold (float): Enables spatial pruning of the `vectorized` engine, m/s. Each fix only touches
+                      the grid cells inside its influence radius and wind speeds below the threshold,
+                      including all skipped cells, are reported as 0.
+      - influence_radius (str): How the influence radius of each fix is derived when pruning:
+                      `profile` (default) from VMAX, RMW and `wind_threshold` with the wind model,
+                      `rad34` from the largest of the b-deck RAD1-RAD4 34-kt wind radii.
+      - workers (int): Number of processes the `vectorized` engine splits the grid tiles across, 1 by default.
+                      The result matches the serial one.
+      - time_step (str or Timedelta): Optional time step, e.g. `15min`, the track is interpolated to before
+                      building the swath (see `interpolate_track`), to close the gaps between 6-hourly fixes.
+      - cache (ProductCache): Optional cache of the swath, keyed on the track data and the parameters which
+                      affect the result. A hit returns the cached swath memory-mapped read-only.
+      - nc_file (str): Optional NetCDF file the swath is written to as the engine produces it.
+      - nc_options (dict): Options of `SwathNetCDFWriter`, e.g. `per_fix` to stream the wind field of every fix,
+                      `chunks`, `complevel` and `shuffle`.
+      - wind_model (str): Wind profile model, `jelesnianski` (default), `holland1980`, `willoughby` or `rankine`
+                      (see `wind_models`).
+      - model_params (dict): Optional parameters of the wind model, e.g. `{'b': 1.8}` for `holland1980`.
+      - asymmetric (bool): Asymmetric field of the `vectorized` engine, adding the storm translation and fitting
+                      the profile to the RAD1-RAD4 quadrant radii of each fix (see `asymmetry`). The influence
+                      radius used for pruning is then derived from the fitted field.
+      - geometry_dir (str): Optional directory the grid geometry (see `grid_geometry.GridGeometry`) is saved to
+                      on the first run over an area and resolution and memory-mapped from on the next ones.
+      - export_files (list): Optional `.tif` (cloud-optimized GeoTIFF) and `.zarr` paths the swath is exported
+                      to tile by tile as it is computed (see `save_to_raster`). The tiles are aligned with the
+                      export blocks; together with `out_file` the swath is never held in memory as a whole.
+      - export_options (dict): Options of `save_to_raster.open_swath_writer`, e.g. `block_size`, `compress`.
+      - dtype (str): Precision of the `vectorized` engine and of the swath, `float64` (default) or `float32`,
+                      which halves the memory of the distance and wind arrays and of the swath. The float32 swath
+                      stays within `swath_engine.FLOAT32_WIND_TOLERANCE` of the float64 one.
 
     Returns:
       - ndarray: Wind intensity swath.
     """
     print('Swath generation started....')
 
-    data = df[['LATN/S', 'LONE/W', 'VMAX', 'RMW']].values
-    lats, lons, vmax, rmw = data[:,0], data[:,1], data[:,2], data[:,3]
-
     # A grid over Puerto Rico
-    grid_lat, grid_lon = np.meshgrid(np.arange(area['lat_min'], area['lat_max'] + grid_resolution, grid_resolution),
-                                      np.arange(area['lon_min'], area['lon_max'] + grid_resolution, grid_resolution)
-                                      )
+    geometry = get_grid_geometry(area, grid_resolution, geometry_dir)
+    lat_axis, lon_axis = geometry.lat_axis, geometry.lon_axis
+    grid_lat, grid_lon = geometry.grids()
+
+    nc_options = dict(nc_options or {})
+    # Options are checked before any output is opened, so that a rejected call leaves no partial file
+    if engine == 'geodesic':
+        if tile_size is not None or out_file is not None or wind_threshold is not None or (workers or 1) > 1 \
+                or nc_options.get('per_fix') or asymmetric or np.dtype(dtype) != np.float64:
+            raise ValueError("Tiled mode, `out_file`, pruning, workers, per-fix output, the asymmetric field and "
+                             "float32 precision are only supported by the `vectorized` engine.")
+    elif engine != 'vectorized':
+        raise ValueError("Unknown swath engine `{}`. Use `vectorized` or `geodesic`.".format(engine))
+    elif nc_options.get('per_fix') and (workers or 1) > 1:
+        raise ValueError('Per-fix output is not supported with several workers.')
+
+    if cache is not None:
+        swath_key = cache.key('swath', [hash_frame(df)], {'area': area,
+                                                          'grid_resolution': grid_resolution,
+                                                          'engine': engine,
+                                                          'wind_threshold': wind_threshold,
+                                                          'influence_radius': influence_radius,
+                                                          'time_step': time_step,
+                                                          'wind_model': wind_model,
+                                                          'model_params': model_params,
+                                                          'asymmetric': asymmetric,
+                                                          'dtype': str(np.dtype(dtype))})
+
+    if time_step is not None:
+        df = interpolate_track(df, time_step)
+
+    model_params = model_params or {}
+    fixes = track_fixes(df, wind_threshold, influence_radius, wind_model, model_params, asymmetric)
+
+    # Per-fix fields are not cached, they have to be streamed by the engine
+    if cache is not None and not nc_options.get('per_fix'):
+        swath_of_max_wind_speed = cache.get_array(swath_key)
+        if swath_of_max_wind_speed is not None:
+            print('Swath loaded from cache....')
+            if out_file is not None:
+                out = swath_engine.allocate_swath(swath_of_max_wind_speed.shape, out_file,
+                                                  swath_of_max_wind_speed.dtype)
+                out[:] = swath_of_max_wind_speed
+                out.flush()
+                swath_of_max_wind_speed = out
+            if nc_file is not None:
+                with SwathNetCDFWriter(nc_file, lat_axis, lon_axis, fixes['YYYYMMDDHH'],
+                                       **dict(nc_options, per_fix=False)) as writer:
+                    writer.write_max(swath_of_max_wind_speed)
+            for export_file in export_files or []:
+                export_swath(swath_of_max_wind_speed, grid_lon, grid_lat, export_file, **(export_options or {}))
+            return swath_of_max_wind_speed, grid_lat, grid_lon
+
+    lats, lons, vmax, rmw = (fixes[c].values for c in ['LATN/S', 'LONE/W', 'VMAX', 'RMW'])
+    radii = fixes['RADIUS'].values if 'RADIUS' in fixes else None
+    fix_asymmetry = None
+    if asymmetric:
+        vmax = fixes['VMAX_SYM'].values
+        fix_asymmetry = (fixes[['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4']].values, fixes['UT'].values,
+                         fixes['VT'].values)
+
+    instrumentation.count('fixes_evaluated', len(lats))
+    instrumentation.count('cells_touched', swath_engine.touched_cells(lat_axis, lon_axis, lats, lons, radii))
+
+    writer = None
+    if nc_file is not None:
+        writer = SwathNetCDFWriter(nc_file, lat_axis, lon_axis, fixes['YYYYMMDDHH'], **nc_options)
+
+    exporters = []
+    tile_callback = None
+    if export_files:
+        export_options = export_options or {}
+        exporters = [open_swath_writer(f, lat_axis, lon_axis, **export_options) for f in export_files]
+        if tile_size is None and engine == 'vectorized':
+            # Engine tiles aligned with the blocks of the exports
+            block_size = export_options.get('block_size', DEFAULT_BLOCK_SIZE)
+            tile_size = block_size * max(1, swath_engine.DEFAULT_TILE_SIZE // block_size)
+
+        def tile_callback(lon_slice, lat_slice, block):
+            for exporter in exporters:
+                exporter.write_tile(lon_slice, lat_slice, block)
+
+    try:
+        if engine == 'vectorized':
+            fix_callback = writer.write_fix if writer is not None and writer.fix_var is not None else None
+            swath_of_max_wind_speed = swath_engine.compute_swath(lat_axis, lon_axis, lats, lons, vmax, rmw,
+                                                                 tile_size=tile_size, out_file=out_file,
+                                                                 radii=radii, wind_threshold=wind_threshold,
+                                                                 workers=workers, fix_callback=fix_callback,
+                                                                 profile=wind_models.wind_profile(wind_model,
+                                                                                                  **model_params),
+                                                                 asymmetry=fix_asymmetry, tile_callback=tile_callback,
+                                                                 dtype=dtype, geometry=geometry)
+        else:
+            reference = partial(wind_models.get_wind_model(wind_model).reference, **model_params)
+            swath_of_max_wind_speed = _generate_swath_geodesic(grid_lat, grid_lon, lats, lons, vmax, rmw, reference)
+            if tile_callback is not None:
+                tile_callback(slice(None), slice(None), swath_of_max_wind_speed)
+
+        if writer is not None:
+            writer.write_max(swath_of_max_wind_speed)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        for exporter in exporters:
+            exporter.abort()
+        raise
+    else:
+        if writer is not None:
+            writer.close()
+        for exporter in exporters:
+            exporter.close()
+
+    if cache is not None:
+        swath_of_max_wind_speed = cache.put_array(swath_key, swath_of_max_wind_speed)
+
+    print('Swath generation finished....')
+
+    return swath_of_max_wind_speed, grid_lat, grid_lon
 
+
+def _generate_swath_geodesic(grid_lat, grid_lon, lats, lons, vmax, rmw,
+                             reference=calculate_gradient_wind_speed_jelesnianski):
+    """
+    Reference swath computed point by point with geodesic distances and the scalar wind profile `reference`.
+    """
     # Initialize array for max wind speed
     swath_of_max_wind_speed = np.zeros_like(grid_lat)
 
@@ -103,13 +489,85 @@ def generate_swath_data(df, area, grid_resolution):
 
         # Calculate distances from the current point to each grid point
         r_distances = calculate_distances(grid_lat.flatten(), grid_lon.flatten(), lat, lon)
-        
+
         # Calculate the gradient wind speed for each grid point
-        vg_values = np.vectorize(lambda r: calculate_gradient_wind_speed_jelesnianski(r, rmax, vmax))(r_distances.reshape(grid_lat.shape))
-        
+        vg_values = np.vectorize(lambda r: reference(r, rmax, vmax))(r_distances.reshape(grid_lat.shape))
+
         # Update the swath_max_wind_speed array with the maximum values
         swath_of_max_wind_speed = np.maximum(swath_of_max_wind_speed, vg_values)
-    
-    print('Swath generation finished....')
-    
-    return swath_of_max_wind_speed, grid_lat, grid_lon
\ No newline at end of file
+
+    return swath_of_max_wind_speed
+
+
+@instrumentation.stage('update_swath_data')
+def update_swath_data(df, area, grid_resolution, state_file, **swath_options):
+    """
+    Updates a persisted swath with the fixes appended to the b-deck since the previous run.
+
+    The state file holds the swath of maximum wind speed together with the last processed timestamp.
+    Since the swath is a running maximum, only the new rows are evaluated and folded into it, so that
+    the update cost does not grow with the number of fixes since genesis. The swath is recomputed
+    from scratch if the state is missing, was built with other parameters, or if already processed
+    rows have been revised. The asymmetric field is always recomputed: the storm motion of a fix is derived
+    from its neighbours, so new fixes change the field of the processed ones.
+
+    Parameters:
+      - df (DataFrame): Converted track data, including the rows processed by previous runs.
+      - area (dict): Geographic area of interest for swath.
+      - grid_resolution (float): Grid resolution.
+      - state_file (str): Path to the `.npz` state file, created if missing.
+      - swath_options: Further options of `generate_swath_data`.
+
+    Returns:
+      - ndarray: Wind intensity swath.
+      - grid_lat, grid_lon (ndarray): Latitude and longitude grids.
+    """
+    swath_options.pop('cache', None)
+    timestamps = pd.to_datetime(df['YYYYMMDDHH'])
+    signature = json.dumps({'area': area, 'grid_resolution': grid_resolution,
+                            'options': {k: v for k, v in swath_options.items()
+                                        if k not in ('workers', 'tile_size', 'out_file', 'geometry_dir')}},
+                           sort_keys=True, default=str)
+
+    state = None
+    if os.path.exists(state_file):
+        with np.load(state_file) as saved:
+            state = {name: saved[name] for name in saved.files}
+        last_timestamp = pd.Timestamp(state['last_timestamp'].item())
+        processed = df[(timestamps <= last_timestamp).values]
+        if str(state['signature']) != signature or str(state['processed_hash']) != hash_frame(processed):
+            print('Swath state {} is outdated, the swath is recomputed....'.format(state_file))
+            state = None
+        elif swath_options.get('asymmetric'):
+            print('Asymmetric swath {} is recomputed with the new rows....'.format(state_file))
+            state = None
+
+    if state is None:
+        new_rows = df
+    else:
+        is_new = (timestamps > last_timestamp).to_numpy(copy=True)
+        print('Swath update with {} new rows since {}....'.format(is_new.sum(), last_timestamp))
+        if swath_options.get('time_step') is not None and is_new.any():
+            # The last processed fix anchors the interpolation towards the new ones
+            is_new |= (timestamps == timestamps[~is_new].max()).to_numpy()
+        new_rows = df[is_new]
+
+    grid_lat, grid_lon = get_grid_geometry(area, grid_resolution, swath_options.get('geometry_dir')).grids()
+    if len(new_rows) == 0:
+        swath_of_max_wind_speed = state['swath']
+    else:
+        swath_of_max_wind_speed, grid_lat, grid_lon = generate_swath_data(new_rows, area, grid_resolution,
+                                                                          **swath_options)
+        if state is not None:
+            swath_of_max_wind_speed = np.maximum(state['swath'], swath_of_max_wind_speed)
+
+    # Persist atomically, so that an interrupted run keeps the previous state
+    tmp_file = state_file + '.tmp.npz'
+    np.savez(tmp_file,
+             swath=swath_of_max_wind_speed,
+             last_timestamp=np.int64(timestamps.max().value),
+             signature=signature,
+             processed_hash=hash_frame(df))
+    os.replace(tmp_file, state_file)
+
+    return swath_of_max_wind_speed, grid_lat, grid_lon
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+
+"""
+Monte Carlo ensemble of perturbed tracks reduced to exceedance probabilities and percentiles of the swath.
+
+The members are copies of the track with jittered position, maximum wind and radius of maximum wind. They
+are evaluated together: the fixes of all members are stacked into one batch per grid tile, so that the
+distances and the wind profile are computed as one array operation on the shared grid geometry, and the
+per-member maxima of a tile are reduced to the ensemble statistics before the next tile is computed.
+Only one tile of member swaths is ever held in memory, never N full swaths.
+"""
+
+import numpy as np
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.convert as convert
+import src.raincoat_takehome_science.data.wind_models as wind_models
+from src.raincoat_takehome_science.data.data_processor import interpolate_track, track_fixes
+from src.raincoat_takehome_science.data.grid_geometry import get_grid_geometry
+from src.raincoat_takehome_science.data.save_to_netcdf import SwathNetCDFWriter
+
+# 34, 50 and 64 knots, m/s
+DEFAULT_THRESHOLDS = [convert.speed_knots_2_ms(34), convert.speed_knots_2_ms(50), convert.speed_knots_2_ms(64)]
+
+DEFAULT_PERCENTILES = [10, 50, 90]
+
+# Standard deviation of the perturbations: position offset [meter], VMAX and RMW log-scale factors
+DEFAULT_POSITION_SIGMA = 50_000.0
+DEFAULT_VMAX_SIGMA = 0.1
+DEFAULT_RMW_SIGMA = 0.25
+
+
+def perturb_track(df, n_members, position_sigma=DEFAULT_POSITION_SIGMA, vmax_sigma=DEFAULT_VMAX_SIGMA,
+                  rmw_sigma=DEFAULT_RMW_SIGMA, seed=None):
+    """
+    Generates perturbed copies of a converted track.
+
+    Member 0 is the unperturbed control. Every other member shifts the whole track by a random east and north
+    offset of standard deviation `position_sigma` and scales VMAX and RMW by log-normal factors, so that the
+    perturbed tracks stay as smooth as the original one and VMAX and RMW stay positive.
+
+    Parameters:
+        - df (DataFrame): Converted track data with LATN/S, LONE/W, VMAX [m/s] and RMW [meter] columns.
+        - n_members (int): Number of members, the control included.
+        - position_sigma (float): Standard deviation of the east and north offsets, meter.
+        - vmax_sigma, rmw_sigma (float): Standard deviation of the log of the VMAX and RMW factors.
+        - seed (int): Optional random seed.
+
+    Returns:
+        - DataFrame: The rows of `df` repeated for each member, with a leading MEMBER column, ordered by member.
+    """
+    if n_members < 1:
+        raise ValueError('At least one ensemble member is required, got {}.'.format(n_members))
+    rng = np.random.default_rng(seed)
+    shape = (n_members, 1)
+    east, north = rng.normal(0.0, position_sigma, shape), rng.normal(0.0, position_sigma, shape)
+    vmax_factor, rmw_factor = np.exp(rng.normal(0.0, vmax_sigma, shape)), np.exp(rng.normal(0.0, rmw_sigma, shape))
+    east[0], north[0], vmax_factor[0], rmw_factor[0] = 0.0, 0.0, 1.0, 1.0
+
+    lats = df['LATN/S'].values.astype(float)[np.newaxis, :]
+    meters_per_degree = np.radians(1.0) * swath_engine.EARTH_RADIUS
+    perturbed_lats = np.clip(lats + north / meters_per_degree, -89.0, 89.0)
+    perturbed_lons = df['LONE/W'].values.astype(float)[np.newaxis, :] + \
+        east / (meters_per_degree * np.cos(np.radians(lats)))
+
+    members = pd.concat([df] * n_members, ignore_index=True)
+    members.insert(0, 'MEMBER', np.repeat(np.arange(n_members), len(df)))
+    members['LATN/S'] = perturbed_lats.ravel()
+    members['LONE/W'] = (perturbed_lons.ravel() + 180.0) % 360.0 - 180.0
+    members['VMAX'] = (df['VMAX'].values.astype(float)[np.newaxis, :] * vmax_factor).ravel()
+    members['RMW'] = (df['RMW'].values.astype(float)[np.newaxis, :] * rmw_factor).ravel()
+    return members
+
+
+def ensemble_tile(terms, lats, lons, vmax, rmax, profile):
+    """
+    Calculates the swath of every member on a grid tile.
+
+    The (member, fix) pairs are flattened into one batch dimension evaluated in chunks bounded by
+    `swath_engine.MAX_BLOCK_ELEMENTS`; the fixes of each member are reduced with `np.maximum.reduceat`.
+
+    Parameters:
+        - terms (dict): Axis terms of the tile (see `GridGeometry.terms`).
+        - lats, lons, vmax, rmax (2D array): Fixes of the members, shape (member, fix).
+        - profile (callable): Wind profile `profile(r, rmax, vmax)`.
+
+    Returns:
+        - ndarray: Swaths of shape (member, lon, lat), m/s.
+    """
+    n_members, n_fixes = lats.shape
+    n_lon, n_lat = len(terms['sin_half_lon']), len(terms['sin_half_lat'])
+    lats, lons, vmax, rmax = (np.ravel(a) for a in (lats, lons, vmax, rmax))
+    out = np.zeros((n_members, n_lon, n_lat))
+
+    batch = swath_engine.fix_batch_size(n_lon * n_lat)
+    for start in range(0, len(lats), batch):
+        stop = min(start + batch, len(lats))
+        r = swath_engine.distances_from_terms(terms, lats[start:stop], lons[start:stop])
+        vg = profile(r, rmax[start:stop, np.newaxis, np.newaxis], vmax[start:stop, np.newaxis, np.newaxis])
+        # Offsets of the first fix of each member within the batch
+        members = np.arange(start // n_fixes, (stop - 1) // n_fixes + 1)
+        offsets = np.maximum(members * n_fixes, start) - start
+        out[members] = np.maximum(out[members], np.maximum.reduceat(vg, offsets, axis=0))
+    return out
+
+
+def ensemble_statistics(member_swaths, thresholds, percentiles):
+    """
+    Reduces member swaths to the probability of exceeding each threshold and to percentiles.
+
+    Returns:
+        - probability (ndarray): Fraction of the members above each threshold, shape (threshold, lon, lat).
+        - percentile (ndarray): Wind speed percentiles, shape (percentile, lon, lat), m/s.
+    """
+    probability = np.stack([(member_swaths >= t).mean(axis=0) for t in thresholds]) if len(thresholds) else \
+        np.zeros((0,) + member_swaths.shape[1:])
+    percentile = np.percentile(member_swaths, percentiles, axis=0) if len(percentiles) else \
+        np.zeros((0,) + member_swaths.shape[1:])
+    return probability, percentile
+
+
+@instrumentation.stage('generate_ensemble_data')
+def generate_ensemble_data(df, area, grid_resolution, n_members=100, thresholds=DEFAULT_THRESHOLDS,
+                           percentiles=DEFAULT_PERCENTILES, position_sigma=DEFAULT_POSITION_SIGMA,
+                           vmax_sigma=DEFAULT_VMAX_SIGMA, rmw_sigma=DEFAULT_RMW_SIGMA, seed=None, time_step=None,
+                           tile_size=None, wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None,
+                           geometry_dir=None, nc_file=None, nc_options=None):
+    """
+    Generates the ensemble statistics of the swath of a storm from perturbed copies of its track.
+
+    Tiles of the grid are evaluated one at a time for all members at once (see `ensemble_tile`) and reduced
+    to exceedance probabilities and percentiles as they are computed, so that memory depends on the number of
+    members times the tile size, not on the number of members times the grid size.
+
+    Parameters:
+        - df (DataFrame): Converted track data.
+        - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+        - grid_resolution (float): Grid resolution, degrees.
+        - n_members (int): Number of members, the unperturbed control included (see `perturb_track`).
+        - thresholds (list): Wind speed thresholds of the exceedance probabilities, m/s.
+        - percentiles (list): Percentiles of the wind speed, 0-100.
+        - position_sigma, vmax_sigma, rmw_sigma (float): Perturbations, see `perturb_track`.
+        - seed (int): Optional random seed of the perturbations.
+        - time_step (str or Timedelta): Optional time step the track is interpolated to before perturbation.
+        - tile_size (int or tuple): Tile edge, grid cells. By default the tiles hold about
+                                    `swath_engine.MAX_BLOCK_ELEMENTS` member cells.
+        - wind_model (str): Wind profile model, see `wind_models`.
+        - model_params (dict): Optional parameters of the wind model.
+        - geometry_dir (str): Optional directory of the grid geometry, see `generate_swath_data`.
+        - nc_file (str): Optional NetCDF file the statistics and the control swath are written to, tile by tile.
+        - nc_options (dict): Options of `SwathNetCDFWriter`, e.g. `complevel`.
+
+    Returns:
+        - dict: `wind_speed` (control swath), `exceedance_probability` and `wind_speed_percentile`, with the grid
+                dimensions in (lon, lat) order.
+        - grid_lat, grid_lon (ndarray): Latitude and longitude grids.
+    """
+    print('Ensemble of {} members started....'.format(n_members))
+    thresholds, percentiles = [float(t) for t in thresholds], [float(q) for q in percentiles]
+    geometry = get_grid_geometry(area, grid_resolution, geometry_dir)
+    grid_lat, grid_lon = geometry.grids()
+    shape = geometry.shape
+
+    if time_step is not None:
+        df = interpolate_track(df, time_step)
+    fixes = track_fixes(df)
+    members = perturb_track(fixes, n_members, position_sigma, vmax_sigma, rmw_sigma, seed)
+    lats, lons, vmax, rmax = (members[c].values.reshape(n_members, len(fixes))
+                              for c in ['LATN/S', 'LONE/W', 'VMAX', 'RMW'])
+    profile = wind_models.wind_profile(wind_model, **(model_params or {}))
+    instrumentation.count('fixes_evaluated', lats.size)
+    instrumentation.count('cells_touched', lats.size * shape[0] * shape[1])
+
+    if tile_size is None:
+        tile_size = max(1, int(np.sqrt(swath_engine.MAX_BLOCK_ELEMENTS / n_members)))
+    result = {'wind_speed': np.zeros(shape),
+              'exceedance_probability': np.zeros((len(thresholds),) + shape),
+              'wind_speed_percentile': np.zeros((len(percentiles),) + shape)}
+
+    writer = None
+    if nc_file is not None:
+        nc_options = {k: v for k, v in (nc_options or {}).items() if k not in ('per_fix', 'chunks')}
+        writer = SwathNetCDFWriter(nc_file, geometry.lat_axis, geometry.lon_axis, fixes['YYYYMMDDHH'],
+                                   per_fix=False, **nc_options)
+    try:
+        if writer is not None:
+            writer.create_ensemble(n_members, thresholds, percentiles)
+        for rows, cols in swath_engine.iter_tiles(shape, tile_size):
+            member_swaths = ensemble_tile(geometry.terms(cols, rows), lats, lons, vmax, rmax, profile)
+            probability, percentile = ensemble_statistics(member_swaths, thresholds, percentiles)
+            result['wind_speed'][rows, cols] = member_swaths[0]
+            result['exceedance_probability'][:, rows, cols] = probability
+            result['wind_speed_percentile'][:, rows, cols] = percentile
+            if writer is not None:
+                writer.write_max(member_swaths[0], rows, cols)
+                writer.write_ensemble(probability, percentile, rows, cols)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    else:
+        if writer is not None:
+            writer.close()
+
+    print('Ensemble finished....')
+    return result, grid_lat, grid_lon
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+# from local lib
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+
+# WGS84 ellipsoid constants: semi-major axis [meter] and flattening
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+
+# Arrays of a grid geometry persisted as `.npy` files
+GEOMETRY_ARRAYS = ['lat_axis', 'lon_axis', 'lat', 'lon', 'sin_half_lat', 'cos_half_lat', 'sin_lat', 'cos_lat',
+                   'sin_half_lon', 'cos_half_lon']
+
+
+class GridGeometry:
+    """
+    Geometry of a regular latitude/longitude grid, built once per (area, resolution) and reused.
+
+    It holds the grid axes, the flattened cell coordinates in the `np.meshgrid(lat_axis, lon_axis)` layout and
+    the trigonometric terms of the axes (see `swath_engine.axis_terms`), so that distances and bearings to any fix
+    reduce to products of cached terms. Saved geometries are loaded as read-only memory maps, which lets every
+    process working on the same area share one copy through the page cache; a loaded geometry is pickled as its
+    directory, so that worker processes memory-map it too instead of receiving a copy. In memory, the flattened
+    cell coordinates are only materialized when they are first accessed.
+
+    Parameters:
+        - arrays (dict): Arrays named after `GEOMETRY_ARRAYS`, `lat` and `lon` being optional.
+        - constants (dict): Earth radius used for distances and the WGS84 ellipsoid constants.
+        - path (str): Directory the geometry was loaded from, if any.
+    """
+
+    def __init__(self, arrays, constants=None, path=None):
+        for name in GEOMETRY_ARRAYS:
+            if name not in ('lat', 'lon'):
+                setattr(self, name, arrays[name])
+        self._lat, self._lon = arrays.get('lat'), arrays.get('lon')
+        self.constants = constants or {'earth_radius': swath_engine.EARTH_RADIUS, 'wgs84_a': WGS84_A,
+                                       'wgs84_f': WGS84_F}
+        self.path = path
+
+    def __reduce__(self):
+        if self.path is not None:
+            return GridGeometry.load, (self.path,)
+        arrays = {name: getattr(self, name) for name in GEOMETRY_ARRAYS if name not in ('lat', 'lon')}
+        return GridGeometry, (arrays, self.constants)
+
+    @classmethod
+    def build(cls, area, grid_resolution, dtype='float64'):
+        """
+        Builds the geometry of a grid.
+
+        Parameters:
+            - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+            - grid_resolution (float): Grid resolution, degrees.
+            - dtype (str): `float64`, or `float32` to halve the size of the cell coordinates and terms. Distances
+                           from float32 terms stay within 1e-3 of the float64 ones beyond 1 km.
+
+        Returns:
+            - GridGeometry: Grid geometry.
+        """
+        lat_axis, lon_axis = swath_engine.build_grid_axes(area, grid_resolution)
+        arrays = {'lat_axis': np.array(lat_axis), 'lon_axis': np.array(lon_axis)}
+        arrays.update({name: values.astype(dtype) for name, values in
+                       swath_engine.axis_terms(lat_axis, lon_axis).items()})
+        return cls(arrays)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Loads a saved geometry, memory-mapped read-only by default.
+        """
+        with open(os.path.join(directory, 'constants.json')) as f:
+            constants = json.load(f)
+        return cls({name: np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode)
+                    for name in GEOMETRY_ARRAYS}, constants, directory if mmap_mode == 'r' else None)
+
+    def save(self, directory):
+        """
+        Saves the geometry as one `.npy` file per array. The directory is written atomically.
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+        try:
+            for name in GEOMETRY_ARRAYS:
+                np.save(os.path.join(tmp_dir, name + '.npy'), getattr(self, name))
+            with open(os.path.join(tmp_dir, 'constants.json'), 'w') as f:
+                json.dump(self.constants, f)
+            os.replace(tmp_dir, directory)
+        except OSError:
+            # Another process saved the same geometry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise
+
+    @property
+    def lat(self):
+        """
+        Latitude of the cells, flattened in (lon, lat) order, degrees.
+        """
+        if self._lat is None:
+            self._lat = np.tile(self.lat_axis, len(self.lon_axis)).astype(self.cos_lat.dtype)
+        return self._lat
+
+    @property
+    def lon(self):
+        """
+        Longitude of the cells, flattened in (lon, lat) order, degrees.
+        """
+        if self._lon is None:
+            self._lon = np.repeat(self.lon_axis, len(self.lat_axis)).astype(self.cos_lat.dtype)
+        return self._lon
+
+    @property
+    def shape(self):
+        """
+        Grid shape (lon, lat).
+        """
+        return len(self.lon_axis), len(self.lat_axis)
+
+    def grids(self):
+        """
+        Returns the (lon, lat) latitude and longitude grids, views of the saved cell coordinates or, in memory,
+        of the axes (like `np.meshgrid(lat_axis, lon_axis, copy=False)`).
+        """
+        if self._lat is None or self._lon is None:
+            return np.meshgrid(self.lat_axis, self.lon_axis, copy=False)
+        return self._lat.reshape(self.shape), self._lon.reshape(self.shape)
+
+    def terms(self, lat_slice=slice(None), lon_slice=slice(None)):
+        """
+        Returns the cached axis terms of a window of the grid (see `swath_engine.axis_terms`).
+        """
+        return {'sin_half_lat': self.sin_half_lat[lat_slice], 'cos_half_lat': self.cos_half_lat[lat_slice],
+                'sin_lat': self.sin_lat[lat_slice], 'cos_lat': self.cos_lat[lat_slice],
+                'sin_half_lon': self.sin_half_lon[lon_slice], 'cos_half_lon': self.cos_half_lon[lon_slice]}
+
+    def distances(self, lats, lons, lat_slice=slice(None), lon_slice=slice(None)):
+        """
+        Haversine distances between fixes and the cells of the grid, or of a window of it.
+
+        Returns:
+            - ndarray: Distances of shape (fix, lon, lat), meter.
+        """
+        return swath_engine.distances_from_terms(self.terms(lat_slice, lon_slice), np.atleast_1d(lats),
+                                                 np.atleast_1d(lons))
+
+    def azimuths(self, lats, lons, lat_slice=slice(None), lon_slice=slice(None)):
+        """
+        Sine and cosine of the bearings from fixes to the cells of the grid, or of a window of it.
+
+        Returns:
+            - sin_azimuth, cos_azimuth (ndarray): Shape (fix, lon, lat).
+        """
+        return swath_engine.azimuths_from_terms(self.terms(lat_slice, lon_slice), np.atleast_1d(lats),
+                                                np.atleast_1d(lons))
+
+
+def geometry_key(area, grid_resolution, dtype='float64'):
+    """
+    Returns the name a grid geometry is saved under.
+    """
+    params = json.dumps([[float(area[k]) for k in ['lat_min', 'lat_max', 'lon_min', 'lon_max']],
+                         float(grid_resolution), str(np.dtype(dtype))])
+    return 'grid-{}'.format(hashlib.sha256(params.encode()).hexdigest()[:32])
+
+
+def get_grid_geometry(area, grid_resolution, directory=None, dtype='float64'):
+    """
+    Returns the geometry of a grid, built at most once per process and, with a directory, once across runs.
+
+    Parameters:
+        - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+        - grid_resolution (float): Grid resolution, degrees.
+        - directory (str): Optional directory the geometry is saved to and memory-mapped from.
+        - dtype (str): `float64` or `float32`, see `GridGeometry.build`.
+
+    Returns:
+        - GridGeometry: Grid geometry, read-only.
+    """
+    return _get_grid_geometry(tuple(float(area[k]) for k in ['lat_min', 'lat_max', 'lon_min', 'lon_max']),
+                              float(grid_resolution), directory, str(np.dtype(dtype)))
+
+
+@lru_cache(maxsize=16)
+def _get_grid_geometry(bounds, grid_resolution, directory, dtype):
+    area = dict(zip(['lat_min', 'lat_max', 'lon_min', 'lon_max'], bounds))
+    if directory is None:
+        geometry = GridGeometry.build(area, grid_resolution, dtype)
+        for name in GEOMETRY_ARRAYS:
+            if name not in ('lat', 'lon'):
+                getattr(geometry, name).flags.writeable = False
+        return geometry
+
+    path = os.path.join(directory, geometry_key(area, grid_resolution, dtype))
+    if not os.path.isdir(path):
+        GridGeometry.build(area, grid_resolution, dtype).save(path)
+        print('Grid geometry saved in {}....'.format(path))
+    return GridGeometry.load(path)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+
+"""
+Lazy, out-of-core swath on chunked xarray/dask arrays.
+
+The swath is a blockwise task graph over the chunks of the grid axes: the task of a (lat, lon) chunk evaluates
+`swath_engine.swath_block` on the axes of the chunk only, so that nothing grid-sized is built when the graph
+is created. Writing the swath to NetCDF or Zarr computes the chunks on the local threaded, process or
+synchronous scheduler and stores each one as soon as it is done, which lets a grid larger than the memory be
+computed on a single machine. xarray and dask are optional dependencies, imported by the functions using them.
+"""
+
+import os
+
+import numpy as np
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.wind_models as wind_models
+from src.raincoat_takehome_science.data.data_processor import interpolate_track, track_fixes
+
+# Edge of the chunks of the lazy swath, grid cells
+DEFAULT_CHUNK_SIZE = 1024
+
+# Options of `generate_swath_data` supported by the lazy swath
+LAZY_SWATH_OPTIONS = ['wind_threshold', 'influence_radius', 'time_step', 'wind_model', 'model_params', 'asymmetric',
+                      'dtype']
+
+
+def _swath_chunk(lat_axis, lon_axis, fixes, wind_threshold, profile, precision):
+    """
+    Calculates one (lat, lon) chunk of the swath in the `precision` dtype of the engine. Task of the blockwise
+    graph of `lazy_swath`.
+    """
+    lats, lons, vmax, rmax, radii, asymmetry = fixes
+    block = swath_engine.swath_block(lat_axis, lon_axis, lats, lons, vmax, rmax, radii=radii,
+                                     wind_threshold=wind_threshold, profile=profile, asymmetry=asymmetry,
+                                     dtype=precision)
+    return block.T.astype('float32', copy=False)
+
+
+def lazy_swath(df, area, grid_resolution, chunks=DEFAULT_CHUNK_SIZE, wind_threshold=None, influence_radius='profile',
+               time_step=None, wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None, asymmetric=False,
+               dtype='float64'):
+    """
+    Builds the swath of maximum wind speed as a lazy, chunked DataArray.
+
+    The options are those of `generate_swath_data`; each chunk gives the same values as the `vectorized` engine,
+    stored as float32 like the NetCDF output. With a `wind_threshold`, the fixes whose influence radius does not
+    reach a chunk are skipped by its task.
+
+    Parameters:
+        - df (DataFrame): Converted track data.
+        - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+        - grid_resolution (float): Grid resolution, degrees.
+        - chunks (int or tuple): Chunk edge, grid cells, or a (lat, lon) chunk shape.
+        - wind_threshold, influence_radius, time_step, wind_model, model_params, asymmetric, dtype: See
+          `generate_swath_data`. The stored swath is float32 in both precisions.
+
+    Returns:
+        - DataArray: `wind_speed` of dimensions (lat, lon), backed by a dask array.
+    """
+    # Imported here, xarray and dask are optional dependencies of the lazy backend
+    import dask.array as da
+    import xarray as xr
+
+    lat_axis, lon_axis = swath_engine.build_grid_axes(area, grid_resolution)
+    lat_chunk, lon_chunk = (chunks, chunks) if np.isscalar(chunks) else chunks
+
+    if time_step is not None:
+        df = interpolate_track(df, time_step)
+    model_params = model_params or {}
+    fixes = track_fixes(df, wind_threshold, influence_radius, wind_model, model_params, asymmetric)
+    vmax = fixes['VMAX_SYM' if asymmetric else 'VMAX'].values
+    fix_asymmetry = None
+    if asymmetric:
+        fix_asymmetry = (fixes[['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4']].values, fixes['UT'].values,
+                         fixes['VT'].values)
+    fix_arrays = (fixes['LATN/S'].values, fixes['LONE/W'].values, vmax, fixes['RMW'].values,
+                  fixes['RADIUS'].values if 'RADIUS' in fixes else None, fix_asymmetry)
+    instrumentation.count('fixes_evaluated', len(fixes))
+
+    lat_chunks = da.from_array(np.array(lat_axis), chunks=lat_chunk, name=False)
+    lon_chunks = da.from_array(np.array(lon_axis), chunks=lon_chunk, name=False)
+    data = da.blockwise(_swath_chunk, 'ij', lat_chunks, 'i', lon_chunks, 'j', dtype='float32',
+                        fixes=fix_arrays, wind_threshold=wind_threshold,
+                        profile=wind_models.wind_profile(wind_model, **model_params), precision=dtype)
+
+    return xr.DataArray(data, dims=('lat', 'lon'), name='wind_speed',
+                        coords={'lat': ('lat', np.asarray(lat_axis, dtype='float32'), {'units': 'degrees_north'}),
+                                'lon': ('lon', np.asarray(lon_axis, dtype='float32'), {'units': 'degrees_east'})},
+                        attrs={'units': 'm s-1', 'long_name': 'Swath of maximum wind speed'})
+
+
+def write_lazy_swath(swath, to_file, scheduler='threads', workers=None, complevel=4, shuffle=True, zarr_format=2):
+    """
+    Computes a lazy swath chunk by chunk and streams it into a NetCDF file or a Zarr store.
+
+    Parameters:
+        - swath (DataArray): Swath as returned by `lazy_swath`.
+        - to_file (str): `.nc` file or `.zarr` store, replaced if it exists.
+        - scheduler (str): dask scheduler, `threads`, `processes` or `synchronous`.
+        - workers (int): Number of threads or processes, all CPUs by default.
+        - complevel (int): zlib compression level of the NetCDF variable, 0 disables compression.
+        - shuffle (bool): Apply the shuffle filter before the NetCDF compression.
+        - zarr_format (int): Zarr format of the store, 2 for the widest reader support.
+
+    Returns:
+        - str: Path to the output.
+    """
+    import dask
+
+    dataset = swath.to_dataset()
+    chunks = tuple(c[0] for c in swath.chunks)
+    with dask.config.set(scheduler=scheduler, num_workers=workers):
+        if to_file.rstrip('/').endswith('.zarr'):
+            dataset.to_zarr(to_file, mode='w', consolidated=True, zarr_format=zarr_format)
+        else:
+            encoding = {'wind_speed': {'zlib': complevel > 0, 'complevel': max(complevel, 1), 'shuffle': shuffle,
+                                       'chunksizes': chunks, 'dtype': 'f4'}}
+            if scheduler != 'processes':
+                dataset.to_netcdf(to_file, engine='netcdf4', encoding=encoding)
+            else:
+                # NetCDF handles cannot be shared with worker processes: the workers compute a row of chunks at
+                # a time, written by this process
+                import netCDF4 as nc
+
+                dataset.to_netcdf(to_file, engine='netcdf4', encoding=encoding, compute=False)
+                with nc.Dataset(to_file, 'a') as ncfile:
+                    start = 0
+                    for i, lat_chunk in enumerate(swath.chunks[0]):
+                        ncfile['wind_speed'][start:start + lat_chunk, :] = swath.data.blocks[i, :].compute()
+                        start += lat_chunk
+    instrumentation.count('cells_touched', len(swath.lat) * len(swath.lon))
+    instrumentation.count_bytes(to_file)
+    print('Lazy swath has been written to {}....'.format(to_file))
+    return to_file
+
+
+def export_lazy_swath(swath, to_file, scheduler='threads', workers=None, **export_options):
+    """
+    Computes a lazy swath a row of chunks at a time and writes it into a cloud-optimized GeoTIFF.
+
+    Parameters:
+        - swath (DataArray): Swath as returned by `lazy_swath` or `open_lazy_swath`.
+        - to_file (str): `.tif` file.
+        - scheduler, workers: dask scheduler and its number of workers, see `write_lazy_swath`.
+        - export_options: Options of `save_to_raster.open_swath_writer`.
+
+    Returns:
+        - str: Path to the output.
+    """
+    import dask
+    from src.raincoat_takehome_science.data.save_to_raster import open_swath_writer
+
+    with dask.config.set(scheduler=scheduler, num_workers=workers), \
+            open_swath_writer(to_file, swath['lat'].values, swath['lon'].values, **export_options) as writer:
+        start = 0
+        for i, lat_chunk in enumerate(swath.chunks[0]):
+            block = swath.data.blocks[i, :].compute()
+            writer.write_tile(slice(None), slice(start, start + lat_chunk), block.T)
+            start += lat_chunk
+    return to_file
+
+
+def open_lazy_swath(path, chunks=DEFAULT_CHUNK_SIZE):
+    """
+    Opens the swath of a NetCDF file or Zarr store written by `write_lazy_swath` as a lazy DataArray.
+    """
+    import xarray as xr
+
+    lat_chunk, lon_chunk = (chunks, chunks) if np.isscalar(chunks) else chunks
+    if path.rstrip('/').endswith('.zarr'):
+        dataset = xr.open_zarr(path)
+    else:
+        dataset = xr.open_dataset(path, engine='netcdf4', chunks={'lat': lat_chunk, 'lon': lon_chunk})
+    return dataset['wind_speed']
+
+
+@instrumentation.stage('generate_lazy_swath_data')
+def generate_lazy_swath_data(df, area, grid_resolution, to_files, chunks=DEFAULT_CHUNK_SIZE, scheduler='threads',
+                             workers=None, nc_options=None, export_options=None, **swath_options):
+    """
+    Builds the lazy swath and streams it into NetCDF files, Zarr stores and cloud-optimized GeoTIFFs.
+
+    The swath is computed once, into the first NetCDF or Zarr output; the other outputs are copied from it chunk
+    by chunk. GeoTIFFs are written last (see `export_lazy_swath`).
+
+    Parameters:
+        - df (DataFrame): Converted track data.
+        - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+        - grid_resolution (float): Grid resolution, degrees.
+        - to_files (list): `.nc`, `.zarr` and `.tif` outputs.
+        - chunks (int or tuple): Chunk edge, see `lazy_swath`.
+        - scheduler, workers: dask scheduler and its number of workers, see `write_lazy_swath`.
+        - nc_options (dict): Optional `complevel` and `shuffle` of the NetCDF outputs.
+        - export_options (dict): Options of the GeoTIFF outputs, see `save_to_raster.open_swath_writer`.
+        - swath_options: Options of `lazy_swath`. The options of `generate_swath_data` which only concern the
+                         eager engine (`engine`, `tile_size`, `out_file`, `workers`, `geometry_dir`) are ignored.
+
+    Returns:
+        - DataArray: Swath of dimensions (lat, lon), read lazily from the first NetCDF or Zarr output, or the lazy
+                     graph itself without such outputs.
+    """
+    for to_file in to_files:
+        if not to_file.rstrip('/').endswith(('.nc', '.zarr', '.tif', '.tiff')):
+            raise ValueError("Unknown lazy output format of `{}`. Use a `.nc`, `.zarr` or `.tif` path."
+                             .format(to_file))
+    raster_files = [f for f in to_files if f.endswith(('.tif', '.tiff'))]
+    to_files = [f for f in to_files if f not in raster_files]
+
+    print('Lazy swath generation started....')
+    swath = lazy_swath(df, area, grid_resolution, chunks=chunks,
+                       **{k: v for k, v in swath_options.items() if k in LAZY_SWATH_OPTIONS})
+    nc_options = {k: v for k, v in (nc_options or {}).items() if k in ('complevel', 'shuffle')}
+    for i, to_file in enumerate(to_files):
+        if os.path.dirname(to_file):
+            os.makedirs(os.path.dirname(to_file), exist_ok=True)
+        write_lazy_swath(swath, to_file, scheduler, workers, **nc_options)
+        if i == 0:
+            swath = open_lazy_swath(to_file, chunks)
+    for to_file in raster_files:
+        export_lazy_swath(swath, to_file, scheduler, workers, **(export_options or {}))
+    print('Lazy swath generation finished....')
+    return swath
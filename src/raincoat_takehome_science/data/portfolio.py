@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.convert as convert
+import src.raincoat_takehome_science.data.wind_models as wind_models
+from src.raincoat_takehome_science.data.data_processor import interpolate_track, track_fixes
+
+# 34, 50 and 64 knots, m/s
+DEFAULT_THRESHOLDS = [convert.speed_knots_2_ms(34), convert.speed_knots_2_ms(50), convert.speed_knots_2_ms(64)]
+
+# Number of locations evaluated and written at once
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Edge of the bins of the spatial index, degrees
+DEFAULT_BIN_SIZE = 0.25
+
+
+class PointIndex:
+    """
+    Spatial index of point locations binned on a regular latitude/longitude grid.
+
+    Points are sorted by bin, so that the points of a row of adjacent longitude bins are one contiguous
+    range of the sorted order, found with `np.searchsorted`. A query returns the points of all bins
+    overlapping the bounding box of a circle, without any per-point Python loop.
+
+    Parameters:
+        - lats, lons (1D array): Latitude and longitude of the points, degrees.
+        - bin_size (float): Bin edge, degrees.
+    """
+
+    def __init__(self, lats, lons, bin_size=DEFAULT_BIN_SIZE):
+        self.bin_size = bin_size
+        self.n_lon_bins = int(np.ceil(360.0 / bin_size))
+        keys = self._lat_bins(lats) * self.n_lon_bins + self._lon_bins(lons)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    def _lat_bins(self, lats):
+        return np.floor((np.asarray(lats) + 90.0) / self.bin_size).astype(np.int64)
+
+    def _lon_bins(self, lons):
+        return np.floor(((np.asarray(lons) + 180.0) % 360.0) / self.bin_size).astype(np.int64) % self.n_lon_bins
+
+    def query(self, lat, lon, radius):
+        """
+        Returns the indices of the points in the bins overlapping the bounding box of a circle.
+
+        Parameters:
+            - lat, lon (float): Center of the circle, degrees.
+            - radius (float): Radius of the circle, meter.
+
+        Returns:
+            - 1D array: Indices of the candidate points. Exact distances still have to be checked.
+        """
+        dlat = np.degrees(radius / swath_engine.EARTH_RADIUS)
+        max_abs_lat = min(abs(lat) + dlat, 90.0)
+        dlon = dlat / np.cos(np.radians(max_abs_lat)) if max_abs_lat < 89.9 else 360.0
+
+        lat_bins = np.arange(self._lat_bins(max(lat - dlat, -90.0)), self._lat_bins(min(lat + dlat, 90.0)) + 1)
+        if 2.0 * dlon >= 360.0 - self.bin_size:
+            lon_spans = [(0, self.n_lon_bins)]
+        else:
+            start = int(self._lon_bins(lon - dlon))
+            stop = int(self._lon_bins(lon + dlon)) + 1
+            # Boxes crossing the antimeridian are split in two spans
+            lon_spans = [(start, stop)] if start < stop else [(start, self.n_lon_bins), (0, stop)]
+
+        ranges = []
+        for span_start, span_stop in lon_spans:
+            starts = np.searchsorted(self.keys, lat_bins * self.n_lon_bins + span_start, side='left')
+            stops = np.searchsorted(self.keys, lat_bins * self.n_lon_bins + span_stop, side='left')
+            ranges.extend(self.order[s:e] for s, e in zip(starts, stops) if s < e)
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=self.order.dtype)
+
+
+def fix_durations(times):
+    """
+    Returns the time span each fix represents, hours: half of the interval to the previous fix plus
+    half of the interval to the next one.
+    """
+    hours = (pd.to_datetime(np.asarray(times)) - pd.Timestamp('1970-01-01')) / pd.Timedelta(hours=1)
+    hours = np.asarray(hours, dtype=float)
+    if len(hours) < 2:
+        return np.zeros(len(hours))
+    edges = np.concatenate([hours[:1], (hours[1:] + hours[:-1]) * 0.5, hours[-1:]])
+    return np.diff(edges)
+
+
+def point_exposure(lats, lons, fixes, thresholds=DEFAULT_THRESHOLDS, bin_size=DEFAULT_BIN_SIZE, profile=None):
+    """
+    Evaluates the wind of every fix at arbitrary point locations.
+
+    A `PointIndex` limits each fix to the points inside its influence radius (the RADIUS column of `fixes`),
+    so that the cost grows with the number of exposed points rather than with the whole portfolio.
+
+    Parameters:
+        - lats, lons (1D array): Latitude and longitude of the locations, degrees.
+        - fixes (DataFrame): Fixes as returned by `track_fixes` with a wind threshold, i.e. with a RADIUS column.
+        - thresholds (list): Wind speed thresholds, m/s, the duration of exceedance is reported for.
+        - bin_size (float): Bin edge of the spatial index, degrees.
+        - profile (callable): Wind profile `profile(r, rmax, vmax)` (see `wind_models.wind_profile`),
+                              Jelesnianski by default.
+
+    Returns:
+        - peak (1D array): Peak wind speed, m/s. Wind speeds below the lowest threshold are reported as 0.
+        - peak_time (1D array): Time of the peak wind speed, NaT where the peak is 0.
+        - hours_above (2D array): Hours above each threshold, shape (threshold, location).
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    profile = profile or wind_models.wind_profile()
+    thresholds = np.sort(np.asarray(thresholds, dtype=float))
+    index = PointIndex(lats, lons, bin_size)
+
+    times = pd.to_datetime(fixes['YYYYMMDDHH']).values.astype('datetime64[ns]')
+    durations = fix_durations(times)
+    peak = np.zeros(len(lats))
+    peak_fix = np.full(len(lats), -1, dtype=np.int64)
+    hours_above = np.zeros((len(thresholds), len(lats)))
+
+    for i, (lat, lon, vmax, rmw, radius) in enumerate(fixes[['LATN/S', 'LONE/W', 'VMAX', 'RMW', 'RADIUS']].values):
+        if radius <= 0:
+            continue
+        candidates = index.query(lat, lon, radius)
+        r = swath_engine.haversine_point_distances(lats[candidates], lons[candidates], lat, lon)
+        inside = r <= radius
+        points = candidates[inside]
+        vg = profile(r[inside], rmw, vmax)
+
+        higher = vg > peak[points]
+        peak[points[higher]] = vg[higher]
+        peak_fix[points[higher]] = i
+        for k, threshold in enumerate(thresholds):
+            hours_above[k, points[vg >= threshold]] += durations[i]
+
+    peak[peak < thresholds[0]] = 0.0
+    peak_fix[peak == 0.0] = -1
+    peak_time = np.where(peak_fix >= 0, times[np.maximum(peak_fix, 0)], np.datetime64('NaT', 'ns'))
+    return peak, peak_time, hours_above
+
+
+def read_locations(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads point locations from a CSV or Parquet file in chunks.
+
+    Parameters:
+        - file_path (str): Path to the `.csv` or `.parquet` file.
+        - chunk_size (int): Number of rows per chunk.
+
+    Yields:
+        - DataFrame: Chunk of locations.
+    """
+    if file_path.endswith(('.parquet', '.pq')):
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+
+
+@instrumentation.stage('generate_portfolio_exposure')
+def generate_portfolio_exposure(df, locations_file, to_file, thresholds=DEFAULT_THRESHOLDS, time_step=None,
+                                influence_radius='profile', chunk_size=DEFAULT_CHUNK_SIZE, bin_size=DEFAULT_BIN_SIZE,
+                                lat_column='lat', lon_column='lon', id_column=None,
+                                wind_model=wind_models.DEFAULT_WIND_MODEL, model_params=None):
+    """
+    Evaluates the peak wind, the time of the peak and the hours above thresholds of a storm at point locations,
+    e.g. the insured locations of a portfolio.
+
+    Locations are read, evaluated and written chunk by chunk, so that memory depends on `chunk_size` only.
+
+    Parameters:
+        - df (DataFrame): Converted track data.
+        - locations_file (str): CSV or Parquet file of the locations.
+        - to_file (str): Output `.parquet` or `.csv` file.
+        - thresholds (list): Wind speed thresholds, m/s, 34, 50 and 64 knots by default. The lowest one
+                             bounds the influence radius of the fixes.
+        - time_step (str or Timedelta): Optional time step the track is interpolated to (see `interpolate_track`).
+        - influence_radius (str): `profile` or `rad34`, see `generate_swath_data`.
+        - chunk_size (int): Number of locations evaluated at once.
+        - bin_size (float): Bin edge of the spatial index, degrees.
+        - lat_column, lon_column (str): Coordinate columns of the locations file, degrees.
+        - id_column (str): Optional identifier column copied to the output.
+        - wind_model (str): Wind profile model, see `wind_models`.
+        - model_params (dict): Optional parameters of the wind model.
+
+    Returns:
+        - int: Number of locations evaluated.
+    """
+    print('Portfolio exposure started....')
+    if not len(thresholds):
+        raise ValueError('At least one wind speed threshold is required.')
+    thresholds = sorted(float(t) for t in thresholds)
+
+    if time_step is not None:
+        df = interpolate_track(df, time_step)
+    model_params = model_params or {}
+    fixes = track_fixes(df, thresholds[0], influence_radius, wind_model, model_params)
+    profile = wind_models.wind_profile(wind_model, **model_params)
+
+    if os.path.exists(to_file):
+        os.remove(to_file)
+    writer = None
+    n_locations = 0
+    try:
+        for chunk in read_locations(locations_file, chunk_size):
+            peak, peak_time, hours_above = point_exposure(chunk[lat_column].values, chunk[lon_column].values,
+                                                          fixes, thresholds, bin_size, profile)
+            result = pd.DataFrame({lat_column: chunk[lat_column].values, lon_column: chunk[lon_column].values,
+                                   'peak_wind_speed': peak, 'peak_time': peak_time})
+            if id_column is not None:
+                result.insert(0, id_column, chunk[id_column].values)
+            for threshold, hours in zip(thresholds, hours_above):
+                result['hours_above_{:.1f}'.format(threshold)] = hours
+
+            if to_file.endswith('.csv'):
+                result.to_csv(to_file, mode='a', header=n_locations == 0, index=False)
+            else:
+                table = pa.Table.from_pandas(result, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(to_file, table.schema)
+                writer.write_table(table)
+            n_locations += len(result)
+            print('{} locations evaluated....'.format(n_locations))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    instrumentation.count('fixes_evaluated', len(fixes))
+    instrumentation.count('locations_evaluated', n_locations)
+    instrumentation.count_bytes(to_file)
+    print('Portfolio exposure saved in {}....'.format(to_file))
+    return n_locations
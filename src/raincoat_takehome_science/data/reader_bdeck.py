@@ -2,9 +2,12 @@
 
 import pandas as pd
 import os
+import tempfile
 
 # from local lib
 import src.raincoat_takehome_science.data.convert as convert
+import src.raincoat_takehome_science.instrumentation as instrumentation
+from src.raincoat_takehome_science.data.cache import hash_file
 
 COLUMNS = ["BASIN",
                 "CY",
@@ -46,6 +49,7 @@ COLUMNS = ["BASIN",
                 ]
 
 
+@instrumentation.stage('load_b_deck_file')
 def load_b_deck_file(file_path='data/external/bal152017.dat', skip_rows=2):
     """
     Reads a b-deck file and returns the data as a Pandas DataFrame.
@@ -65,66 +69,120 @@ def load_b_deck_file(file_path='data/external/bal152017.dat', skip_rows=2):
                         skiprows = skip_rows, # I skipped first two rows just to be consistent with the column numbers because 1st 2 rows do not represent maria hurricane.
                         delimiter = ','
                         )
+    instrumentation.count('rows_parsed', len(df))
 
     return df
 
 
-def generate_intermediate_data(from_file='data/external/bal152017.dat', to_path='data/interim/'):
+def convert_bdeck_data(df, errors='raise'):
     """
-    Returns intermediate data.
-     This data constitutes the contents of the same data as `external` 
-     but has been transformed into the measurement units of SI.
-     Note that only the following parameters necessary for further processing are extracted from the file:
-     - 
+    Converts the b-deck parameters necessary for further processing into the measurement units of SI.
 
     Parameters:
-        - file_path (str): File path representing the original data derived from third party source.
-    YYYYMMDDHH, LATN/S, LONE/W, VMAX, RMW, RAD, RAD1, RAD2, RAD3, RAD4
+        - df (DataFrame): B-deck data as returned by `load_b_deck_file`.
+        - errors (str): `raise` on a malformed timestamp, or `coerce` it to NaT.
 
+    Returns:
+        - DataFrame: YYYYMMDDHH, LATN/S, LONE/W, VMAX, RMW, RAD, RAD1, RAD2, RAD3, RAD4, DIR, SPEED, X, Y
     """
-    print('Loading data from {}....'.format(from_file))
-    # read bdeck file from file.
-    df = load_b_deck_file(from_file)
-    
-    print('Parameters conversion started ....')
     # Prepare the intermediate data    
     # timestamp in string into datetime
-    timestamp = convert.timestamp_str_2_datetime(df['YYYYMMDDHH'])
+    timestamp = convert.timestamp_str_2_datetime(df['YYYYMMDDHH'], errors)
     
-    # lat, long conversion into degree
-    latlons = df[['LATN/S', 'LONE/W']].apply(lambda x: convert.convert_latlon_hemi_2_degree(x[0].strip(), 
-                                                                                            x[1].strip()),
-                                                                                            axis=1,
-                                                                                            raw=True)   
+    # lat, long conversion into degree, on whole columns
+    lats, lons = convert.convert_latlon_hemi_2_degree_array(df['LATN/S'], df['LONE/W'])
+    latlons = pd.DataFrame({'LATN/S': lats, 'LONE/W': lons}, index=df.index)
+
     # Vmax, knots -> m/s
     vmax = convert.speed_knots_2_ms(df['VMAX'])
     
     # Rmax, nmi -> meter (radius of maximum wind)
     rmax = convert.nautical_miles_2_meter(df['RMW'])
     
-    # radius of specified wind intensity
-    rad1234 = convert.speed_knots_2_ms(df[['RAD1', 'RAD2','RAD3','RAD4']])
+    # radius of specified wind intensity, nmi -> meter
+    rad1234 = convert.nautical_miles_2_meter(df[['RAD1', 'RAD2','RAD3','RAD4']])
     
     # RAD, knots -> m/s (RAD - wind intensity for the radii defined in 34, 50, 64 knots)
     rad = convert.speed_knots_2_ms(df['RAD'])
 
+    # Storm motion: DIR, compass degrees, SPEED, knots -> m/s (0 when not reported)
+    direction = pd.to_numeric(df['DIR'], errors='coerce').astype(float)
+    speed = convert.speed_knots_2_ms(pd.to_numeric(df['SPEED'], errors='coerce').astype(float))
+
     # Concatenate the converted columns
-    newdf = pd.concat((timestamp,latlons, vmax, rmax, rad, rad1234),axis=1)
+    newdf = pd.concat((timestamp,latlons, vmax, rmax, rad, rad1234, direction, speed),axis=1)
+
+    # convert (lat, lon) into (x, y), all points in one call
+    newdf['X'], newdf['Y'] = convert.latlon_2_xy(lats, lons)
+
+    return newdf
 
-    # convert (lat, lon) into (x, y)
-    xy = latlons.apply(lambda v: convert.latlon_2_xy(v[0], v[1]), axis=1, raw=True)    
-    newdf['X'] = xy.iloc[:,0]
-    newdf['Y'] = xy.iloc[:,1]
 
-    print('Parameters conversion finished....')
+def _read_text(file_path):
+    with open(file_path) as f:
+        return f.read()
 
-    # Save the processed data set in txt file
+
+@instrumentation.stage('generate_intermediate_data')
+def generate_intermediate_data(from_file='data/external/bal152017.dat', to_path='data/interim/', cache=None):
+    """
+    Returns intermediate data.
+     This data constitutes the contents of the same data as `external` 
+     but has been transformed into the measurement units of SI.
+     Note that only the following parameters necessary for further processing are extracted from the file:
+     - 
+
+    Parameters:
+        - file_path (str): File path representing the original data derived from third party source.
+        - to_path (str): Directory the intermediate file is saved to. A file written by an older version of the
+                         conversion is replaced.
+        - cache (ProductCache): Optional cache of the parsed and converted track, keyed on the bytes of the file.
+    YYYYMMDDHH, LATN/S, LONE/W, VMAX, RMW, RAD, RAD1, RAD2, RAD3, RAD4
+
+    """
+    newdf = None
+    if cache is not None:
+        source_hash = hash_file(from_file)
+        converted_key = cache.key('converted_track', [source_hash])
+        newdf = cache.get_frame(converted_key)
+        if newdf is not None:
+            print('Converted data of {} loaded from cache....'.format(from_file))
+
+    if newdf is None:
+        print('Loading data from {}....'.format(from_file))
+        # read bdeck file from file.
+        if cache is None:
+            df = load_b_deck_file(from_file)
+        else:
+            parsed_key = cache.key('parsed_track', [source_hash], {'skip_rows': 2})
+            df = cache.get_frame(parsed_key)
+            if df is None:
+                df = cache.put_frame(parsed_key, load_b_deck_file(from_file))
+
+        print('Parameters conversion started ....')
+        newdf = convert_bdeck_data(df)
+        print('Parameters conversion finished....')
+
+        if cache is not None:
+            cache.put_frame(converted_key, newdf)
+
+    # Save the processed data set in txt file, replacing one written by an older version of the conversion
     basename = os.path.basename(from_file)
     fullpath = os.path.join(to_path, basename)
-    if os.path.exists(fullpath):
+    content = newdf.to_csv(index=False)
+    if os.path.exists(fullpath) and _read_text(fullpath) == content:
         print('File already exists in {}. No need to save!'.format(fullpath))
     else:
-        newdf.to_csv(fullpath, index=False)
+        # Written to a temporary file and renamed, so that batch workers converting the same storm never
+        # read or leave a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=to_path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            os.replace(tmp_path, fullpath)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
         print('Intermediate file has been created in `{}`'.format(fullpath))
     
     print('Processed intermediate data has been returned to output....')
@@ -1,9 +1,179 @@
 #!/usr/bin/env python
 
-import netCDF4 as nc
+import numpy as np
+import pandas as pd
 import os
 
-def generate_nc(swath_max_wind_speed, grid_lon, grid_lat, timestamp, to_file):
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+
+# Units of the time coordinate
+TIME_UNITS = 'hours since 1970-01-01 00:00:00'
+
+# Upper bound of the HDF5 chunk cache of the per-fix variable, bytes
+MAX_CHUNK_CACHE = 1024**3
+
+
+def _chunk_shape(chunks, n_time, n_lat, n_lon):
+    """
+    Returns the chunk shape of the (time, lat, lon) per-fix variable.
+
+    `map` chunks hold one fix over a 256 x 256 cell window for fast map reads, `timeseries` chunks
+    hold up to 64 fixes over 32 x 32 cells for fast time series reads at a location.
+    """
+    if chunks == 'map':
+        chunks = (1, 256, 256)
+    elif chunks == 'timeseries':
+        chunks = (64, 32, 32)
+    elif len(chunks) != 3:
+        raise ValueError("Chunks must be `map`, `timeseries` or a (time, lat, lon) shape, got {}.".format(chunks))
+    return tuple(max(1, min(c, n)) for c, n in zip(chunks, (n_time, n_lat, n_lon)))
+
+
+class SwathNetCDFWriter:
+    """
+    Streams the wind field of each fix and the swath of maximum wind speed into a NetCDF4 file.
+
+    Fields are written block by block as the swath engine produces them, so the (time, lat, lon)
+    cube never sits in memory. Variables are chunked and compressed with zlib and the shuffle filter.
+    Grid blocks follow the engine layout (lon, lat) and are stored as (lat, lon).
+
+    Parameters:
+        - to_file (str): Path to the NetCDF file.
+        - lat_axis (1D array): Latitude, degrees.
+        - lon_axis (1D array): Longitude, degrees.
+        - timestamp (1D array): Time of each fix, datetime.
+        - per_fix (bool): Create the per-fix `fix_wind_speed` (time, lat, lon) variable next to the
+                          `wind_speed` (lat, lon) swath.
+        - chunks (str or tuple): `map`, `timeseries` or a (time, lat, lon) chunk shape of `fix_wind_speed`.
+        - complevel (int): zlib compression level, 0 disables compression.
+        - shuffle (bool): Apply the shuffle filter before compression.
+        - least_significant_digit (int): Optional number of decimals of the wind speed kept, e.g. 2 for
+                                         0.01 m/s, which lets compression shrink the file much further.
+    """
+
+    def __init__(self, to_file, lat_axis, lon_axis, timestamp, per_fix=True, chunks='map', complevel=4,
+                 shuffle=True, least_significant_digit=None):
+        # Imported here, so that importing the module does not load netCDF4 and HDF5
+        import netCDF4 as nc
+
+        self.to_file = to_file
+        self.ncfile = nc.Dataset(to_file, 'w', format='NETCDF4')
+        self.ncfile.createDimension('lat', len(lat_axis))
+        self.ncfile.createDimension('lon', len(lon_axis))
+        self.ncfile.createDimension('time', len(timestamp))
+        self.compression = compression = {'zlib': complevel > 0, 'complevel': max(complevel, 1), 'shuffle': shuffle,
+                       'least_significant_digit': least_significant_digit}
+
+        lat_var = self.ncfile.createVariable('lat', 'f4', ('lat',))
+        lat_var.units = 'degrees_north'
+        lon_var = self.ncfile.createVariable('lon', 'f4', ('lon',))
+        lon_var.units = 'degrees_east'
+        t_var = self.ncfile.createVariable('time', 'f8', ('time',))
+        t_var.units = TIME_UNITS
+
+        lat_var[:] = lat_axis
+        lon_var[:] = lon_axis
+        t_var[:] = _hours_since_epoch(timestamp)
+
+        map_chunks = _chunk_shape('map', 1, len(lat_axis), len(lon_axis))[1:]
+        self.max_var = self.ncfile.createVariable('wind_speed', 'f4', ('lat', 'lon'), chunksizes=map_chunks,
+                                                  **compression)
+        self.max_var.units = 'm s-1'
+        self.max_var.long_name = 'Swath of maximum wind speed'
+
+        self.fix_var = None
+        if per_fix:
+            chunk_shape = _chunk_shape(chunks, len(timestamp), len(lat_axis), len(lon_axis))
+            # Cells not touched by a fix read as 0
+            self.fix_var = self.ncfile.createVariable('fix_wind_speed', 'f4', ('time', 'lat', 'lon'),
+                                                      chunksizes=chunk_shape, fill_value=0.0, **compression)
+            self.fix_var.units = 'm s-1'
+            self.fix_var.long_name = 'Wind speed of each fix'
+            # Keep the chunks of all fixes sharing a time chunk in cache while they are filled
+            cache_size = min(MAX_CHUNK_CACHE, 2 * chunk_shape[0] * len(lat_axis) * len(lon_axis) * 4)
+            self.fix_var.set_var_chunk_cache(size=max(cache_size, 1024**2), nelems=10007, preemption=0.75)
+
+    def write_fix(self, index, lon_slice, lat_slice, wind_speed):
+        """
+        Writes a (lon, lat) block of the wind field of a fix. Signature of `swath_engine` fix callbacks.
+        """
+        self.fix_var[index, lat_slice, lon_slice] = np.asarray(wind_speed, dtype='f4').T
+
+    def write_max(self, swath_max_wind_speed, lon_slice=slice(None), lat_slice=slice(None)):
+        """
+        Writes a (lon, lat) block of the swath of maximum wind speed.
+        """
+        self.max_var[lat_slice, lon_slice] = np.asarray(swath_max_wind_speed, dtype='f4').T
+
+    def create_ensemble(self, n_members, thresholds, percentiles):
+        """
+        Creates the ensemble statistics variables: `exceedance_probability` (threshold, lat, lon) and
+        `wind_speed_percentile` (percentile, lat, lon).
+
+        Parameters:
+            - n_members (int): Number of ensemble members.
+            - thresholds (list): Wind speed thresholds, m/s.
+            - percentiles (list): Percentiles, 0-100.
+        """
+        self.ncfile.ensemble_members = n_members
+        for name, values, units in [('threshold', thresholds, 'm s-1'), ('percentile', percentiles, '%')]:
+            self.ncfile.createDimension(name, len(values))
+            var = self.ncfile.createVariable(name, 'f4', (name,))
+            var.units = units
+            var[:] = values
+
+        map_chunks = self.max_var.chunking()
+        self.probability_var = self.ncfile.createVariable('exceedance_probability', 'f4', ('threshold', 'lat', 'lon'),
+                                                          chunksizes=[1] + list(map_chunks), **self.compression)
+        self.probability_var.units = '1'
+        self.probability_var.long_name = 'Fraction of the ensemble members exceeding the threshold'
+        self.percentile_var = self.ncfile.createVariable('wind_speed_percentile', 'f4', ('percentile', 'lat', 'lon'),
+                                                         chunksizes=[1] + list(map_chunks), **self.compression)
+        self.percentile_var.units = 'm s-1'
+        self.percentile_var.long_name = 'Percentile of the maximum wind speed over the ensemble members'
+
+    def write_ensemble(self, probability, percentile, lon_slice=slice(None), lat_slice=slice(None)):
+        """
+        Writes (statistic, lon, lat) blocks of the ensemble statistics, see `create_ensemble`.
+        """
+        self.probability_var[:, lat_slice, lon_slice] = np.swapaxes(np.asarray(probability, dtype='f4'), 1, 2)
+        self.percentile_var[:, lat_slice, lon_slice] = np.swapaxes(np.asarray(percentile, dtype='f4'), 1, 2)
+
+    def close(self):
+        self.ncfile.close()
+        instrumentation.count_bytes(self.to_file)
+        print('Swath data {} file has been created in {}'.format(os.path.basename(self.to_file), self.to_file))
+
+    def abort(self):
+        """
+        Discards a partially written file.
+        """
+        if self.ncfile.isopen():
+            self.ncfile.close()
+        os.remove(self.to_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _hours_since_epoch(timestamp):
+    """
+    Converts timestamps into hours since 1970-01-01.
+    """
+    timestamp = pd.to_datetime(np.asarray(timestamp).ravel())
+    return (timestamp - pd.Timestamp('1970-01-01')) / pd.Timedelta(hours=1)
+
+
+@instrumentation.stage('generate_nc')
+def generate_nc(swath_max_wind_speed, grid_lon, grid_lat, timestamp, to_file, complevel=4, shuffle=True,
+                least_significant_digit=None):
     """
         Generates netCDF swath data to netCDF file.
 
@@ -11,25 +181,17 @@ def generate_nc(swath_max_wind_speed, grid_lon, grid_lat, timestamp, to_file):
         - swath_max_wind_speed (ndarray): Wind intensity data.
         - grid_lat (ndarray): Latitude grid.
         - grid_lon (ndarray): Longitude grid.
-        - area (list or tuple): Area in which data is plotted. 
+        - timestamp (1D array): Time of the fixes.
+        - to_file (str): Path to the NetCDF file.
+        - complevel (int): zlib compression level, 0 disables compression.
+        - shuffle (bool): Apply the shuffle filter before compression.
+        - least_significant_digit (int): Optional number of decimals of the wind speed kept.
 
     """
 
-    with nc.Dataset(to_file, 'w', format='NETCDF4') as ncfile:
-        ncfile.createDimension('lon', len(grid_lon[0]))
-        ncfile.createDimension('lat', len(grid_lat))
-        ncfile.createDimension('time', len(timestamp))
-
-        lon_var = ncfile.createVariable('lon', 'f4', ('lon',))
-        lat_var = ncfile.createVariable('lat', 'f4', ('lat',))
-        t_var = ncfile.createVariable("time","f8",("time",))
-        wind_speed_var = ncfile.createVariable('wind_speed', 'f4', ('time', 'lat', 'lon'))
-
-        lon_var[:] = grid_lon[0]
-        lat_var[:] = grid_lat[:, 0]
-        t_var[:] = timestamp
-        wind_speed_var[:, :] = swath_max_wind_speed
-
-        print('Swath data {} file has been created in {}'.format(os.path.basename(to_file), to_file))
+    with SwathNetCDFWriter(to_file, grid_lat[0, :], grid_lon[:, 0], timestamp, per_fix=False,
+                           complevel=complevel, shuffle=shuffle,
+                           least_significant_digit=least_significant_digit) as writer:
+        writer.write_max(swath_max_wind_speed)
 
     return None
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+"""
+Cloud-optimized GeoTIFF and Zarr export of the swath, written tile by tile as the swath engine produces it.
+
+Both layouts let consumers read a window of the swath by fetching only the blocks (chunks) overlapping it:
+the GeoTIFF is tiled and carries overviews for coarse reads, the Zarr store is chunked and its metadata is
+consolidated into a single document. rasterio and zarr are optional dependencies, imported by the writers.
+"""
+
+import os
+import shutil
+
+import numpy as np
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+
+# Edge of the GeoTIFF blocks and of the Zarr chunks, cells
+DEFAULT_BLOCK_SIZE = 256
+
+
+class COGSwathWriter:
+    """
+    Writes the swath of maximum wind speed into a cloud-optimized GeoTIFF.
+
+    Tiles are written into a tiled GeoTIFF next to the output as they arrive. Closing the writer converts it
+    with the GDAL COG driver, which adds the overviews and lays the file out so that a window is read with a
+    few range requests. GDAL reads the source block by block, so the swath never sits in memory as a whole.
+    The raster is north up, EPSG:4326, with the cell centers on the grid axes.
+
+    Parameters:
+        - to_file (str): Path to the `.tif` file.
+        - lat_axis, lon_axis (1D array): Regular grid axes, degrees.
+        - block_size (int): Edge of the tiles and overviews, cells.
+        - compress (str): GDAL compression, e.g. `deflate`, `lzw`, `zstd` or `none`.
+        - overview_resampling (str): Resampling of the overviews, e.g. `average`, `max` or `nearest`.
+    """
+
+    def __init__(self, to_file, lat_axis, lon_axis, block_size=DEFAULT_BLOCK_SIZE, compress='deflate',
+                 overview_resampling='average'):
+        # Imported here, rasterio is an optional dependency of the GeoTIFF export
+        import rasterio
+        from rasterio.transform import from_origin
+
+        self.to_file = to_file
+        self.tmp_file = to_file + '.tmp.tif'
+        self.block_size = block_size
+        self.compress = compress
+        self.overview_resampling = overview_resampling
+        os.makedirs(os.path.dirname(to_file) or '.', exist_ok=True)
+        self.n_lat, self.n_lon = len(lat_axis), len(lon_axis)
+        dlat = float(lat_axis[1] - lat_axis[0]) if self.n_lat > 1 else 1.0
+        dlon = float(lon_axis[1] - lon_axis[0]) if self.n_lon > 1 else 1.0
+        transform = from_origin(float(lon_axis[0]) - 0.5 * dlon, float(lat_axis[-1]) + 0.5 * dlat, dlon, dlat)
+
+        self.dataset = rasterio.open(self.tmp_file, 'w', driver='GTiff', width=self.n_lon, height=self.n_lat,
+                                     count=1, dtype='float32', crs='EPSG:4326', transform=transform, tiled=True,
+                                     blockxsize=block_size, blockysize=block_size, compress=compress,
+                                     BIGTIFF='IF_SAFER')
+        self.dataset.update_tags(1, units='m s-1', long_name='Swath of maximum wind speed')
+
+    def write_tile(self, lon_slice, lat_slice, block):
+        """
+        Writes a (lon, lat) block of the swath. Signature of `swath_engine` tile callbacks.
+        """
+        from rasterio.windows import Window
+
+        # Rows run from north to south
+        lat_start, lat_stop, _ = lat_slice.indices(self.n_lat)
+        lon_start, lon_stop, _ = lon_slice.indices(self.n_lon)
+        window = Window(lon_start, self.n_lat - lat_stop, lon_stop - lon_start, lat_stop - lat_start)
+        self.dataset.write(np.asarray(block, dtype='float32').T[::-1], 1, window=window)
+
+    def close(self):
+        import rasterio.shutil
+
+        self.dataset.close()
+        try:
+            rasterio.shutil.copy(self.tmp_file, self.to_file, driver='COG', BLOCKSIZE=self.block_size,
+                                 COMPRESS=self.compress.upper(), OVERVIEWS='AUTO',
+                                 OVERVIEW_RESAMPLING=self.overview_resampling.upper(), BIGTIFF='IF_SAFER')
+        finally:
+            os.remove(self.tmp_file)
+        instrumentation.count_bytes(self.to_file)
+        print('Swath GeoTIFF has been created in {}....'.format(self.to_file))
+
+    def abort(self):
+        """
+        Discards a partially written export.
+        """
+        self.dataset.close()
+        os.remove(self.tmp_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ZarrSwathWriter:
+    """
+    Writes the swath of maximum wind speed into a chunked Zarr store with consolidated metadata.
+
+    The store holds the (lat, lon) `wind_speed` array and the `lat` and `lon` coordinates, laid out like the
+    NetCDF output, so that `xarray.open_zarr` reads it as the same dataset. Tiles are written as they arrive;
+    chunks without wind are not stored at all.
+
+    Parameters:
+        - store (str): Path to the `.zarr` store, replaced if it exists.
+        - lat_axis, lon_axis (1D array): Regular grid axes, degrees.
+        - chunks (int or tuple): Edge of the chunks, cells, or a (lat, lon) chunk shape.
+        - zarr_format (int): Zarr format, 2 for the widest reader support.
+    """
+
+    def __init__(self, store, lat_axis, lon_axis, chunks=DEFAULT_BLOCK_SIZE, zarr_format=2):
+        # Imported here, zarr is an optional dependency of the Zarr export
+        import zarr
+
+        self.store = store
+        if os.path.isdir(store):
+            shutil.rmtree(store)
+        chunks = (chunks, chunks) if np.isscalar(chunks) else tuple(chunks)
+        self.chunks = tuple(max(1, min(c, n)) for c, n in zip(chunks, (len(lat_axis), len(lon_axis))))
+
+        self.group = zarr.open_group(store, mode='w', zarr_format=zarr_format)
+        self.group.attrs.update({'title': 'Swath of maximum wind speed'})
+        for name, axis, units in [('lat', lat_axis, 'degrees_north'), ('lon', lon_axis, 'degrees_east')]:
+            coordinate = self.group.create_array(name, shape=(len(axis),), chunks=(len(axis),), dtype='float32')
+            coordinate[:] = np.asarray(axis, dtype='float32')
+            coordinate.attrs.update({'units': units, '_ARRAY_DIMENSIONS': [name]})
+        self.wind_speed = self.group.create_array('wind_speed', shape=(len(lat_axis), len(lon_axis)),
+                                                  chunks=self.chunks, dtype='float32', fill_value=0.0)
+        self.wind_speed.attrs.update({'units': 'm s-1', 'long_name': 'Swath of maximum wind speed',
+                                      '_ARRAY_DIMENSIONS': ['lat', 'lon']})
+
+    def write_tile(self, lon_slice, lat_slice, block):
+        """
+        Writes a (lon, lat) block of the swath. Signature of `swath_engine` tile callbacks.
+        """
+        self.wind_speed[lat_slice, lon_slice] = np.asarray(block, dtype='float32').T
+
+    def close(self):
+        import zarr
+
+        zarr.consolidate_metadata(self.store)
+        instrumentation.count_bytes(self.store)
+        print('Swath Zarr store has been created in {}....'.format(self.store))
+
+    def abort(self):
+        """
+        Discards a partially written export.
+        """
+        shutil.rmtree(self.store, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_swath_writer(to_file, lat_axis, lon_axis, block_size=DEFAULT_BLOCK_SIZE, compress='deflate',
+                      overview_resampling='average', zarr_format=2):
+    """
+    Opens the export writer of a path: `COGSwathWriter` for `.tif`/`.tiff` files, `ZarrSwathWriter` for
+    `.zarr` stores.
+
+    Returns:
+        - COGSwathWriter or ZarrSwathWriter: Writer with `write_tile`, `close` and `abort` methods.
+    """
+    if to_file.endswith(('.tif', '.tiff')):
+        return COGSwathWriter(to_file, lat_axis, lon_axis, block_size, compress, overview_resampling)
+    if to_file.rstrip('/').endswith('.zarr'):
+        return ZarrSwathWriter(to_file, lat_axis, lon_axis, block_size, zarr_format)
+    raise ValueError("Unknown export format of `{}`. Use a `.tif` or `.zarr` path.".format(to_file))
+
+
+@instrumentation.stage('export_swath')
+def export_swath(swath_max_wind_speed, grid_lon, grid_lat, to_file, tile_size=DEFAULT_BLOCK_SIZE, **options):
+    """
+    Exports a computed (possibly memory-mapped) swath tile by tile.
+
+    Parameters:
+        - swath_max_wind_speed (ndarray): Swath of shape (lon, lat).
+        - grid_lon, grid_lat (ndarray): Longitude and latitude grids.
+        - to_file (str): `.tif` or `.zarr` path.
+        - tile_size (int): Edge of the tiles read from the swath, cells.
+        - options: Options of `open_swath_writer`.
+    """
+    with open_swath_writer(to_file, grid_lat[0, :], grid_lon[:, 0], **options) as writer:
+        for rows, cols in swath_engine.iter_tiles(swath_max_wind_speed.shape, tile_size):
+            writer.write_tile(rows, cols, swath_max_wind_speed[rows, cols])
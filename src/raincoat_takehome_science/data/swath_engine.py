@@ -0,0 +1,721 @@
+#!/usr/bin/env python
+
+"""
+Array-based engine for the wind intensity swath.
+
+The grid produced by `generate_swath_data` is a regular latitude/longitude grid, so the haversine
+distance between a fix and every grid cell separates into a latitude term and a longitude term.
+The engine evaluates those terms on the 1D grid axes and only broadcasts them to the
+(fix x lon x lat) block when the distance is needed, which keeps the per-fix cost to a handful of
+array operations instead of one `geopy.geodesic` object per grid cell.
+
+Accuracy: the haversine distance on the mean Earth sphere differs from the WGS84 geodesic used by
+`calculate_distances` by less than 0.5 %. Since the Jelesnianski profile scales as `r**1.5` inside
+the radius of maximum wind and as `r**-0.5` outside of it, the swath differs from the geodesic
+reference by less than `SWATH_RELATIVE_TOLERANCE` (1 %) of the local wind speed.
+
+Precision: with `dtype='float32'`, the (fix x lon x lat) distances, the wind profile and the swath are
+evaluated in single precision, halving the memory traffic of the engine. The angle differences between the fixes
+and the grid axes, where the cancellation happens, are still computed in float64 on the 1D axes and only rounded
+to float32 before they are broadcast, so that the distances keep a relative error of a few float32 ulps at
+every range. The float32 swath differs from the float64 one by less than `FLOAT32_WIND_TOLERANCE` (1e-3 m/s),
+far below the 1 kt resolution of the b-deck VMAX. With a `wind_threshold`, cells within that tolerance of the
+threshold may be reported as 0 by one precision only.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Mean Earth radius (IUGG), meter.
+EARTH_RADIUS = 6371008.8
+
+# Documented relative tolerance of the vectorized swath against the geodesic reference.
+SWATH_RELATIVE_TOLERANCE = 0.01
+
+# Documented maximum absolute difference of the float32 swath from the float64 one, m/s.
+FLOAT32_WIND_TOLERANCE = 1e-3
+
+# Bounds of the quadrant scales of the asymmetric field, fitted and interpolated in azimuth, to keep inconsistent
+# radii from distorting the field
+MIN_QUADRANT_SCALE = 0.25
+MAX_QUADRANT_SCALE = 4.0
+
+# Upper bound of (fix x grid cell) elements evaluated at once, ~32 MB per float64 work array.
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+# Default tile edge, grid cells, of the tiled swath mode.
+DEFAULT_TILE_SIZE = 512
+
+
+def build_grid_axes(area, grid_resolution):
+    """
+    Builds the latitude and longitude axes of the swath grid.
+
+    Axes are cached per (area, resolution) and returned read-only, so that jobs sharing a grid in
+    one process build it once.
+
+    Parameters:
+      - area (dict): Boundary coordinates of area (lat_max, lat_min, lon_max, lon_min).
+      - grid_resolution (float): Grid resolution, degrees.
+
+    Returns:
+      - lat_axis (1D array): Latitude, degrees.
+      - lon_axis (1D array): Longitude, degrees.
+    """
+    return _grid_axes(float(area['lat_min']), float(area['lat_max']), float(area['lon_min']),
+                      float(area['lon_max']), float(grid_resolution))
+
+
+@lru_cache(maxsize=32)
+def _grid_axes(lat_min, lat_max, lon_min, lon_max, grid_resolution):
+    lat_axis = np.arange(lat_min, lat_max + grid_resolution, grid_resolution)
+    lon_axis = np.arange(lon_min, lon_max + grid_resolution, grid_resolution)
+    lat_axis.flags.writeable = False
+    lon_axis.flags.writeable = False
+    return lat_axis, lon_axis
+
+
+def as_float_array(x):
+    """
+    Returns `x` as a float64 array, or as is if it is already a float32 array, so that the float32 mode of the engine
+    stays in single precision.
+    """
+    x = np.asarray(x)
+    return x if x.dtype == np.float32 else x.astype(float, copy=False)
+
+
+def axis_terms(lat_axis, lon_axis):
+    """
+    Precomputes the trigonometric terms of the grid axes the distances and bearings are built from.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the grid, degrees.
+
+    Returns:
+      - dict: `sin_half_lat`, `cos_half_lat`, `sin_lat`, `cos_lat` along latitude and `sin_half_lon`,
+              `cos_half_lon` along longitude.
+    """
+    half_lat = np.radians(np.asarray(lat_axis, dtype=float)) * 0.5
+    half_lon = np.radians(np.asarray(lon_axis, dtype=float)) * 0.5
+    return {'sin_half_lat': np.sin(half_lat), 'cos_half_lat': np.cos(half_lat),
+            'sin_lat': np.sin(2.0 * half_lat), 'cos_lat': np.cos(2.0 * half_lat),
+            'sin_half_lon': np.sin(half_lon), 'cos_half_lon': np.cos(half_lon)}
+
+
+def slice_terms(terms, lat_slice=slice(None), lon_slice=slice(None)):
+    """
+    Returns the axis terms (see `axis_terms`) of a window of the grid.
+    """
+    return {name: values[lat_slice if name.endswith('_lat') else lon_slice] for name, values in terms.items()}
+
+
+def _half_differences(terms, lats, lons, dtype=float):
+    """
+    Returns the sine and cosine of the half latitude and longitude differences between fixes and axes,
+    from the angle difference identities, together with the fix terms. They are (fix, 1, lat) and (fix, lon, 1)
+    arrays computed in float64 and rounded to `dtype` last.
+    """
+    half_lats = np.radians(np.asarray(lats, dtype=float))[:, np.newaxis, np.newaxis] * 0.5
+    half_lons = np.radians(np.asarray(lons, dtype=float))[:, np.newaxis, np.newaxis] * 0.5
+    sin_half_lats, cos_half_lats = np.sin(half_lats), np.cos(half_lats)
+    sin_half_lons, cos_half_lons = np.sin(half_lons), np.cos(half_lons)
+
+    sin_half_lat = terms['sin_half_lat'][np.newaxis, np.newaxis, :]
+    cos_half_lat = terms['cos_half_lat'][np.newaxis, np.newaxis, :]
+    sin_half_lon = terms['sin_half_lon'][np.newaxis, :, np.newaxis]
+    cos_half_lon = terms['cos_half_lon'][np.newaxis, :, np.newaxis]
+
+    sin_half_dlat = sin_half_lat * cos_half_lats - cos_half_lat * sin_half_lats
+    sin_half_dlon = sin_half_lon * cos_half_lons - cos_half_lon * sin_half_lons
+    cos_half_dlon = cos_half_lon * cos_half_lons + sin_half_lon * sin_half_lons
+    return tuple(np.asarray(x, dtype=dtype) for x in (sin_half_dlat, sin_half_dlon, cos_half_dlon,
+                                                     2.0 * sin_half_lats * cos_half_lats, np.cos(2.0 * half_lats)))
+
+
+def distances_from_terms(terms, lats, lons, dtype=float):
+    """
+    Haversine distances between fixes and the cells of a grid, from precomputed `axis_terms`.
+
+    The (fix, lon, lat) result is the only block-sized array: it is allocated once, in `dtype`, and every
+    following operation updates it in place.
+
+    Returns:
+      - ndarray: Distances of shape (fix, lon, lat), meter.
+    """
+    sin_half_dlat, sin_half_dlon, _, _, cos_lats = _half_differences(terms, lats, lons, dtype)
+    cos_lat = np.asarray(terms['cos_lat'], dtype=dtype)[np.newaxis, np.newaxis, :]
+
+    a = np.multiply(cos_lats * cos_lat, np.square(sin_half_dlon))
+    a += np.square(sin_half_dlat)
+    np.clip(a, 0.0, 1.0, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2.0 * EARTH_RADIUS
+    return a
+
+
+def azimuths_from_terms(terms, lats, lons, dtype=float):
+    """
+    Initial bearings from fixes to the cells of a grid, from precomputed `axis_terms`.
+
+    Returns:
+      - sin_azimuth, cos_azimuth (ndarray): Sine and cosine of the bearing clockwise from north,
+                                            shape (fix, lon, lat).
+    """
+    _, sin_half_dlon, cos_half_dlon, sin_lats, cos_lats = _half_differences(terms, lats, lons, dtype)
+    sin_lat = np.asarray(terms['sin_lat'], dtype=dtype)[np.newaxis, np.newaxis, :]
+    cos_lat = np.asarray(terms['cos_lat'], dtype=dtype)[np.newaxis, np.newaxis, :]
+
+    east = 2.0 * sin_half_dlon * cos_half_dlon * cos_lat
+    north = cos_lats * sin_lat - sin_lats * cos_lat * (1.0 - 2.0 * sin_half_dlon**2)
+
+    norm = np.hypot(east, north)
+    # The bearing to the fix itself is arbitrary, northward
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sin_azimuth = np.where(norm > 0, east / norm, 0.0)
+        cos_azimuth = np.where(norm > 0, north / norm, 1.0)
+    return sin_azimuth, cos_azimuth
+
+
+def haversine_distances(lat_axis, lon_axis, lats, lons, dtype=float):
+    """
+    Calculates the haversine distance between each fix and each cell of a regular grid.
+
+    The grid follows the `np.meshgrid(lat_axis, lon_axis)` layout, i.e. rows run along longitude
+    and columns along latitude. The trigonometric terms are evaluated on the 1D axes only (see `axis_terms`)
+    and combined with those of the fixes through the angle difference identities.
+
+    Parameters:
+      - lat_axis (1D array): Latitude of the grid, degrees.
+      - lon_axis (1D array): Longitude of the grid, degrees.
+      - lats (1D array): Latitude of the fixes, degrees.
+      - lons (1D array): Longitude of the fixes, degrees.
+      - dtype (str): Precision of the distances, `float64` (default) or `float32`.
+
+    Returns:
+      - ndarray: Distances of shape (fix, lon, lat), meter.
+    """
+    return distances_from_terms(axis_terms(lat_axis, lon_axis), lats, lons, dtype)
+
+
+def haversine_azimuths(lat_axis, lon_axis, lats, lons, dtype=float):
+    """
+    Calculates the initial bearing from each fix to each cell of a regular grid, on the sphere.
+
+    Like `haversine_distances`, the terms are evaluated on the 1D axes and broadcast to the block.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the grid, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - dtype (str): Precision of the bearings, `float64` (default) or `float32`.
+
+    Returns:
+      - sin_azimuth, cos_azimuth (ndarray): Sine and cosine of the bearing clockwise from north,
+                                            shape (fix, lon, lat).
+    """
+    return azimuths_from_terms(axis_terms(lat_axis, lon_axis), lats, lons, dtype)
+
+
+def haversine_point_distances(lats, lons, lat, lon):
+    """
+    Calculates the haversine distance between one fix and arbitrary point locations.
+
+    Parameters:
+      - lats, lons (1D array): Latitude and longitude of the points, degrees.
+      - lat, lon (float): Latitude and longitude of the fix, degrees.
+
+    Returns:
+      - 1D array: Distances, meter.
+    """
+    lats, lons = np.radians(lats), np.radians(lons)
+    lat, lon = np.radians(lat), np.radians(lon)
+
+    a = np.sin((lats - lat) * 0.5) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) * 0.5) ** 2
+    np.clip(a, 0.0, 1.0, out=a)
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2.0 * EARTH_RADIUS
+    return a
+
+
+def gradient_wind_speed_jelesnianski(r, rmax, vmax):
+    """
+    Array version of `calculate_gradient_wind_speed_jelesnianski`.
+
+    The profile is evaluated in two block-sized buffers updated in place, in float32 if `r` is float32.
+
+    Parameters:
+      - r (ndarray): Distance from the center of typhoon/hurricane, meter.
+      - rmax (float or ndarray): Radius of maximum wind, meter. Broadcast against `r`.
+      - vmax (float or ndarray): Maximum wind speed, m/s. Broadcast against `r`.
+
+    Returns:
+      - ndarray: Gradient wind speed, m/s.
+    """
+    r = as_float_array(r)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = r / rmax
+        vg = np.sqrt(ratio)
+        inside = ratio <= 1.0
+        # Inside the radius of maximum wind: vmax * (r / rmax)**1.5, outside of it: vmax * (rmax / r)**0.5
+        np.multiply(ratio, vg, out=ratio)
+        np.reciprocal(vg, out=vg)
+    np.copyto(vg, ratio, where=inside)
+    vg *= vmax
+    return vg
+
+
+def quadrant_scale_coefficients(scales):
+    """
+    Coefficients of the trigonometric polynomial `c0 + c1 cos(a) + c2 sin(a) + c3 sin(a) cos(a)` of the azimuth
+    `a` passing through the NE, SE, SW and NW quadrant scales at the quadrant centers (45, 135, 225 and 315
+    degrees).
+
+    Parameters:
+      - scales (ndarray): Quadrant scales of shape (fix, 4).
+
+    Returns:
+      - c0, c1, c2, c3 (1D array): Coefficients of the fixes.
+    """
+    s1, s2, s3, s4 = (np.asarray(scales, dtype=float)[:, k] for k in range(4))
+    return ((s1 + s2 + s3 + s4) * 0.25, (s1 - s2 - s3 + s4) / (2.0 * np.sqrt(2.0)),
+            (s1 + s2 - s3 - s4) / (2.0 * np.sqrt(2.0)), (s1 - s2 + s3 - s4) * 0.5)
+
+
+def asymmetric_wind_speed(lat_axis, lon_axis, lats, lons, r, rmax, vmax, asymmetry, profile, terms=None):
+    """
+    Evaluates the asymmetric wind field of a batch of fixes on a regular grid block.
+
+    The symmetric profile is stretched per quadrant by the scales fitted to the RAD1-RAD4 wind radii
+    (see `asymmetry.asymmetric_parameters`). The scales are interpolated in azimuth by the trigonometric
+    polynomial of `quadrant_scale_coefficients`, so that no angle has to be evaluated per cell, and clipped to
+    [`MIN_QUADRANT_SCALE`, `MAX_QUADRANT_SCALE`] since the polynomial can dip to zero or below between
+    contrasted quadrants. The translation of the storm is added to the rotational wind as a vector, decaying away
+    from the radius of maximum wind as `2 * rmax * r / (rmax**2 + r**2)`.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the block, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - r (ndarray): Distances of shape (fix, lon, lat), meter.
+      - rmax, vmax (1D array): Radius of maximum wind [meter] and symmetric maximum wind speed [m/s] of the fixes.
+      - asymmetry (tuple): Quadrant scales of shape (fix, 4) and eastward and northward translation speeds
+                           of the fixes [m/s].
+      - profile (callable): Wind profile `profile(r, rmax, vmax)`.
+      - terms (dict): Optional axis terms of the block (see `axis_terms`), computed from the axes by default.
+
+    Returns:
+      - ndarray: Wind speed of shape (fix, lon, lat), m/s, in the precision of `r`.
+    """
+    scales, u_translation, v_translation = asymmetry
+    dtype = r.dtype
+    if terms is None:
+        terms = axis_terms(lat_axis, lon_axis)
+    sin_azimuth, cos_azimuth = azimuths_from_terms(terms, lats, lons, dtype)
+
+    def per_fix(values):
+        return np.asarray(values, dtype=dtype)[:, np.newaxis, np.newaxis]
+
+    c0, c1, c2, c3 = (per_fix(c) for c in quadrant_scale_coefficients(scales))
+    scale = c0 + c1 * cos_azimuth + (c2 + c3 * cos_azimuth) * sin_azimuth
+    np.clip(scale, MIN_QUADRANT_SCALE, MAX_QUADRANT_SCALE, out=scale)
+
+    rmax = per_fix(rmax)
+    rotation = profile(r * scale, rmax, per_fix(vmax))
+    decay = 2.0 * rmax * r / (rmax**2 + r**2)
+
+    # Counterclockwise rotation in the northern hemisphere, clockwise in the southern one
+    hemisphere = per_fix(np.where(np.asarray(lats) < 0, -1.0, 1.0))
+    u = -hemisphere * rotation * cos_azimuth + decay * per_fix(u_translation)
+    v = hemisphere * rotation * sin_azimuth + decay * per_fix(v_translation)
+    return np.hypot(u, v)
+
+
+def fix_batch_size(n_cells, max_elements=MAX_BLOCK_ELEMENTS):
+    """
+    Returns how many fixes can be evaluated at once on `n_cells` grid cells within `max_elements`.
+    """
+    return max(1, int(max_elements // max(1, n_cells)))
+
+
+def jelesnianski_influence_radius(rmax, vmax, wind_threshold):
+    """
+    Distance beyond which the Jelesnianski far-field term `vmax * (rmax / r)**0.5` stays below a threshold.
+
+    Parameters:
+      - rmax (1D array): Radius of maximum wind, meter.
+      - vmax (1D array): Maximum wind speed, m/s.
+      - wind_threshold (float): Wind speed threshold, m/s.
+
+    Returns:
+      - 1D array: Influence radius, meter. Zero for fixes whose maximum wind does not exceed the threshold.
+    """
+    rmax, vmax = np.asarray(rmax, dtype=float), np.asarray(vmax, dtype=float)
+    return np.where(vmax > wind_threshold, rmax * (vmax / wind_threshold) ** 2, 0.0)
+
+
+def influence_windows(lat_axis, lon_axis, lats, lons, radii):
+    """
+    Finds, for each fix, the index window of a regular grid that bounds its influence radius.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Ascending latitude and longitude of the grid, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - radii (1D array): Influence radius of the fixes, meter.
+
+    Returns:
+      - ndarray: Integer array of shape (fix, 4) with the lat start, lat stop, lon start and lon stop indices.
+    """
+    dlat = np.degrees(np.asarray(radii, dtype=float) / EARTH_RADIUS)
+    # The longitude extent widens towards the pole side of the window
+    max_abs_lat = np.minimum(np.abs(lats) + dlat, 90.0)
+    with np.errstate(divide='ignore'):
+        dlon = np.where(max_abs_lat < 89.9, dlat / np.cos(np.radians(max_abs_lat)), 360.0)
+
+    windows = np.empty((len(lats), 4), dtype=np.intp)
+    windows[:, 0] = np.searchsorted(lat_axis, lats - dlat, side='left')
+    windows[:, 1] = np.searchsorted(lat_axis, lats + dlat, side='right')
+    windows[:, 2] = np.searchsorted(lon_axis, lons - dlon, side='left')
+    windows[:, 3] = np.searchsorted(lon_axis, lons + dlon, side='right')
+    # Fixes without influence touch no cell
+    windows[np.asarray(radii) <= 0, 1] = windows[np.asarray(radii) <= 0, 0]
+    return windows
+
+
+def touched_cells(lat_axis, lon_axis, lats, lons, radii=None):
+    """
+    Returns the number of (fix, grid cell) pairs evaluated by the engine: every cell for every fix, or the cells
+    of the influence window of each fix if influence radii are given (see `influence_windows`).
+    """
+    if radii is None:
+        return len(lats) * len(lat_axis) * len(lon_axis)
+    windows = influence_windows(lat_axis, lon_axis, lats, lons, radii)
+    return int(np.sum(np.maximum(windows[:, 1] - windows[:, 0], 0) * np.maximum(windows[:, 3] - windows[:, 2], 0)))
+
+
+def swath_block(lat_axis, lon_axis, lats, lons, vmax, rmax, out=None, radii=None, wind_threshold=None,
+                fix_callback=None, profile=None, asymmetry=None, dtype=float, terms=None):
+    """
+    Calculates the maximum wind speed over all fixes on a regular grid block.
+
+    Fixes are evaluated in batches bounded by `MAX_BLOCK_ELEMENTS` and reduced with a running maximum.
+    If influence radii are given, each fix only touches the grid cells within its radius.
+
+    Parameters:
+      - lat_axis (1D array): Latitude of the block, degrees.
+      - lon_axis (1D array): Longitude of the block, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - vmax (1D array): Maximum wind speed of the fixes, m/s.
+      - rmax (1D array): Radius of maximum wind of the fixes, meter.
+      - out (ndarray): Optional (lon, lat) array updated in place with the running maximum.
+      - radii (1D array): Optional influence radius of the fixes, meter.
+      - wind_threshold (float): Optional wind speed threshold, m/s. Wind speeds below it,
+                                including all skipped cells, are reported as 0.
+      - fix_callback (callable): Optional `fix_callback(fix_index, lon_slice, lat_slice, wind_speed)` receiving
+                                 the wind field of every fix over the block cells it touched.
+      - profile (callable): Wind profile `profile(r, rmax, vmax)` (see `wind_models.wind_profile`),
+                            `gradient_wind_speed_jelesnianski` by default.
+      - asymmetry (tuple): Optional quadrant scales and translation speeds of the fixes, enabling the
+                           asymmetric field (see `asymmetric_wind_speed`). `vmax` is then the symmetric one.
+      - dtype (str): Precision of the distances, the wind profile and the new `out` array, `float64` (default)
+                     or `float32` (see `FLOAT32_WIND_TOLERANCE`).
+      - terms (dict): Optional axis terms of the block, e.g. sliced from a cached `grid_geometry.GridGeometry`,
+                      computed from the axes by default (see `axis_terms`).
+
+    Returns:
+      - ndarray: Maximum wind speed of shape (lon, lat), m/s.
+    """
+    if out is None:
+        out = np.zeros((len(lon_axis), len(lat_axis)), dtype=dtype)
+    if terms is None:
+        terms = axis_terms(lat_axis, lon_axis)
+    if profile is None:
+        profile = gradient_wind_speed_jelesnianski
+    # Fix parameters in the precision of the distances, which would otherwise be promoted to float64
+    vmax, rmax = np.asarray(vmax, dtype=dtype), np.asarray(rmax, dtype=dtype)
+
+    if radii is None:
+        batch = fix_batch_size(out.size)
+        for start in range(0, len(lats), batch):
+            stop = start + batch
+            r = distances_from_terms(terms, lats[start:stop], lons[start:stop], dtype)
+            if asymmetry is None:
+                vg = profile(r, rmax[start:stop, np.newaxis, np.newaxis], vmax[start:stop, np.newaxis, np.newaxis])
+            else:
+                vg = asymmetric_wind_speed(lat_axis, lon_axis, lats[start:stop], lons[start:stop], r, rmax[start:stop],
+                                           vmax[start:stop], [a[start:stop] for a in asymmetry], profile, terms)
+            np.maximum(out, vg.max(axis=0), out=out)
+            if fix_callback is not None:
+                for i, field in enumerate(vg, start=start):
+                    fix_callback(i, slice(0, out.shape[0]), slice(0, out.shape[1]),
+                                 _below_threshold(field, wind_threshold))
+    else:
+        windows = influence_windows(lat_axis, lon_axis, lats, lons, radii)
+        for i, (lat_start, lat_stop, lon_start, lon_stop) in enumerate(windows):
+            if lat_start >= lat_stop or lon_start >= lon_stop:
+                continue
+            window_terms = slice_terms(terms, slice(lat_start, lat_stop), slice(lon_start, lon_stop))
+            r = distances_from_terms(window_terms, lats[i:i + 1], lons[i:i + 1], dtype)
+            if asymmetry is None:
+                vg = profile(r[0], rmax[i], vmax[i])
+            else:
+                vg = asymmetric_wind_speed(lat_axis[lat_start:lat_stop], lon_axis[lon_start:lon_stop], lats[i:i + 1],
+                                           lons[i:i + 1], r, rmax[i:i + 1], vmax[i:i + 1],
+                                           [a[i:i + 1] for a in asymmetry], profile, window_terms)[0]
+            r = r[0]
+            vg[r > radii[i]] = 0.0
+            window = out[lon_start:lon_stop, lat_start:lat_stop]
+            np.maximum(window, vg, out=window)
+            if fix_callback is not None:
+                fix_callback(i, slice(lon_start, lon_stop), slice(lat_start, lat_stop),
+                             _below_threshold(vg, wind_threshold))
+
+    if wind_threshold is not None:
+        out[out < wind_threshold] = 0.0
+    return out
+
+
+def _below_threshold(field, wind_threshold):
+    """
+    Reports wind speeds below the threshold as 0, in place.
+    """
+    if wind_threshold is not None:
+        field[field < wind_threshold] = 0.0
+    return field
+
+
+def iter_tiles(shape, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Splits a 2D grid into rectangular tiles.
+
+    Parameters:
+      - shape (tuple): Grid shape (lon, lat).
+      - tile_size (int or tuple): Tile edge in grid cells, or (lon, lat) tile shape.
+
+    Yields:
+      - (slice, slice): Row and column slices of each tile.
+    """
+    tile_rows, tile_cols = (tile_size, tile_size) if np.isscalar(tile_size) else tile_size
+    if tile_rows < 1 or tile_cols < 1:
+        raise ValueError('Tile size must be positive, got {}.'.format(tile_size))
+    for row in range(0, shape[0], tile_rows):
+        for col in range(0, shape[1], tile_cols):
+            yield slice(row, min(row + tile_rows, shape[0])), slice(col, min(col + tile_cols, shape[1]))
+
+
+def allocate_swath(shape, out_file=None, dtype=float):
+    """
+    Allocates a zero-filled swath array, memory-mapped to a `.npy` file if `out_file` is given.
+    """
+    if out_file is None:
+        return np.zeros(shape, dtype=dtype)
+    out = np.lib.format.open_memmap(out_file, mode='w+', dtype=dtype, shape=shape)
+    out[:] = 0.0
+    return out
+
+
+def tiled_swath(lat_axis, lon_axis, lats, lons, vmax, rmax, tile_size=DEFAULT_TILE_SIZE, out=None, radii=None,
+                wind_threshold=None, fix_callback=None, profile=None, asymmetry=None, tile_callback=None, dtype=float,
+                geometry=None):
+    """
+    Calculates the swath tile by tile and writes each tile into `out`.
+
+    Peak memory depends on the tile size only, besides the output array itself, which can be
+    memory-mapped (see `allocate_swath`). The result is bit-identical to `swath_block` over the
+    whole grid since every grid cell goes through the same element-wise operations.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the grid, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - vmax (1D array): Maximum wind speed of the fixes, m/s.
+      - rmax (1D array): Radius of maximum wind of the fixes, meter.
+      - tile_size (int or tuple): Tile edge in grid cells, or (lon, lat) tile shape.
+      - out (ndarray): Optional zero-filled (lon, lat) output array.
+      - radii (1D array): Optional influence radius of the fixes, meter.
+      - wind_threshold (float): Optional wind speed threshold, m/s.
+      - fix_callback (callable): Optional per-fix callback (see `swath_block`), called with grid slices.
+      - profile (callable): Optional wind profile (see `swath_block`).
+      - asymmetry (tuple): Optional asymmetry parameters of the fixes (see `swath_block`).
+      - tile_callback (callable): Optional `tile_callback(lon_slice, lat_slice, swath)` receiving every finished
+                      tile of the swath, e.g. to export it while the next tiles are computed.
+      - dtype (str): Precision of the engine and of the new `out` array (see `swath_block`).
+      - geometry (GridGeometry): Optional geometry of the grid, whose cached axis terms are sliced per tile
+                                 instead of being computed (see `grid_geometry.GridGeometry`).
+
+    Returns:
+      - ndarray: Maximum wind speed of shape (lon, lat), m/s.
+    """
+    if out is None:
+        out = allocate_swath((len(lon_axis), len(lat_axis)), dtype=dtype)
+
+    for rows, cols in iter_tiles(out.shape, tile_size):
+        block_callback = None
+        if fix_callback is not None:
+            def block_callback(i, lon_slice, lat_slice, field, rows=rows, cols=cols):
+                fix_callback(i, _offset(lon_slice, rows.start), _offset(lat_slice, cols.start), field)
+        out[rows, cols] = swath_block(lat_axis[cols], lon_axis[rows], lats, lons, vmax, rmax,
+                                      radii=radii, wind_threshold=wind_threshold, fix_callback=block_callback,
+                                      profile=profile, asymmetry=asymmetry, dtype=dtype,
+                                      terms=None if geometry is None else geometry.terms(cols, rows))
+        if tile_callback is not None:
+            tile_callback(rows, cols, out[rows, cols])
+    return out
+
+
+def _offset(block_slice, start):
+    """
+    Shifts a slice relative to a tile into grid coordinates.
+    """
+    return slice(block_slice.start + start, block_slice.stop + start)
+
+
+# Per-process state of the parallel swath workers, set by `_init_worker`
+_WORKER = {}
+
+
+def _init_worker(buffer, shape, dtype, lat_axis, lon_axis, fixes, wind_threshold, profile, geometry=None):
+    """
+    Attaches a worker process to the shared swath output and stores the inputs common to all tiles.
+    A saved geometry is unpickled by memory-mapping its files (see `grid_geometry.GridGeometry`).
+    """
+    if isinstance(buffer, str) and buffer.endswith('.npy'):
+        out = np.load(buffer, mmap_mode='r+')
+    else:
+        shm = shared_memory.SharedMemory(name=buffer)
+        _WORKER['shm'] = shm
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _WORKER.update(out=out, lat_axis=lat_axis, lon_axis=lon_axis, fixes=fixes, wind_threshold=wind_threshold,
+                   profile=profile, geometry=geometry)
+
+
+def _run_tile(rows, cols):
+    """
+    Calculates one tile of the swath in a worker process and writes it into the shared output.
+    """
+    lats, lons, vmax, rmax, radii, asymmetry = _WORKER['fixes']
+    out, geometry = _WORKER['out'], _WORKER['geometry']
+    out[rows, cols] = swath_block(_WORKER['lat_axis'][cols], _WORKER['lon_axis'][rows], lats, lons, vmax, rmax,
+                                  radii=radii, wind_threshold=_WORKER['wind_threshold'], profile=_WORKER['profile'],
+                                  asymmetry=asymmetry, dtype=out.dtype,
+                                  terms=None if geometry is None else geometry.terms(cols, rows))
+    return rows, cols
+
+
+def parallel_swath(lat_axis, lon_axis, lats, lons, vmax, rmax, workers, tile_size=None, out_file=None, radii=None,
+                   wind_threshold=None, profile=None, asymmetry=None, dtype=float, geometry=None):
+    """
+    Calculates the swath on a pool of worker processes, one grid tile per task.
+
+    The output lives in shared memory, or in the memory-mapped `out_file`, and every tile is written by
+    exactly one worker, so that no grid-sized array is pickled between processes. The result is
+    bit-identical to the serial engine.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the grid, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - vmax (1D array): Maximum wind speed of the fixes, m/s.
+      - rmax (1D array): Radius of maximum wind of the fixes, meter.
+      - workers (int): Number of worker processes.
+      - tile_size (int or tuple): Tile edge in grid cells, or (lon, lat) tile shape. By default the grid is split
+                                  into strips of longitude rows, four per worker.
+      - out_file (str): Optional `.npy` file the swath is memory-mapped to.
+      - radii (1D array): Optional influence radius of the fixes, meter.
+      - wind_threshold (float): Optional wind speed threshold, m/s.
+      - profile (callable): Optional wind profile (see `swath_block`), picklable.
+      - asymmetry (tuple): Optional asymmetry parameters of the fixes (see `swath_block`).
+      - dtype (str): Precision of the engine and of the swath (see `swath_block`).
+      - geometry (GridGeometry): Optional geometry of the grid (see `tiled_swath`). A saved one is sent to the
+                                 workers as its directory, which they memory-map.
+
+    Returns:
+      - ndarray: Maximum wind speed of shape (lon, lat), m/s.
+    """
+    shape = (len(lon_axis), len(lat_axis))
+    dtype = np.dtype(dtype)
+    if tile_size is None:
+        tile_size = (max(1, -(-shape[0] // (4 * workers))), max(1, shape[1]))
+
+    shm = None
+    if out_file is None:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        out[:] = 0.0
+        buffer = shm.name
+    else:
+        out = allocate_swath(shape, out_file, dtype)
+        out.flush()
+        buffer = out_file
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_worker,
+                                 initargs=(buffer, shape, dtype, lat_axis, lon_axis,
+                                           (lats, lons, vmax, rmax, radii, asymmetry),
+                                           wind_threshold, profile, geometry)) as pool:
+            tiles = list(iter_tiles(shape, tile_size))
+            for _ in pool.map(_run_tile, [rows for rows, _ in tiles], [cols for _, cols in tiles]):
+                pass
+        if shm is not None:
+            out = out.copy()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    return out
+
+
+def compute_swath(lat_axis, lon_axis, lats, lons, vmax, rmax, tile_size=None, out_file=None, radii=None,
+                  wind_threshold=None, workers=1, fix_callback=None, profile=None, asymmetry=None,
+                  tile_callback=None, dtype=float, geometry=None):
+    """
+    Calculates the swath of maximum wind speed on a regular grid, dispatching to the serial,
+    tiled or parallel engine.
+
+    Parameters:
+      - lat_axis, lon_axis (1D array): Latitude and longitude of the grid, degrees.
+      - lats, lons (1D array): Latitude and longitude of the fixes, degrees.
+      - vmax (1D array): Maximum wind speed of the fixes, m/s.
+      - rmax (1D array): Radius of maximum wind of the fixes, meter.
+      - tile_size (int or tuple): Optional tile edge in grid cells, or (lon, lat) tile shape.
+      - out_file (str): Optional `.npy` file the swath is memory-mapped to.
+      - radii (1D array): Optional influence radius of the fixes, meter.
+      - wind_threshold (float): Optional wind speed threshold, m/s.
+      - workers (int): Number of worker processes, 1 by default.
+      - fix_callback (callable): Optional per-fix callback (see `swath_block`), serial engine only.
+      - profile (callable): Optional wind profile (see `swath_block`).
+      - asymmetry (tuple): Optional asymmetry parameters of the fixes (see `swath_block`).
+      - tile_callback (callable): Optional callback receiving every finished tile (see `tiled_swath`). The
+                      parallel engine passes the tiles of the result once all workers are done.
+      - dtype (str): Precision of the distances, the wind profile and the swath, `float64` (default) or
+                     `float32` (see `FLOAT32_WIND_TOLERANCE`).
+      - geometry (GridGeometry): Optional geometry of the grid, whose cached axis terms are used instead of
+                                 being computed for every block (see `grid_geometry.GridGeometry`).
+
+    Returns:
+      - ndarray: Maximum wind speed of shape (lon, lat), m/s.
+    """
+    if workers is not None and workers > 1:
+        if fix_callback is not None:
+            raise ValueError('Per-fix output is not supported with several workers.')
+        out = parallel_swath(lat_axis, lon_axis, lats, lons, vmax, rmax, workers, tile_size=tile_size,
+                             out_file=out_file, radii=radii, wind_threshold=wind_threshold, profile=profile,
+                             asymmetry=asymmetry, dtype=dtype, geometry=geometry)
+        if tile_callback is not None:
+            for rows, cols in iter_tiles(out.shape, tile_size or DEFAULT_TILE_SIZE):
+                tile_callback(rows, cols, out[rows, cols])
+        return out
+
+    out = allocate_swath((len(lon_axis), len(lat_axis)), out_file, dtype)
+    if tile_size is None:
+        out = swath_block(lat_axis, lon_axis, lats, lons, vmax, rmax, out=out, radii=radii,
+                          wind_threshold=wind_threshold, fix_callback=fix_callback, profile=profile,
+                          asymmetry=asymmetry, dtype=dtype, terms=None if geometry is None else geometry.terms())
+        if tile_callback is not None:
+            tile_callback(slice(0, out.shape[0]), slice(0, out.shape[1]), out)
+        return out
+    return tiled_swath(lat_axis, lon_axis, lats, lons, vmax, rmax, tile_size=tile_size, out=out, radii=radii,
+                       wind_threshold=wind_threshold, fix_callback=fix_callback, profile=profile, asymmetry=asymmetry,
+                       tile_callback=tile_callback, dtype=dtype, geometry=geometry)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+"""
+Registry of parametric wind profile models.
+
+Every model is an array function `profile(r, rmax, vmax, **params) -> ndarray` evaluating the wind speed at
+distances `r` from the center, with `rmax` and `vmax` broadcast against `r`. Each model comes with a scalar
+reference implementation, written like `calculate_gradient_wind_speed_jelesnianski`, the array version is
+checked against, and with an influence radius beyond which its wind stays below a threshold, used to prune
+the grid.
+
+Models are selected by name, e.g. `generate_swath_data(..., wind_model='holland1980', model_params={'b': 1.8})`.
+"""
+
+import math
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+# from local lib
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+
+WindModel = namedtuple('WindModel', ['profile', 'reference', 'influence_radius'])
+
+# Registered wind models by name
+WIND_MODELS = {}
+
+DEFAULT_WIND_MODEL = 'jelesnianski'
+
+
+def register_wind_model(name, reference, influence_radius=None):
+    """
+    Registers an array wind profile under a name.
+
+    Parameters:
+        - name (str): Model name.
+        - reference (callable): Scalar reference `reference(r, rmax, vmax, **params) -> float`.
+        - influence_radius (callable): Optional `influence_radius(rmax, vmax, wind_threshold, **params)`,
+                                       solved numerically from the profile by default.
+    """
+    def decorator(profile):
+        WIND_MODELS[name] = WindModel(profile, reference, influence_radius or partial(_solve_influence_radius,
+                                                                                       profile))
+        return profile
+    return decorator
+
+
+def get_wind_model(name):
+    """
+    Returns the registered `WindModel` of a name.
+    """
+    if name not in WIND_MODELS:
+        raise ValueError("Unknown wind model `{}`. Use one of {}.".format(name, sorted(WIND_MODELS)))
+    return WIND_MODELS[name]
+
+
+def wind_profile(name=DEFAULT_WIND_MODEL, **params):
+    """
+    Returns the array profile `profile(r, rmax, vmax)` of a model with its parameters bound.
+    The result is picklable, so that it can be sent to the parallel engine workers.
+    """
+    profile = get_wind_model(name).profile
+    return partial(profile, **params) if params else profile
+
+
+def influence_radius(name, rmax, vmax, wind_threshold, **params):
+    """
+    Distance beyond which the wind of a model stays below a threshold.
+
+    Parameters:
+        - name (str): Model name.
+        - rmax (1D array): Radius of maximum wind, meter.
+        - vmax (1D array): Maximum wind speed, m/s.
+        - wind_threshold (float): Wind speed threshold, m/s.
+        - params: Model parameters.
+
+    Returns:
+        - 1D array: Influence radius, meter. Zero for fixes whose maximum wind does not exceed the threshold.
+    """
+    rmax, vmax = np.asarray(rmax, dtype=float), np.asarray(vmax, dtype=float)
+    return get_wind_model(name).influence_radius(rmax, vmax, wind_threshold, **params)
+
+
+def _solve_influence_radius(profile, rmax, vmax, wind_threshold, max_ratio=1e4, iterations=60, **params):
+    """
+    Bisects, in log space, the distance beyond `rmax` where a monotonically decaying outer profile crosses the
+    threshold. The upper bracket is returned, so that the wind beyond the radius is below the threshold.
+    """
+    rmax, vmax = np.broadcast_arrays(np.asarray(rmax, dtype=float), np.asarray(vmax, dtype=float))
+    low, high = np.zeros(rmax.shape), np.full(rmax.shape, np.log(max_ratio))
+    for _ in range(iterations):
+        middle = 0.5 * (low + high)
+        above = profile(rmax * np.exp(middle), rmax, vmax, **params) > wind_threshold
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
+    return np.where(vmax > wind_threshold, rmax * np.exp(high), 0.0)
+
+
+def _jelesnianski_reference(r, rmax, vmax):
+    # Imported here since data_processor depends on this module
+    from src.raincoat_takehome_science.data.data_processor import calculate_gradient_wind_speed_jelesnianski
+    return calculate_gradient_wind_speed_jelesnianski(r, rmax, vmax)
+
+
+register_wind_model('jelesnianski', _jelesnianski_reference,
+                    swath_engine.jelesnianski_influence_radius)(swath_engine.gradient_wind_speed_jelesnianski)
+
+
+def _holland1980_reference(r, rmax, vmax, b=1.5):
+    if r <= 0:
+        return 0.0
+    x = (rmax / r)**b
+    return vmax * math.sqrt(x * math.exp(1.0 - x))
+
+
+@register_wind_model('holland1980', _holland1980_reference)
+def holland1980(r, rmax, vmax, b=1.5):
+    """
+    Holland (1980) cyclostrophic gradient wind profile, scaled so that the wind is `vmax` at `rmax`:
+    `vmax * sqrt((rmax / r)**b * exp(1 - (rmax / r)**b))`.
+
+    Parameters:
+        - r (ndarray): Distance from the center, meter.
+        - rmax (float or ndarray): Radius of maximum wind, meter.
+        - vmax (float or ndarray): Maximum wind speed, m/s.
+        - b (float): Holland shape parameter, typically between 1 and 2.5.
+
+    Returns:
+        - ndarray: Wind speed, m/s.
+    """
+    r = swath_engine.as_float_array(r)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        x = (rmax / r)**b
+        vg = np.sqrt(x * np.exp(1.0 - x))
+    vg = np.where(r > 0, vg, 0.0)
+    vg *= vmax
+    return vg
+
+
+def _willoughby_reference(r, rmax, vmax, n=1.0, x1=2.5e5):
+    if r < 0:
+        return 0.0
+    if r <= rmax:
+        return vmax * (r / rmax)**n
+    return vmax * math.exp(-(r - rmax) / x1)
+
+
+def _willoughby_influence_radius(rmax, vmax, wind_threshold, n=1.0, x1=2.5e5):
+    with np.errstate(divide='ignore'):
+        return np.where(vmax > wind_threshold, rmax + x1 * np.log(vmax / wind_threshold), 0.0)
+
+
+@register_wind_model('willoughby', _willoughby_reference, _willoughby_influence_radius)
+def willoughby(r, rmax, vmax, n=1.0, x1=2.5e5):
+    """
+    Willoughby et al. (2006) profile with a single exponential outer decay: `vmax * (r / rmax)**n` inside the
+    radius of maximum wind and `vmax * exp(-(r - rmax) / x1)` outside of it. The defaults are the
+    typical values of the paper's regressions for a 50 m/s storm at 20 degrees latitude.
+
+    Parameters:
+        - r (ndarray): Distance from the center, meter.
+        - rmax (float or ndarray): Radius of maximum wind, meter.
+        - vmax (float or ndarray): Maximum wind speed, m/s.
+        - n (float): Exponent of the inner power law.
+        - x1 (float): Decay length of the outer profile, meter.
+
+    Returns:
+        - ndarray: Wind speed, m/s.
+    """
+    r = swath_engine.as_float_array(r)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = r / rmax
+        vg = np.where(ratio <= 1.0, ratio**n, np.exp(-(r - rmax) / x1))
+    vg *= vmax
+    return vg
+
+
+def _rankine_reference(r, rmax, vmax, alpha=1.0):
+    if r < 0:
+        return 0.0
+    if r <= rmax:
+        return vmax * r / rmax
+    return vmax * (rmax / r)**alpha
+
+
+def _rankine_influence_radius(rmax, vmax, wind_threshold, alpha=1.0):
+    return np.where(vmax > wind_threshold, rmax * (vmax / wind_threshold)**(1.0 / alpha), 0.0)
+
+
+@register_wind_model('rankine', _rankine_reference, _rankine_influence_radius)
+def rankine(r, rmax, vmax, alpha=1.0):
+    """
+    (Modified) Rankine vortex: solid body rotation `vmax * r / rmax` inside the radius of maximum wind and
+    `vmax * (rmax / r)**alpha` outside of it, `alpha=1` being the classical Rankine vortex.
+
+    Parameters:
+        - r (ndarray): Distance from the center, meter.
+        - rmax (float or ndarray): Radius of maximum wind, meter.
+        - vmax (float or ndarray): Maximum wind speed, m/s.
+        - alpha (float): Decay exponent of the outer profile, typically between 0.4 and 1.
+
+    Returns:
+        - ndarray: Wind speed, m/s.
+    """
+    r = swath_engine.as_float_array(r)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = r / rmax
+        vg = np.where(ratio <= 1.0, ratio, ratio**-alpha)
+    vg *= vmax
+    return vg
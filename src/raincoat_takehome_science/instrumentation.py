@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+"""
+Stage timers, counters and optional profiles of the pipeline.
+
+The pipeline stages are wrapped in `stage` and report what they processed with `count`: rows parsed,
+fixes evaluated, grid cells touched, bytes written and cache hits and misses. The metrics of a process are
+collected in `METRICS` and never printed; `report` returns them as a JSON-serializable dict and
+`save_report` writes them to a file. With `enable_profiling`, every outermost stage is also run under
+cProfile, with the stats of each stage saved to a `.prof` file and summarized in the report.
+"""
+
+import contextlib
+import json
+import os
+import time
+
+# Functions of each stage profile listed in the report
+PROFILE_TOP_FUNCTIONS = 15
+
+
+class Metrics:
+    """
+    Timers and counters of the pipeline stages of one process.
+
+    Stage times are inclusive: a stage running inside another one counts in both.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.profile_dir = None
+        self.profiles = {}
+        self._profiling = False
+
+    def reset(self):
+        """
+        Clears the timers, counters and profiles; profiling stays enabled.
+        """
+        self.stages.clear()
+        self.counters.clear()
+        self.profiles.clear()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Times a stage, and profiles it when profiling is enabled and no enclosing stage is profiled.
+        Usable as a context manager or as a function decorator.
+        """
+        profiler = None
+        if self.profile_dir is not None and not self._profiling:
+            # Imported here, the profiler is only needed when enabled
+            import cProfile
+
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            self._profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            timer = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            timer['calls'] += 1
+            timer['seconds'] += elapsed
+
+    def count(self, name, value=1):
+        """
+        Adds `value` to a counter.
+        """
+        self.counters[name] = self.counters.get(name, 0) + int(value)
+
+    def report(self):
+        """
+        Returns the timers, counters and profile summaries, saving the profiles into `profile_dir`.
+        """
+        report = {'stages': {name: dict(timer) for name, timer in self.stages.items()},
+                  'counters': dict(self.counters)}
+        if self.profiles:
+            report['profiles'] = {name: _profile_summary(profiler, os.path.join(self.profile_dir, name + '.prof'))
+                                  for name, profiler in self.profiles.items()}
+        return report
+
+
+def _profile_summary(profiler, path):
+    """
+    Saves the stats of a profile and returns its file and the functions with the highest cumulative time.
+    """
+    import pstats
+
+    profiler.dump_stats(path)
+    stats = pstats.Stats(path).stats
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+    return {'file': path,
+            'top': [{'function': '{}:{}({})'.format(*func), 'calls': ncalls, 'tottime': tottime, 'cumtime': cumtime}
+                    for func, (_, ncalls, tottime, cumtime, _) in top]}
+
+
+# Metrics of the current process
+METRICS = Metrics()
+
+
+def stage(name):
+    """
+    Times a stage in `METRICS`, see `Metrics.stage`.
+    """
+    return METRICS.stage(name)
+
+
+def count(name, value=1):
+    """
+    Adds `value` to a counter of `METRICS`.
+    """
+    METRICS.count(name, value)
+
+
+def count_bytes(path, name='bytes_written'):
+    """
+    Adds the size of a file, or of all files under a directory, to a counter of `METRICS`.
+    """
+    if os.path.isdir(path):
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    else:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+    METRICS.count(name, size)
+
+
+def enable_profiling(directory):
+    """
+    Profiles the outermost stages with cProfile, saving the stats of each stage into `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    METRICS.profile_dir = directory
+
+
+def reset():
+    """
+    Clears the metrics of the current process.
+    """
+    METRICS.reset()
+
+
+def report():
+    """
+    Returns the metrics of the current process, see `Metrics.report`.
+    """
+    return METRICS.report()
+
+
+def save_report(to_file, **extra):
+    """
+    Writes the metrics of the current process, along with `extra` entries, as JSON.
+    """
+    with open(to_file, 'w') as f:
+        json.dump(dict(extra, **report()), f, indent=2, default=str)
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+
+"""
+Fast rendering of swaths to indexed-colour PNG images and XYZ map tiles.
+
+The swath array is quantized once to 8-bit indices of a precomputed colormap lookup table and written as a
+palette PNG, without going through a matplotlib figure. Palette index 0 is transparent (no wind), indices 1 to
+`n_colors` are the colormap, followed by the coastline and track colours. Coastlines are rasterized once per
+extent and image size and reused by every image of the same area, and track points are burned in one
+vectorized assignment.
+"""
+
+import math
+import os
+import struct
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+# Number of colours of the colormap, as the 50 `contourf` levels of `plot_swath_wind_speed`
+DEFAULT_N_COLORS = 50
+DEFAULT_CMAP = 'jet'
+
+# Colours of the overlays, appended to the palette after the colormap
+COASTLINE_COLOR = (0, 0, 0)
+TRACK_COLOR = (255, 255, 255)
+
+# Edge of XYZ map tiles, pixels
+TILE_SIZE = 256
+
+
+@lru_cache(maxsize=32)
+def colormap_lut(cmap=DEFAULT_CMAP, n_colors=DEFAULT_N_COLORS):
+    """
+    Returns the palette of the rendered images: transparent, `n_colors` colours of a matplotlib colormap,
+    the coastline and the track colour.
+
+    Parameters:
+        - cmap (str): Matplotlib colormap name.
+        - n_colors (int): Number of colours the wind speed is quantized to, at most 253.
+
+    Returns:
+        - ndarray: Read-only palette of shape (n_colors + 3, 3), uint8.
+    """
+    if not 1 <= n_colors <= 253:
+        raise ValueError('The number of colours must be between 1 and 253, got {}.'.format(n_colors))
+    # Imported here, the colormaps do not need pyplot nor a figure
+    import matplotlib
+
+    colors = matplotlib.colormaps[cmap].resampled(n_colors)(np.arange(n_colors))[:, :3]
+    lut = np.vstack([[0, 0, 0], np.round(colors * 255), COASTLINE_COLOR, TRACK_COLOR]).astype(np.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+def quantize(field, vmax=None, n_colors=DEFAULT_N_COLORS):
+    """
+    Quantizes a wind speed field to palette indices of `colormap_lut`.
+
+    Parameters:
+        - field (ndarray): Wind speed, m/s. Cells without wind (0 or NaN) get the transparent index 0.
+        - vmax (float): Wind speed of the last colour, the rounded maximum of the field by default, like the
+                        levels of `plot_swath_wind_speed`.
+        - n_colors (int): Number of colours.
+
+    Returns:
+        - ndarray: Indices, uint8, of the same shape as the field.
+    """
+    field = np.asarray(field)
+    if vmax is None:
+        vmax = np.around(np.nanmax(field)) if field.size else 0.0
+    scale = n_colors / vmax if vmax > 0 else 0.0
+    with np.errstate(invalid='ignore'):
+        indices = np.clip(np.nan_to_num(field * scale, nan=-1.0), 0, n_colors - 1).astype(np.uint8) + 1
+        indices[~(field > 0)] = 0
+    return indices
+
+
+def write_indexed_png(to_file, indices, palette, compresslevel=6):
+    """
+    Writes 8-bit palette indices as an indexed-colour PNG whose index 0 is transparent.
+
+    Parameters:
+        - to_file (str): Path to the `.png` file.
+        - indices (2D array): Palette indices, uint8, rows from top to bottom.
+        - palette (ndarray): Palette of shape (colour, 3), uint8.
+        - compresslevel (int): zlib compression level.
+    """
+    indices = np.ascontiguousarray(indices, dtype=np.uint8)
+    height, width = indices.shape
+    # Every row starts with its filter type, 0 (none)
+    rows = np.zeros((height, width + 1), dtype=np.uint8)
+    rows[:, 1:] = indices
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    with open(to_file, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)))
+        f.write(chunk(b'PLTE', np.ascontiguousarray(palette, dtype=np.uint8).tobytes()))
+        f.write(chunk(b'tRNS', b'\x00'))
+        f.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), compresslevel)))
+        f.write(chunk(b'IEND', b''))
+
+
+def natural_earth_scale(extent):
+    """
+    Returns the Natural Earth scale suited to an extent, as the `auto` scale of the cartopy features.
+    """
+    span = max(extent[1] - extent[0], extent[3] - extent[2])
+    return '10m' if span <= 15 else '50m' if span <= 50 else '110m'
+
+
+@lru_cache(maxsize=16)
+def natural_earth_geometries(extent, category='physical', name='coastline', scale=None):
+    """
+    Returns the Natural Earth geometries intersecting an extent, read once per process.
+
+    Parameters:
+        - extent (tuple): (lon_min, lon_max, lat_min, lat_max), degrees.
+        - category, name (str): Natural Earth dataset, e.g. `cultural`, `admin_0_boundary_lines_land`.
+        - scale (str): `10m`, `50m` or `110m`, by default from the extent (see `natural_earth_scale`).
+
+    Returns:
+        - tuple: Shapely geometries in longitude/latitude.
+    """
+    # Imported here, cartopy is only needed for the map overlays
+    import cartopy.feature as cfeature
+
+    scale = scale or natural_earth_scale(extent)
+    feature = cfeature.NaturalEarthFeature(category, name, scale)
+    return tuple(feature.intersecting_geometries(list(extent)))
+
+
+def _line_coordinates(geometries):
+    """
+    Yields the (lon, lat) vertex arrays of the lines and polygon rings of geometries.
+    """
+    for geometry in geometries:
+        if hasattr(geometry, 'geoms'):
+            yield from _line_coordinates(geometry.geoms)
+        elif geometry.geom_type == 'Polygon':
+            yield np.asarray(geometry.exterior.coords)
+            for ring in geometry.interiors:
+                yield np.asarray(ring.coords)
+        elif not geometry.is_empty:
+            yield np.asarray(geometry.coords)
+
+
+def rasterize_lines(geometries, extent, shape):
+    """
+    Returns the flat indices of the pixels crossed by line geometries in an image of a lon/lat extent.
+
+    Geometries are clipped to the extent and their segments are sampled at least once per pixel, all at once
+    with array operations.
+
+    Parameters:
+        - geometries (iterable): Shapely line or polygon geometries in longitude/latitude.
+        - extent (tuple): (lon_min, lon_max, lat_min, lat_max) of the image edges, degrees.
+        - shape (tuple): Image shape (height, width).
+
+    Returns:
+        - 1D array: Flat pixel indices.
+    """
+    # Imported here, shapely comes with cartopy and is only needed for the map overlays
+    from shapely.geometry import box
+
+    height, width = shape
+    lon_min, lon_max, lat_min, lat_max = extent
+    window = box(lon_min, lat_min, lon_max, lat_max)
+    clipped = [(geometry.boundary if geometry.geom_type in ('Polygon', 'MultiPolygon') else geometry)
+               .intersection(window) for geometry in geometries]
+    lines = [coords[:, :2] for coords in _line_coordinates(clipped) if len(coords) > 1]
+    if not lines:
+        return np.empty(0, dtype=np.int64)
+
+    # Pixel coordinates of the segment ends, segments joining consecutive lines are dropped
+    points = np.concatenate(lines)
+    cols = (points[:, 0] - lon_min) / (lon_max - lon_min) * width
+    rows = (lat_max - points[:, 1]) / (lat_max - lat_min) * height
+    valid = np.ones(len(points) - 1, dtype=bool)
+    valid[np.cumsum([len(line) for line in lines])[:-1] - 1] = False
+    start = np.flatnonzero(valid)
+
+    steps = np.ceil(np.maximum(np.abs(cols[start + 1] - cols[start]), np.abs(rows[start + 1] - rows[start])))
+    steps = steps.astype(np.int64) + 1
+    segment = np.repeat(start, steps)
+    offset = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+    fraction = offset / np.repeat(np.maximum(steps - 1, 1), steps)
+    sample_cols = np.floor(cols[segment] + fraction * (cols[segment + 1] - cols[segment])).astype(np.int64)
+    sample_rows = np.floor(rows[segment] + fraction * (rows[segment + 1] - rows[segment])).astype(np.int64)
+
+    inside = (sample_cols >= 0) & (sample_cols < width) & (sample_rows >= 0) & (sample_rows < height)
+    return np.unique(sample_rows[inside] * width + sample_cols[inside])
+
+
+@lru_cache(maxsize=64)
+def coastline_pixels(extent, shape, scale=None):
+    """
+    Returns the flat indices of the coastline pixels of an image, rasterized once per extent and image shape.
+    """
+    pixels = rasterize_lines(natural_earth_geometries(extent, 'physical', 'coastline', scale), extent, shape)
+    pixels.flags.writeable = False
+    return pixels
+
+
+def swath_image(swath, lat_axis, lon_axis, vmax=None, n_colors=DEFAULT_N_COLORS, pixels_per_cell=1, track=None,
+                coastlines=False, scale=None):
+    """
+    Renders a swath to an image of palette indices of `colormap_lut`, north up.
+
+    Parameters:
+        - swath (2D array): Swath of shape (lon, lat), as returned by `generate_swath_data`.
+        - lat_axis, lon_axis (1D array): Regular grid axes, degrees.
+        - vmax (float): Wind speed of the last colour, see `quantize`.
+        - n_colors (int): Number of colours.
+        - pixels_per_cell (int): Edge of the square of pixels of each grid cell.
+        - track (tuple): Optional (lats, lons) of the fixes drawn as points.
+        - coastlines (bool): Draw the Natural Earth coastlines.
+        - scale (str): Natural Earth scale of the coastlines, `10m`, `50m` or `110m`, from the extent by default.
+
+    Returns:
+        - image (2D array): Palette indices, uint8, of shape (lat * pixels_per_cell, lon * pixels_per_cell).
+        - extent (tuple): (lon_min, lon_max, lat_min, lat_max) of the image edges, degrees.
+    """
+    lat_axis, lon_axis = np.asarray(lat_axis, dtype=float), np.asarray(lon_axis, dtype=float)
+    image = quantize(np.asarray(swath).T[::-1], vmax, n_colors)
+    if pixels_per_cell > 1:
+        image = np.repeat(np.repeat(image, pixels_per_cell, axis=0), pixels_per_cell, axis=1)
+
+    dlat = lat_axis[1] - lat_axis[0] if len(lat_axis) > 1 else 1.0
+    dlon = lon_axis[1] - lon_axis[0] if len(lon_axis) > 1 else 1.0
+    extent = (float(lon_axis[0] - 0.5 * dlon), float(lon_axis[-1] + 0.5 * dlon),
+              float(lat_axis[0] - 0.5 * dlat), float(lat_axis[-1] + 0.5 * dlat))
+
+    if coastlines:
+        image.flat[coastline_pixels(extent, image.shape, scale)] = n_colors + 1
+    if track is not None:
+        lats, lons = (np.asarray(values, dtype=float) for values in track)
+        rows = np.floor((extent[3] - lats) / (extent[3] - extent[2]) * image.shape[0]).astype(np.int64)
+        cols = np.floor((lons - extent[0]) / (extent[1] - extent[0]) * image.shape[1]).astype(np.int64)
+        inside = (rows >= 0) & (rows < image.shape[0]) & (cols >= 0) & (cols < image.shape[1])
+        image[rows[inside], cols[inside]] = n_colors + 2
+    return image, extent
+
+
+def render_swath_png(swath, lat_axis, lon_axis, to_file, vmax=None, cmap=DEFAULT_CMAP, n_colors=DEFAULT_N_COLORS,
+                     pixels_per_cell=1, track=None, coastlines=False, scale=None, compresslevel=6):
+    """
+    Renders a swath straight to an indexed-colour PNG, one pixel (or square of pixels) per grid cell.
+
+    Parameters:
+        - to_file (str): Path to the `.png` file.
+        - cmap (str): Matplotlib colormap name.
+        - compresslevel (int): zlib compression level.
+        - Other parameters: See `swath_image`.
+
+    Returns:
+        - tuple: (lon_min, lon_max, lat_min, lat_max) extent of the image, degrees.
+    """
+    image, extent = swath_image(swath, lat_axis, lon_axis, vmax, n_colors, pixels_per_cell, track, coastlines,
+                                scale)
+    write_indexed_png(to_file, image, colormap_lut(cmap, n_colors), compresslevel)
+    print('Swath image saved in {}....'.format(to_file))
+    return extent
+
+
+def tile_range(extent, zoom):
+    """
+    Returns the ranges of the x and y indices of the XYZ (web mercator) tiles covering an extent.
+    """
+    n = 2**zoom
+    lon_min, lon_max, lat_min, lat_max = extent
+
+    def tile_y(lat):
+        lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+        return int((1.0 - math.asinh(math.tan(lat)) / math.pi) * 0.5 * n)
+
+    x_range = range(max(int((lon_min + 180.0) / 360.0 * n), 0), min(int((lon_max + 180.0) / 360.0 * n), n - 1) + 1)
+    y_range = range(max(tile_y(lat_max), 0), min(tile_y(lat_min), n - 1) + 1)
+    return x_range, y_range
+
+
+def render_swath_tiles(swath, lat_axis, lon_axis, directory, zooms, vmax=None, cmap=DEFAULT_CMAP,
+                       n_colors=DEFAULT_N_COLORS, compresslevel=6):
+    """
+    Renders a swath to XYZ (web mercator) map tiles `<directory>/<z>/<x>/<y>.png`, resampled to the nearest
+    grid cell. The swath is quantized once; tiles without wind are not written.
+
+    Parameters:
+        - swath (2D array): Swath of shape (lon, lat), as returned by `generate_swath_data`.
+        - lat_axis, lon_axis (1D array): Regular grid axes, degrees.
+        - directory (str): Output directory.
+        - zooms (iterable): Zoom levels.
+        - vmax, cmap, n_colors, compresslevel: See `render_swath_png`.
+
+    Returns:
+        - int: Number of tiles written.
+    """
+    lat_axis, lon_axis = np.asarray(lat_axis, dtype=float), np.asarray(lon_axis, dtype=float)
+    indices = quantize(swath, vmax, n_colors)
+    palette = colormap_lut(cmap, n_colors)
+    dlat = lat_axis[1] - lat_axis[0] if len(lat_axis) > 1 else 1.0
+    dlon = lon_axis[1] - lon_axis[0] if len(lon_axis) > 1 else 1.0
+    extent = (lon_axis[0] - 0.5 * dlon, lon_axis[-1] + 0.5 * dlon, lat_axis[0] - 0.5 * dlat, lat_axis[-1] + 0.5 * dlat)
+
+    pixels = np.arange(TILE_SIZE) + 0.5
+    n_tiles = 0
+    for zoom in zooms:
+        n = 2**zoom
+        x_range, y_range = tile_range(extent, zoom)
+        for x in x_range:
+            lons = (x * TILE_SIZE + pixels) / (TILE_SIZE * n) * 360.0 - 180.0
+            cols = np.round((lons - lon_axis[0]) / dlon).astype(np.int64)
+            valid_cols = (cols >= 0) & (cols < len(lon_axis))
+            if not valid_cols.any():
+                continue
+            for y in y_range:
+                lats = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * (y * TILE_SIZE + pixels) / (TILE_SIZE * n)))))
+                rows = np.round((lats - lat_axis[0]) / dlat).astype(np.int64)
+                valid_rows = (rows >= 0) & (rows < len(lat_axis))
+                if not valid_rows.any():
+                    continue
+                tile = indices[np.clip(cols, 0, len(lon_axis) - 1)[np.newaxis, :],
+                               np.clip(rows, 0, len(lat_axis) - 1)[:, np.newaxis]]
+                tile[~(valid_rows[:, np.newaxis] & valid_cols[np.newaxis, :])] = 0
+                if not tile.any():
+                    continue
+                os.makedirs(os.path.join(directory, str(zoom), str(x)), exist_ok=True)
+                write_indexed_png(os.path.join(directory, str(zoom), str(x), '{}.png'.format(y)), tile, palette,
+                                  compresslevel)
+                n_tiles += 1
+
+    print('{} swath tiles saved in {}....'.format(n_tiles, directory))
+    return n_tiles
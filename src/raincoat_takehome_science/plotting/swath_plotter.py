@@ -1,25 +1,37 @@
 #!/usr/bin/env python
 
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
+import os
+
 import numpy as np
 
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+from src.raincoat_takehome_science.plotting.raster_renderer import natural_earth_geometries, render_swath_png, \
+    render_swath_tiles
+
 
 
 def plot_swath_wind_speed(swath_max_wind_speed, grid_lon, grid_lat, area, path_to_save, showfig):
     """
     Plots the wind intensity swath over Puerto Rico using Cartopy.
 
+    The swath is drawn as one image of 50 colour bands, interpolated between the cell centers, which looks
+    like 50-level filled contours at a fraction of their rendering time. The grid has to be regular, as
+    built by `swath_engine.build_grid_axes`.
+
     Parameters:
-        - swath_max_wind_speed (ndarray): Wind intensity data.
+        - swath_max_wind_speed (ndarray): Wind intensity data, (lon, lat) as returned by `generate_swath_data`.
         - grid_lat (ndarray): Latitude grid.
         - grid_lon (ndarray): Longitude grid.
         - area (list or tuple): Area in which data is plotted. 
         - path_to_save (str):   Path to save figure.
         - showfig (bool): Show figure or not.
     """
+    # Imported here, so that importing the package does not load matplotlib and cartopy
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import BoundaryNorm
+    import cartopy.crs as ccrs
+    from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 
     # Implementation to plot swath using Cartopy
     fig, ax = plt.subplots(figsize=(10,6), subplot_kw = {'projection':ccrs.PlateCarree()})
@@ -27,15 +39,22 @@ def plot_swath_wind_speed(swath_max_wind_speed, grid_lon, grid_lat, area, path_t
     # Area to plot
     ax.set_extent(area)
 
-    # Plot wind speed swath
-    cf = ax.contourf(grid_lon, 
-                     grid_lat, 
-                     swath_max_wind_speed, 
-                     cmap = plt.get_cmap('jet'), 
-                     levels = np.linspace(0, np.around(np.max(swath_max_wind_speed)), 50), 
-                     transform = ccrs.PlateCarree(),
-                     extend='max'
-                )
+    # Plot wind speed swath, one image row per latitude from south to north
+    lat_axis, lon_axis = grid_lat[0, :], grid_lon[:, 0]
+    dlat = (lat_axis[-1] - lat_axis[0]) / max(1, len(lat_axis) - 1)
+    dlon = (lon_axis[-1] - lon_axis[0]) / max(1, len(lon_axis) - 1)
+    cmap = plt.get_cmap('jet')
+    levels = np.linspace(0, max(np.around(np.max(swath_max_wind_speed)), 1.0), 50)
+    cf = ax.imshow(np.asarray(swath_max_wind_speed).T,
+                   origin='lower',
+                   extent=(lon_axis[0] - 0.5 * dlon, lon_axis[-1] + 0.5 * dlon,
+                           lat_axis[0] - 0.5 * dlat, lat_axis[-1] + 0.5 * dlat),
+                   cmap=cmap,
+                   norm=BoundaryNorm(levels, cmap.N, extend='max'),
+                   interpolation='bilinear',
+                   interpolation_stage='data',
+                   transform=ccrs.PlateCarree()
+                   )
     # Add grid lines
     gl = ax.gridlines(crs=ccrs.PlateCarree(), draw_labels=True, linestyle='--', linewidth=0.5, color='grey')
     gl.xlabels_top = False
@@ -46,10 +65,13 @@ def plot_swath_wind_speed(swath_max_wind_speed, grid_lon, grid_lat, area, path_t
     ax.set_xlabel("Longitude")
     ax.set_ylabel("Latitude")
 
-    # Add coastlines and political boundaries for better context
-    ax.add_feature(cfeature.COASTLINE)
-    ax.add_feature(cfeature.BORDERS, linestyle=':')
-    
+    # Add coastlines and political boundaries for better context, read once per area
+    extent = tuple(float(v) for v in area)
+    ax.add_geometries(natural_earth_geometries(extent, 'physical', 'coastline'), ccrs.PlateCarree(),
+                      facecolor='none', edgecolor='black')
+    ax.add_geometries(natural_earth_geometries(extent, 'cultural', 'admin_0_boundary_lines_land'), ccrs.PlateCarree(),
+                      facecolor='none', edgecolor='black', linestyle=':')
+
     # Add colorbar
     cbar = plt.colorbar(cf, ax=ax, orientation='vertical', fraction=0.04, pad=0.1, label='Wind Speed (m/s)')
     ax.set_title('Swath of Wind Speed over Puerto Rico')
@@ -62,6 +84,44 @@ def plot_swath_wind_speed(swath_max_wind_speed, grid_lon, grid_lat, area, path_t
     
     if showfig:
         plt.show()
+    plt.close(fig)
+
+
+@instrumentation.stage('save_swath_map')
+def save_swath_map(swath_max_wind_speed, grid_lon, grid_lat, area, path_to_save, mode='figure', showfig=False,
+                   track=None, pixels_per_cell=1, coastlines=True, zooms=(6, 7, 8, 9, 10)):
+    """
+    Saves the map of a swath with the selected renderer.
+
+    Parameters:
+        - swath_max_wind_speed (ndarray): Wind intensity data, (lon, lat) as returned by `generate_swath_data`.
+        - grid_lon, grid_lat (ndarray): Longitude and latitude grids.
+        - area (list or tuple): Area in which data is plotted by the `figure` renderer.
+        - path_to_save (str): Path to the image. Tiles are saved in the directory of the same name with a
+                              `_tiles` suffix.
+        - mode (str): `figure` for the cartopy figure of `plot_swath_wind_speed`, `raster` for an indexed-colour
+                      PNG with one pixel per cell or `tiles` for XYZ map tiles (see `raster_renderer`).
+        - showfig (bool): Show the `figure`.
+        - track (tuple): Optional (lats, lons) of the fixes drawn on the `raster` image.
+        - pixels_per_cell (int): Edge of the square of pixels of each cell of the `raster` image.
+        - coastlines (bool): Draw the coastlines on the `raster` image.
+        - zooms (iterable): Zoom levels of the `tiles`.
+
+    Returns:
+        - str: Path to the image or to the tiles directory.
+    """
+    if mode == 'figure':
+        plot_swath_wind_speed(swath_max_wind_speed, grid_lon, grid_lat, area, path_to_save, showfig)
+    elif mode == 'raster':
+        render_swath_png(swath_max_wind_speed, grid_lat[0, :], grid_lon[:, 0], path_to_save,
+                         pixels_per_cell=pixels_per_cell, track=track, coastlines=coastlines)
+    elif mode == 'tiles':
+        path_to_save = os.path.splitext(path_to_save)[0] + '_tiles'
+        render_swath_tiles(swath_max_wind_speed, grid_lat[0, :], grid_lon[:, 0], path_to_save, zooms)
+    else:
+        raise ValueError("Unknown plotting mode `{}`. Use `figure`, `raster` or `tiles`.".format(mode))
+    instrumentation.count_bytes(path_to_save)
+    return path_to_save
 
 
 def plot_wind_center_locations(lats, lons, area=[-70, -60, 15, 20]):
@@ -73,17 +133,18 @@ def plot_wind_center_locations(lats, lons, area=[-70, -60, 15, 20]):
     - grid_lat (ndarray): Latitude grid.
     - grid_lon (ndarray): Longitude grid.
     """
+    import matplotlib.pyplot as plt
+    import cartopy.crs as ccrs
+    import cartopy.feature as cfeature
+    from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 
     # Plotting
     fig, ax = plt.subplots(figsize=(10,6), subplot_kw={'projection': ccrs.PlateCarree()})
     ax.set_extent(area, crs=ccrs.PlateCarree())
     #lats, lons = data["LATN/S"].values, data["LONE/W"].values
 
-    # Plot the point with a circle
-    for lat, lon in zip(lats, lons):
-        pnt, = ax.plot(lon, lat, 'ro', markersize=5, transform=ccrs.PlateCarree())
-        #ax.add_patch(plt.Circle((lon, lat), 0.5, color='red', alpha=0.2, transform=projection))
-    pnt.set_label('Wind center location')
+    # Plot all points with a single call
+    ax.scatter(lons, lats, s=25, c='r', transform=ccrs.PlateCarree(), label='Wind center location')
     ax.legend()
 
     # Add coastlines and gridlines
@@ -93,10 +154,14 @@ def plot_wind_center_locations(lats, lons, area=[-70, -60, 15, 20]):
     gl.xformatter = LONGITUDE_FORMATTER
     gl.yformatter = LATITUDE_FORMATTER
     
-    # Add map features
-    ax.add_feature(cfeature.COASTLINE)
-    ax.add_feature(cfeature.BORDERS, linestyle=':')
-    ax.add_feature(cfeature.LAND, edgecolor='black')
+    # Add map features, read once per area
+    extent = tuple(float(v) for v in area)
+    ax.add_geometries(natural_earth_geometries(extent, 'physical', 'land'), ccrs.PlateCarree(),
+                      facecolor=cfeature.COLORS['land'], edgecolor='black')
+    ax.add_geometries(natural_earth_geometries(extent, 'physical', 'coastline'), ccrs.PlateCarree(),
+                      facecolor='none', edgecolor='black')
+    ax.add_geometries(natural_earth_geometries(extent, 'cultural', 'admin_0_boundary_lines_land'), ccrs.PlateCarree(),
+                      facecolor='none', edgecolor='black', linestyle=':')
 
     plt.show()
 
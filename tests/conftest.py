@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+INTERIM_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def interim_file():
+    """
+    Regenerates the interim track the tests read from the b-deck file, as the pipeline does.
+    """
+    from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+
+    os.makedirs(INTERIM_PATH, exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_intermediate_data(EXTERNAL_FILE, INTERIM_PATH)
+    return os.path.join(INTERIM_PATH, 'bal152017.dat')
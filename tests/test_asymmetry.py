@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.asymmetry as asymmetry
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data, track_fixes, update_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.fixture(scope='module')
+def maria():
+    return pd.read_csv(INTERIM_FILE)
+
+
+def _interpolated_scales(scales, azimuths):
+    c0, c1, c2, c3 = (c[:, np.newaxis] for c in swath_engine.quadrant_scale_coefficients(scales))
+    scale = c0 + c1 * np.cos(azimuths) + (c2 + c3 * np.cos(azimuths)) * np.sin(azimuths)
+    return np.clip(scale, swath_engine.MIN_QUADRANT_SCALE, swath_engine.MAX_QUADRANT_SCALE)
+
+
+def test_interpolated_scales_pass_through_quadrant_centers():
+    scales = np.array([[1.5, 0.8, 1.2, 0.6]])
+    centers = np.radians(asymmetry.QUADRANT_BEARINGS)
+    assert np.allclose(_interpolated_scales(scales, centers), scales)
+
+
+def test_contrasted_quadrants_give_finite_wind():
+    lat_axis, lon_axis = np.linspace(17.0, 19.0, 120), np.linspace(-67.0, -65.0, 120)
+    lats, lons = np.array([18.0]), np.array([-66.0])
+    wind = swath_engine.asymmetric_wind_speed(lat_axis, lon_axis, lats, lons,
+                                              swath_engine.haversine_distances(lat_axis, lon_axis, lats, lons),
+                                              np.array([3e4]), np.array([50.0]),
+                                              (np.array([[4.0, 0.25, 0.25, 0.25]]), np.array([3.0]), np.array([1.0])),
+                                              swath_engine.gradient_wind_speed_jelesnianski)
+    assert np.isfinite(wind).all()
+
+
+def test_min_interpolated_scale_bounds_the_interpolation(maria):
+    fixes = track_fixes(maria, asymmetric=True)
+    scales = fixes[['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4']].values
+    scales = np.vstack([scales, [[4.0, 0.25, 0.25, 0.25], [1.0, 1.0, 1.0, 1.0]]])
+    interpolated = _interpolated_scales(scales, np.radians(np.arange(0.0, 360.0, 0.1)))
+    assert (interpolated.min(axis=1) >= asymmetry.min_interpolated_scale(scales) - 1e-12).all()
+
+
+@pytest.mark.parametrize('area, grid_resolution', [(PUERTO_RICO, 0.01),
+                                                   ({'lat_max': 30, 'lat_min': 10, 'lon_max': -55, 'lon_min': -80},
+                                                    0.1)])
+def test_asymmetric_pruning_matches_threshold(maria, area, grid_resolution):
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath, _, _ = generate_swath_data(maria, area, grid_resolution, asymmetric=True)
+        pruned, _, _ = generate_swath_data(maria, area, grid_resolution, asymmetric=True, wind_threshold=17.49)
+    swath[swath < 17.49] = 0.0
+    np.testing.assert_array_equal(pruned, swath)
+
+
+def test_incremental_asymmetric_swath_matches_full_run(maria, tmp_path):
+    state_file = str(tmp_path / 'state.npz')
+    times = sorted(maria['YYYYMMDDHH'].unique())
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n_times in [len(times) - 6, len(times) - 1, len(times)]:
+            swath, _, _ = update_swath_data(maria[maria['YYYYMMDDHH'].isin(times[:n_times])], PUERTO_RICO, 0.01,
+                                            state_file, asymmetric=True)
+        full, _, _ = generate_swath_data(maria, PUERTO_RICO, 0.01, asymmetric=True)
+    np.testing.assert_array_equal(swath, full)
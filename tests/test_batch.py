@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import time
+
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.batch as batch
+import src.raincoat_takehome_science.data.reader_bdeck as reader_bdeck
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+AREA = {'lat_min': 17.5, 'lat_max': 18.5, 'lon_min': -67.5, 'lon_max': -65.5}
+
+
+def _crashing_run_job(job, params, output_dir, plot):
+    # Kills the worker on one job, like a segfault in a native library would
+    if job['job_id'] == 'job-5':
+        os._exit(1)
+    time.sleep(0.1)
+    return {'job_id': job['job_id'], 'storm_file': job['storm_file'], 'status': 'ok', 'error': None}
+
+
+def test_worker_crash_only_fails_the_crashing_job(monkeypatch, tmp_path):
+    # The workers are forked and inherit the patched job runner
+    monkeypatch.setattr(batch, '_run_job', _crashing_run_job)
+    # One area per job, so that every job is a task of its own
+    jobs = [{'job_id': 'job-{}'.format(i), 'storm_file': 'storm.dat', 'area': dict(AREA, lat_max=18.5 + i),
+             'grid_resolution': 0.1} for i in range(12)]
+
+    report = batch.run_batch(jobs, {'netcdf': {'enabled': False}}, str(tmp_path), workers=3)
+
+    assert sorted(report['job_id']) == sorted(job['job_id'] for job in jobs)
+    failed = report[report['status'] != 'ok']
+    assert list(failed['job_id']) == ['job-5']
+    assert failed['error'].iloc[0] == 'Worker process crashed'
+
+
+def test_jobs_of_the_same_storm_share_the_interim_file_and_cache(tmp_path):
+    interim_path = tmp_path / 'interim'
+    interim_path.mkdir()
+    params = {'files': {'path_bdeck_intermediate': str(interim_path)}, 'netcdf': {'enabled': False},
+              'cache': {'enabled': True, 'directory': str(tmp_path / 'cache'), 'max_bytes': 200_000}}
+    jobs = [{'job_id': 'job-{}'.format(i), 'storm_file': EXTERNAL_FILE, 'area': dict(AREA, lat_max=18.5 + 0.5 * i),
+             'grid_resolution': 0.1} for i in range(8)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = batch.run_batch(jobs, params, str(tmp_path / 'batch'), workers=4)
+
+    assert (report['status'] == 'ok').all(), report['error'].tolist()
+    assert os.listdir(str(interim_path)) == ['bal152017.dat']
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = reader_bdeck.convert_bdeck_data(reader_bdeck.load_b_deck_file(EXTERNAL_FILE))
+    pd.testing.assert_frame_equal(pd.read_csv(str(interim_path / 'bal152017.dat'), parse_dates=['YYYYMMDDHH']),
+                                  expected, check_dtype=False)
+
+
+def test_failed_interim_write_leaves_no_partial_file(tmp_path, monkeypatch):
+    class FailingOs:
+        """
+        `os` of a disk filling up once the interim file is written, before it is renamed.
+        """
+
+        def __getattr__(self, name):
+            return getattr(os, name)
+
+        def replace(self, src, dst):
+            raise OSError('disk full')
+
+    monkeypatch.setattr(reader_bdeck, 'os', FailingOs())
+    with pytest.raises(OSError), contextlib.redirect_stdout(io.StringIO()):
+        reader_bdeck.generate_intermediate_data(EXTERNAL_FILE, str(tmp_path))
+    assert os.listdir(str(tmp_path)) == []
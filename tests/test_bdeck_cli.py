@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import yaml
+
+# from local lib
+from benchmarks.bench_import_time import CLI_SCRIPT, LAZY_MODULES, PACKAGE_MODULES, PACKAGE_SCRIPT, ROOT
+
+EXTERNAL_FILE = os.path.join(ROOT, 'data', 'external', 'bal152017.dat')
+
+# Runs the CLI with the given arguments and prints the lazy dependencies that were loaded
+RUN_SCRIPT = CLI_SCRIPT.replace("['bdeck_cli.py', '--help']", 'sys.argv[:1] + {args!r}')
+
+
+def _loaded_lazy_modules(script):
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    lines = result.stdout.strip().splitlines()
+    return json.loads(lines[-1]), '\n'.join(lines[:-1])
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    with open(os.path.join(ROOT, 'config', 'config.yaml')) as f:
+        params = yaml.safe_load(f)
+    params['files'].update(path_bdeck_intermediate=str(tmp_path) + os.sep,
+                           output_ncfile=str(tmp_path / 'swath.nc'),
+                           output_plot_swath_wind_speed=str(tmp_path / 'swath.png'))
+    params['cache']['enabled'] = False
+    params['swath']['geometry_dir'] = None
+    config_file = str(tmp_path / 'config.yaml')
+    with open(config_file, 'w') as f:
+        yaml.safe_dump(params, f)
+    return config_file
+
+
+def test_package_import_does_not_load_optional_dependencies():
+    loaded, _ = _loaded_lazy_modules(PACKAGE_SCRIPT.format(
+        imports='\n'.join('import ' + m for m in PACKAGE_MODULES), lazy=LAZY_MODULES))
+    assert loaded == []
+
+
+def test_cli_help_does_not_load_optional_dependencies():
+    loaded, output = _loaded_lazy_modules(CLI_SCRIPT.format(lazy=LAZY_MODULES))
+    assert loaded == []
+    assert '--no-plot' in output and '--no-netcdf' in output
+
+
+def test_cli_without_optional_stages_does_not_load_their_dependencies(config_file, tmp_path):
+    args = ['--input_file', EXTERNAL_FILE, '--config_file', config_file, '--no-netcdf', '--no-plot']
+    loaded, output = _loaded_lazy_modules(RUN_SCRIPT.format(args=args, lazy=LAZY_MODULES))
+    assert 'Outputs saved to: none' in output
+    assert not set(loaded) & {'matplotlib', 'cartopy', 'netCDF4'}
+    assert not (tmp_path / 'swath.nc').exists() and not (tmp_path / 'swath.png').exists()
+
+
+def test_cli_netcdf_stage_writes_only_the_netcdf_output(config_file, tmp_path):
+    args = ['--input_file', EXTERNAL_FILE, '--config_file', config_file, '--netcdf', '--no-plot']
+    loaded, output = _loaded_lazy_modules(RUN_SCRIPT.format(args=args, lazy=LAZY_MODULES))
+    assert 'Outputs saved to: {}'.format(tmp_path / 'swath.nc') in output
+    assert 'netCDF4' in loaded and not set(loaded) & {'matplotlib', 'cartopy'}
+    assert (tmp_path / 'swath.nc').exists() and not (tmp_path / 'swath.png').exists()
+
+
+def test_cli_saves_the_metrics_report(config_file, tmp_path):
+    metrics_file, profile_dir = str(tmp_path / 'metrics.json'), str(tmp_path / 'profiles')
+    args = ['--input_file', EXTERNAL_FILE, '--config_file', config_file, '--netcdf', '--no-plot',
+            '--metrics', metrics_file, '--profile', profile_dir]
+    _loaded_lazy_modules(RUN_SCRIPT.format(args=args, lazy=LAZY_MODULES))
+
+    with open(metrics_file) as f:
+        metrics = json.load(f)
+    assert metrics['status'] == 'ok' and metrics['time_total'] > 0
+    assert {'generate_intermediate_data', 'prefilter_track', 'generate_swath_data', 'generate_nc'} <= set(
+        metrics['stages'])
+    assert {'rows_parsed', 'fixes_evaluated', 'cells_touched', 'bytes_written'} <= set(metrics['counters'])
+    assert all(os.path.isfile(profile['file']) for profile in metrics['profiles'].values())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(__file__), '..', 'benchmarks')
+
+
+@pytest.fixture
+def bench_suite(monkeypatch):
+    # The benchmarks import their helpers from the benchmarks directory
+    monkeypatch.syspath_prepend(BENCHMARKS_DIR)
+    import bench_suite
+    return bench_suite
+
+
+def _run_suite(*args):
+    return subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, 'bench_suite.py'), '--stages', 'load',
+                           'convert', '--repeat', '1'] + list(args), capture_output=True, text=True)
+
+
+def test_regressions_exceed_both_thresholds(bench_suite, capsys):
+    baseline = {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}, 'c': {'seconds': 0.001}, 'd': {'seconds': 1.0}}
+    results = {'a': {'seconds': 1.2}, 'b': {'seconds': 1.3}, 'c': {'seconds': 0.004}, 'd': {'seconds': 0.5},
+               'e': {'seconds': 9.0}}
+    assert bench_suite.compare(results, baseline, threshold=0.25, min_seconds=0.005) == ['b']
+    assert 'new' in capsys.readouterr().out
+
+
+def test_suite_compares_results_with_the_saved_baseline(tmp_path):
+    baseline_file, output_file = str(tmp_path / 'baseline.json'), str(tmp_path / 'results.json')
+    saved = _run_suite('--baseline', baseline_file, '--save_baseline', '--output', output_file)
+    assert saved.returncode == 0, saved.stdout + saved.stderr
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    with open(output_file) as f:
+        assert json.load(f) == baseline
+    assert {'load/maria', 'convert/maria', 'load/fixes=10', 'convert/fixes=1000'} <= set(baseline['results'])
+    assert all(result['seconds'] > 0 for result in baseline['results'].values())
+
+    # A generous threshold passes, a baseline many times faster regresses every case
+    assert _run_suite('--baseline', baseline_file, '--threshold', '100').returncode == 0
+    for result in baseline['results'].values():
+        result['seconds'] *= 1e-3
+    with open(baseline_file, 'w') as f:
+        json.dump(baseline, f)
+    regressed = _run_suite('--baseline', baseline_file, '--min_seconds', '0')
+    assert regressed.returncode == 1
+    assert '{} of {} cases regressed'.format(len(baseline['results']), len(baseline['results'])) in regressed.stdout
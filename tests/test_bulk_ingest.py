@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import pytest
+
+# from local lib
+from src.raincoat_takehome_science.data.bulk_ingest import ingest_bdeck_files, parse_bdeck_file, read_track_dataset
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+
+
+@pytest.fixture
+def malformed_file(tmp_path):
+    with open(EXTERNAL_FILE) as f:
+        lines = f.readlines()
+    bad_line = lines[1].replace('2017091618', '  20179999', 1)
+    to_file = tmp_path / 'bal152017.dat'
+    to_file.write_text(''.join(lines + [bad_line]))
+    return str(to_file), len(lines)
+
+
+def test_rows_with_malformed_timestamps_are_dropped(malformed_file):
+    file_path, n_valid = malformed_file
+    df = parse_bdeck_file(file_path)
+    assert len(df) == n_valid
+    assert df['YYYYMMDDHH'].notna().all()
+    assert (df['BASIN'] == 'AL').all() and (df['YEAR'] == 2017).all() and (df['CY'] == 15).all()
+
+
+def test_ingestion_of_a_file_with_a_malformed_row(malformed_file, tmp_path):
+    file_path, n_valid = malformed_file
+    root_path = str(tmp_path / 'tracks')
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = ingest_bdeck_files([file_path], root_path, workers=1)
+    assert report['error'].isna().all() and report['rows'].tolist() == [n_valid]
+    assert len(read_track_dataset(root_path, basin='AL', year=2017, storm=15)) == n_valid
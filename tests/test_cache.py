@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import netCDF4 as nc
+import numpy as np
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.data.cache as cache_module
+from src.raincoat_takehome_science.data.cache import ProductCache
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+def test_cache_hit_writes_the_outputs_of_a_fresh_run(tmp_path):
+    df = pd.read_csv(INTERIM_FILE)
+    cache = ProductCache(str(tmp_path / 'cache'))
+    outputs = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for run in ['fresh', 'cached', 'uncached']:
+            nc_file, out_file = str(tmp_path / (run + '.nc')), str(tmp_path / (run + '.npy'))
+            swath, _, _ = generate_swath_data(df, PUERTO_RICO, 0.05, time_step='1h', out_file=out_file,
+                                              nc_file=nc_file, cache=None if run == 'uncached' else cache)
+            with nc.Dataset(nc_file) as dataset:
+                outputs[run] = (np.array(swath), np.load(out_file), dataset['time'][:], dataset['wind_speed'][:])
+
+    assert cache.stats()['swath']['hits'] == 1
+    for cached, fresh in zip(outputs['cached'], outputs['uncached']):
+        np.testing.assert_array_equal(cached, fresh)
+    np.testing.assert_array_equal(outputs['cached'][0], outputs['cached'][1])
+
+
+def test_eviction_skips_products_removed_by_another_process(tmp_path, monkeypatch):
+    cache = ProductCache(str(tmp_path / 'cache'), max_bytes=2000)
+    for i in range(3):
+        cache.put_array(cache.key('swath', [str(i)]), np.zeros(100))
+    last_path = os.path.join(cache.directory, cache.key('swath', ['last']) + '.npy')
+
+    class RacingOs:
+        """
+        `os` of a cache whose products are evicted by another process right after being listed.
+        """
+
+        def __getattr__(self, name):
+            return getattr(os, name)
+
+        def listdir(self, path):
+            return os.listdir(path) + ['swath-gone.npy']
+
+        def stat(self, path):
+            result = os.stat(path)
+            if path != last_path:
+                os.remove(path)
+            return result
+
+    monkeypatch.setattr(cache_module, 'os', RacingOs())
+    np.testing.assert_array_equal(cache.put_array(cache.key('swath', ['last']), np.ones(100)), np.ones(100))
+    monkeypatch.undo()
+    assert cache.get_array(cache.key('swath', ['0'])) is None
+
+
+def _fill_cache(directory, worker):
+    cache = ProductCache(directory, max_bytes=4000)
+    for i in range(50):
+        key = cache.key('swath', [str(worker), str(i)])
+        cache.put_array(key, np.full(100, i))
+        cache.get_array(cache.key('swath', [str(1 - worker), str(i)]))
+
+
+def test_processes_sharing_a_cache_evict_concurrently(tmp_path):
+    directory = str(tmp_path / 'cache')
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for future in [pool.submit(_fill_cache, directory, worker) for worker in range(2)]:
+            future.result()
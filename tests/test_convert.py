@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+# from local lib
+import src.raincoat_takehome_science.data.convert as convert
+from src.raincoat_takehome_science.data.reader_bdeck import load_b_deck_file
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+
+
+def test_vectorized_coordinates_match_the_scalar_conversion():
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = load_b_deck_file(EXTERNAL_FILE)
+    lat_str = pd.concat([df['LATN/S'], pd.Series([' 105S', np.nan])], ignore_index=True)
+    lon_str = pd.concat([df['LONE/W'], pd.Series(['1795E', np.nan])], ignore_index=True)
+
+    lats, lons = convert.convert_latlon_hemi_2_degree_array(lat_str, lon_str)
+    expected = [convert.convert_latlon_hemi_2_degree(lat.strip(), lon.strip())
+                for lat, lon in zip(lat_str[:-1], lon_str[:-1])]
+    np.testing.assert_array_equal(lats[:-1], [lat for lat, _ in expected])
+    np.testing.assert_array_equal(lons[:-1], [lon for _, lon in expected])
+    assert (lats[-2], lons[-2]) == (-10.5, 179.5)
+    assert np.isnan(lats[-1]) and np.isnan(lons[-1])
+
+
+def test_projection_of_all_points_matches_each_point():
+    lats, lons = np.array([12.4, 18.0, 25.3]), np.array([-53.1, -66.0, -71.8])
+    x, y = convert.latlon_2_xy(lats, lons)
+    for i in range(len(lats)):
+        xi, yi = convert.latlon_2_xy(lats[i], lons[i])
+        assert np.isclose(x[i], xi, rtol=0, atol=1e-6) and np.isclose(y[i], yi, rtol=0, atol=1e-6)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+from src.raincoat_takehome_science.data.data_processor import (RAD34, generate_swath_data, prefilter_track,
+                                                               update_swath_data)
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.fixture(scope='module')
+def maria():
+    return pd.read_csv(INTERIM_FILE)
+
+
+@pytest.mark.parametrize('options', [{}, {'wind_threshold': 17.49}, {'time_step': '1h'}])
+def test_incremental_swath_matches_full_run(maria, tmp_path, options):
+    state_file = str(tmp_path / 'state.npz')
+    times = sorted(maria['YYYYMMDDHH'].unique())
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        for n_times in [len(times) - 6, len(times) - 2, len(times), len(times)]:
+            swath, _, _ = update_swath_data(maria[maria['YYYYMMDDHH'].isin(times[:n_times])], PUERTO_RICO, 0.01,
+                                            state_file, **options)
+        full, _, _ = generate_swath_data(maria, PUERTO_RICO, 0.01, **options)
+    np.testing.assert_array_equal(swath, full)
+    # Only the fixes appended since the previous run are evaluated
+    assert 'Swath update with 0 new rows' in output.getvalue()
+    assert 'recomputed' not in output.getvalue()
+
+
+def test_revised_fixes_recompute_the_swath(maria, tmp_path):
+    state_file = str(tmp_path / 'state.npz')
+    revised = maria.copy()
+    revised.loc[0, 'VMAX'] += 5.0
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        update_swath_data(maria, PUERTO_RICO, 0.01, state_file)
+        swath, _, _ = update_swath_data(revised, PUERTO_RICO, 0.01, state_file)
+        full, _, _ = generate_swath_data(revised, PUERTO_RICO, 0.01)
+    assert 'is outdated' in output.getvalue()
+    np.testing.assert_array_equal(swath, full)
+
+
+def _prefiltered_swaths(df, **swath_options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        filtered = prefilter_track(df, PUERTO_RICO, swath_options=swath_options)
+        swath, _, _ = generate_swath_data(df, PUERTO_RICO, 0.01, **swath_options)
+        prefiltered, _, _ = generate_swath_data(filtered, PUERTO_RICO, 0.01, **swath_options)
+    return filtered, swath, prefiltered
+
+
+@pytest.mark.parametrize('options', [{'wind_threshold': 17.49}, {'wind_threshold': 17.49, 'time_step': '1h'},
+                                     {'wind_threshold': 17.49, 'asymmetric': True}])
+def test_prefilter_leaves_the_thresholded_swath_unchanged(maria, options):
+    filtered, swath, prefiltered = _prefiltered_swaths(maria, **options)
+    # Most fixes of the track are far from Puerto Rico
+    assert filtered['YYYYMMDDHH'].nunique() < maria['YYYYMMDDHH'].nunique() / 2
+    np.testing.assert_array_equal(prefiltered, swath)
+
+
+def test_prefilter_keeps_winds_above_34_knots(maria):
+    _, swath, prefiltered = _prefiltered_swaths(maria)
+    reached = swath >= RAD34
+    assert reached.any()
+    np.testing.assert_array_equal(prefiltered[reached], swath[reached])
+
+
+def test_disabled_prefilter_returns_the_track(maria):
+    assert prefilter_track(maria, PUERTO_RICO, {'enabled': False}) is maria
+
+
+def test_prefilter_does_not_import_geometry_libraries():
+    code = ('import sys, pandas as pd; '
+            'from src.raincoat_takehome_science.data.data_processor import prefilter_track; '
+            'df = pd.read_csv({!r}); '
+            'prefilter_track(df, {!r}); '
+            'sys.exit(any(m in sys.modules for m in ["geopandas", "shapely"]))').format(INTERIM_FILE, PUERTO_RICO)
+    root = os.path.join(os.path.dirname(__file__), '..')
+    assert subprocess.run([sys.executable, '-c', code], cwd=root, stdout=subprocess.DEVNULL).returncode == 0
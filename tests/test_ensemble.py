@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import netCDF4 as nc
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.ensemble as ensemble
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.fixture(scope='module')
+def maria():
+    return pd.read_csv(INTERIM_FILE)
+
+
+def test_ensemble_statistics_and_netcdf_output(maria, tmp_path):
+    nc_file = str(tmp_path / 'ensemble.nc')
+    with contextlib.redirect_stdout(io.StringIO()):
+        result, _, _ = ensemble.generate_ensemble_data(maria, PUERTO_RICO, 0.05, n_members=20, seed=0, tile_size=8,
+                                                       nc_file=nc_file)
+        control, _, _ = generate_swath_data(maria, PUERTO_RICO, 0.05)
+
+    np.testing.assert_allclose(result['wind_speed'], control, rtol=1e-12)
+    probability, percentile = result['exceedance_probability'], result['wind_speed_percentile']
+    assert ((probability >= 0.0) & (probability <= 1.0)).all()
+    # Higher thresholds are exceeded less often, higher percentiles are stronger
+    assert (np.diff(probability, axis=0) <= 0.0).all()
+    assert (np.diff(percentile, axis=0) >= 0.0).all()
+
+    with nc.Dataset(nc_file) as dataset:
+        np.testing.assert_allclose(dataset['exceedance_probability'][:], probability.transpose(0, 2, 1), atol=1e-6)
+        np.testing.assert_allclose(dataset['wind_speed_percentile'][:], percentile.transpose(0, 2, 1), rtol=1e-6)
+
+
+def test_failed_ensemble_removes_the_partial_netcdf_file(maria, tmp_path, monkeypatch):
+    nc_file = str(tmp_path / 'ensemble.nc')
+    ensemble_tile, calls = ensemble.ensemble_tile, []
+
+    def failing_tile(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError('tile failed')
+        return ensemble_tile(*args)
+
+    monkeypatch.setattr(ensemble, 'ensemble_tile', failing_tile)
+    output = io.StringIO()
+    with pytest.raises(RuntimeError), contextlib.redirect_stdout(output):
+        ensemble.generate_ensemble_data(maria, PUERTO_RICO, 0.05, n_members=4, seed=0, tile_size=8, nc_file=nc_file)
+    assert not os.path.exists(nc_file)
+    assert 'created' not in output.getvalue()
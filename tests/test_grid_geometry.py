@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+from src.raincoat_takehome_science.data.data_processor import track_fixes
+from src.raincoat_takehome_science.data.grid_geometry import get_grid_geometry
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.fixture(scope='module')
+def fixes():
+    return track_fixes(pd.read_csv(INTERIM_FILE), wind_threshold=17.49, asymmetric=True)
+
+
+@pytest.fixture(scope='module')
+def geometry(tmp_path_factory):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return get_grid_geometry(PUERTO_RICO, 0.01, str(tmp_path_factory.mktemp('geometry')))
+
+
+def test_saved_geometry_is_pickled_as_its_directory(geometry):
+    assert len(pickle.dumps(geometry)) < 1024
+    unpickled = pickle.loads(pickle.dumps(geometry))
+    assert isinstance(unpickled.sin_lat, np.memmap)
+    for name, values in geometry.terms().items():
+        np.testing.assert_array_equal(unpickled.terms()[name], values)
+
+
+@pytest.mark.parametrize('options', [{}, {'tile_size': 64}, {'tile_size': 64, 'workers': 2}])
+@pytest.mark.parametrize('asymmetric', [False, True])
+@pytest.mark.parametrize('pruned', [False, True])
+def test_cached_terms_match_computed_terms(fixes, geometry, options, asymmetric, pruned):
+    lats, lons, vmax, rmw = (fixes[c].values for c in ['LATN/S', 'LONE/W', 'VMAX', 'RMW'])
+    kwargs = dict(options, radii=fixes['RADIUS'].values if pruned else None)
+    if asymmetric:
+        vmax = fixes['VMAX_SYM'].values
+        kwargs['asymmetry'] = (fixes[['SCALE1', 'SCALE2', 'SCALE3', 'SCALE4']].values, fixes['UT'].values,
+                               fixes['VT'].values)
+    swath = swath_engine.compute_swath(geometry.lat_axis, geometry.lon_axis, lats, lons, vmax, rmw, **kwargs)
+    cached = swath_engine.compute_swath(geometry.lat_axis, geometry.lon_axis, lats, lons, vmax, rmw,
+                                        geometry=geometry, **kwargs)
+    np.testing.assert_array_equal(cached, swath)
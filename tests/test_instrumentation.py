@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.instrumentation as instrumentation
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+from src.raincoat_takehome_science.data.save_to_netcdf import generate_nc
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.fixture
+def metrics():
+    instrumentation.reset()
+    yield instrumentation.METRICS
+    instrumentation.reset()
+
+
+def test_stage_timers_are_inclusive_and_silent(capsys):
+    metrics = instrumentation.Metrics()
+
+    @metrics.stage('inner')
+    def inner():
+        metrics.count('items', 2)
+
+    with metrics.stage('outer'):
+        inner()
+        inner()
+    with pytest.raises(RuntimeError), metrics.stage('failing'):
+        raise RuntimeError('stage failed')
+
+    report = metrics.report()
+    assert {name: timer['calls'] for name, timer in report['stages'].items()} == {'outer': 1, 'inner': 2,
+                                                                                  'failing': 1}
+    assert report['stages']['outer']['seconds'] >= report['stages']['inner']['seconds']
+    assert report['counters'] == {'items': 4}
+    assert 'profiles' not in report
+    assert capsys.readouterr().out == ''
+
+
+def test_only_outermost_stages_are_profiled(tmp_path):
+    metrics = instrumentation.Metrics()
+    metrics.profile_dir = str(tmp_path)
+    with metrics.stage('outer'), metrics.stage('inner'):
+        sum(range(1000))
+
+    profiles = metrics.report()['profiles']
+    assert list(profiles) == ['outer']
+    assert os.path.isfile(profiles['outer']['file']) and profiles['outer']['top']
+
+
+def test_pipeline_stages_report_their_counters(metrics, tmp_path):
+    nc_file = str(tmp_path / 'swath.nc')
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = generate_intermediate_data(EXTERNAL_FILE, str(tmp_path) + os.sep)
+        swath, grid_lat, grid_lon = generate_swath_data(df, PUERTO_RICO, 0.1, wind_threshold=17.49)
+        generate_nc(swath, grid_lon, grid_lat, df['YYYYMMDDHH'].values, nc_file)
+
+    report = instrumentation.report()
+    assert {'load_b_deck_file', 'generate_intermediate_data', 'generate_swath_data', 'generate_nc'} <= set(
+        report['stages'])
+    counters = report['counters']
+    assert counters['rows_parsed'] == len(pd.read_csv(EXTERNAL_FILE, header=None, skiprows=2, usecols=[0]))
+    assert counters['fixes_evaluated'] == df['YYYYMMDDHH'].nunique()
+    # Pruning skips the cells outside the influence radius of each fix
+    assert 0 < counters['cells_touched'] < counters['fixes_evaluated'] * swath.size
+    assert counters['bytes_written'] >= os.path.getsize(nc_file)
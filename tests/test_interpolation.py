@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+from src.raincoat_takehome_science.data.data_processor import RAD34, generate_swath_data, interpolate_track
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+
+
+def test_interpolated_track_keeps_the_fixes_on_a_regular_step():
+    df = pd.read_csv(INTERIM_FILE, parse_dates=['YYYYMMDDHH'])
+    track = interpolate_track(df, '15min')
+
+    fixes = df[np.isclose(df['RAD'], RAD34)].drop_duplicates('YYYYMMDDHH').set_index('YYYYMMDDHH')
+    kept = track.set_index('YYYYMMDDHH').loc[fixes.index]
+    for column in ['LATN/S', 'LONE/W', 'VMAX', 'RMW', 'RAD1', 'RAD2', 'RAD3', 'RAD4']:
+        np.testing.assert_allclose(kept[column], fixes[column])
+    assert (track['YYYYMMDDHH'].diff().dropna() == pd.Timedelta('15min')).all()
+    assert np.isclose(track['RAD'], RAD34).all()
+
+
+def test_interpolation_is_linear_and_crosses_the_antimeridian():
+    df = pd.DataFrame({'YYYYMMDDHH': pd.to_datetime(['2017-09-16 00:00', '2017-09-16 06:00']),
+                       'LATN/S': [10.0, 13.0], 'LONE/W': [179.0, -179.0], 'VMAX': [20.0, 30.0],
+                       'RMW': [4e4, 3e4], 'DIR': [350.0, 10.0]})
+    track = interpolate_track(df, '3h')
+    assert len(track) == 3
+    np.testing.assert_allclose(track.loc[1, ['LATN/S', 'VMAX', 'RMW']].astype(float), [11.5, 25.0, 3.5e4])
+    assert abs(track.loc[1, 'LONE/W']) == pytest.approx(180.0)
+    assert track.loc[1, 'DIR'] % 360.0 == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize('time_step', ['0min', '-1h'])
+def test_non_positive_time_step_is_rejected(time_step):
+    with pytest.raises(ValueError):
+        interpolate_track(pd.read_csv(INTERIM_FILE), time_step)
+
+
+def test_interpolated_swath_covers_the_swath_of_the_fixes():
+    df = pd.read_csv(INTERIM_FILE)
+    area = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath, _, _ = generate_swath_data(df, area, 0.02)
+        dense, _, _ = generate_swath_data(df, area, 0.02, time_step='15min')
+    # The interpolated track holds every fix, and fills the gaps between them
+    assert (dense >= swath).all() and (dense > swath).any()
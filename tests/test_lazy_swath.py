@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from click.testing import CliRunner
+
+# from local lib
+from scripts.bdeck_cli import run
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+from src.raincoat_takehome_science.data.lazy_swath import generate_lazy_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+CONFIG_FILE = os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+rasterio = pytest.importorskip('rasterio')
+pytest.importorskip('dask')
+
+
+def _read_geotiff(to_file):
+    # Rows of the GeoTIFF run from north to south
+    with rasterio.open(to_file) as dataset:
+        return dataset.read(1)[::-1].T
+
+
+@pytest.mark.parametrize('outputs', [['swath.tif'], ['swath.nc', 'swath.tif'], ['swath.zarr', 'swath.tif']])
+def test_lazy_swath_exports_geotiff(tmp_path, outputs):
+    df = pd.read_csv(INTERIM_FILE)
+    to_files = [str(tmp_path / name) for name in outputs]
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath = generate_lazy_swath_data(df, PUERTO_RICO, 0.01, to_files, chunks=64,
+                                         export_options={'block_size': 32})
+        expected, _, _ = generate_swath_data(df, PUERTO_RICO, 0.01)
+
+    np.testing.assert_array_equal(_read_geotiff(to_files[-1]), expected.astype('float32'))
+    np.testing.assert_array_equal(swath.values.T, expected.astype('float32'))
+
+
+def test_cli_lazy_mode_writes_geotiff_export(tmp_path):
+    with open(CONFIG_FILE) as f:
+        params = yaml.safe_load(f)
+    params['files'].update(path_bdeck_intermediate=str(tmp_path), output_ncfile=str(tmp_path / 'swath.nc'))
+    params['swath']['geometry_dir'] = None
+    params['cache']['enabled'] = False
+    config_file = str(tmp_path / 'config.yaml')
+    with open(config_file, 'w') as f:
+        yaml.safe_dump(params, f)
+    to_file = str(tmp_path / 'out' / 'swath.tif')
+
+    result = CliRunner().invoke(run, ['--input_file', EXTERNAL_FILE, '--config_file', config_file, '--lazy',
+                                      '--no-plot', '--export', to_file])
+
+    assert 'Error' not in result.output, result.output
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected, _, _ = generate_swath_data(pd.read_csv(INTERIM_FILE), PUERTO_RICO, params['grid_resolution'])
+    np.testing.assert_array_equal(_read_geotiff(to_file), expected.astype('float32'))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.wind_models as wind_models
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+
+@pytest.mark.parametrize('swath_options', [{'workers': 2, 'nc_options': {'per_fix': True}},
+                                           {'engine': 'geodesic', 'tile_size': 8},
+                                           {'engine': 'unknown'}])
+def test_rejected_options_leave_no_netcdf_file(tmp_path, swath_options):
+    nc_file = str(tmp_path / 'swath.nc')
+    with pytest.raises(ValueError), contextlib.redirect_stdout(io.StringIO()):
+        generate_swath_data(pd.read_csv(INTERIM_FILE), PUERTO_RICO, 0.1, nc_file=nc_file, **swath_options)
+    assert not os.path.exists(nc_file)
+
+
+def test_failed_swath_removes_the_partial_netcdf_file(tmp_path):
+    nc_file = str(tmp_path / 'swath.nc')
+
+    def failing_profile(r, rmax, vmax):
+        raise RuntimeError('profile failed')
+
+    wind_models.register_wind_model('failing', failing_profile)(failing_profile)
+    try:
+        with pytest.raises(RuntimeError), contextlib.redirect_stdout(io.StringIO()):
+            generate_swath_data(pd.read_csv(INTERIM_FILE), PUERTO_RICO, 0.1, nc_file=nc_file, wind_model='failing')
+    finally:
+        del wind_models.WIND_MODELS['failing']
+    assert not os.path.exists(nc_file)
+
+
+@pytest.mark.parametrize('chunks', ['map', 'timeseries', (4, 16, 16)])
+def test_per_fix_fields_stream_into_compressed_variable(tmp_path, chunks):
+    nc = pytest.importorskip('netCDF4')
+    maria, nc_file = pd.read_csv(INTERIM_FILE), str(tmp_path / 'swath.nc')
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath, _, _ = generate_swath_data(maria, PUERTO_RICO, 0.05, tile_size=16, nc_file=nc_file,
+                                          nc_options={'per_fix': True, 'chunks': chunks})
+
+    with nc.Dataset(nc_file) as dataset:
+        fix_var = dataset['fix_wind_speed']
+        assert fix_var.shape == (maria['YYYYMMDDHH'].nunique(), swath.shape[1], swath.shape[0])
+        assert fix_var.filters()['zlib'] and fix_var.filters()['shuffle']
+        if chunks == 'map':
+            assert fix_var.chunking()[0] == 1
+        elif chunks == 'timeseries':
+            assert fix_var.chunking()[0] > 1
+        else:
+            assert fix_var.chunking() == list(chunks)
+        # The running maximum of the per-fix fields is the swath
+        np.testing.assert_allclose(fix_var[:].max(axis=0), dataset['wind_speed'][:], rtol=1e-6)
+        np.testing.assert_allclose(dataset['wind_speed'][:], swath.T, rtol=1e-6)
+
+
+def test_compression_shrinks_fine_grid_netcdf_files(tmp_path):
+    pytest.importorskip('netCDF4')
+    maria = pd.read_csv(INTERIM_FILE)
+    sizes = {}
+    for complevel in [0, 4]:
+        nc_file = str(tmp_path / 'swath_{}.nc'.format(complevel))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_swath_data(maria, PUERTO_RICO, 0.005, nc_file=nc_file,
+                                nc_options={'per_fix': True, 'complevel': complevel})
+        sizes[complevel] = os.path.getsize(nc_file)
+    assert sizes[4] * 3 < sizes[0]
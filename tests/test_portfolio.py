@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.portfolio as portfolio
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+# Wide enough to hold locations the storm does not reach
+CARIBBEAN = {'lat_max': 24.0, 'lat_min': 14.0, 'lon_max': -58.0, 'lon_min': -74.0}
+
+
+@pytest.fixture(scope='module')
+def maria():
+    return pd.read_csv(INTERIM_FILE)
+
+
+def test_point_index_returns_every_point_within_the_radius():
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(-80.0, 80.0, 20000), rng.uniform(-180.0, 180.0, 20000)
+    index = portfolio.PointIndex(lats, lons, bin_size=0.5)
+    for lat, lon, radius in [(18.0, -66.0, 3e5), (10.0, 179.8, 5e5), (-75.0, 0.0, 1e6), (0.0, -180.0, 1e4)]:
+        r = swath_engine.haversine_point_distances(lats, lons, lat, lon)
+        expected = np.flatnonzero(r <= radius)
+        assert np.isin(expected, index.query(lat, lon, radius)).all()
+
+
+def test_portfolio_peak_matches_swath_at_grid_points(maria, tmp_path):
+    thresholds = portfolio.DEFAULT_THRESHOLDS
+    locations_file, to_file = str(tmp_path / 'locations.csv'), str(tmp_path / 'exposure.parquet')
+    with contextlib.redirect_stdout(io.StringIO()):
+        swath, grid_lat, grid_lon = generate_swath_data(maria, CARIBBEAN, 0.1, wind_threshold=thresholds[0])
+        pd.DataFrame({'id': np.arange(swath.size), 'lat': grid_lat.ravel(), 'lon': grid_lon.ravel()}).to_csv(
+            locations_file, index=False)
+        n_locations = portfolio.generate_portfolio_exposure(maria, locations_file, to_file, chunk_size=5000,
+                                                            id_column='id')
+
+    exposure = pd.read_parquet(to_file)
+    assert n_locations == swath.size
+    np.testing.assert_array_equal(exposure['id'], np.arange(swath.size))
+    np.testing.assert_allclose(exposure['peak_wind_speed'], swath.ravel(), rtol=1e-9)
+    exposed = exposure['peak_wind_speed'] > 0
+    assert 0 < exposed.sum() < n_locations
+    assert exposure.loc[exposed, 'peak_time'].notna().all() and exposure.loc[~exposed, 'peak_time'].isna().all()
+    hours = exposure[['hours_above_{:.1f}'.format(t) for t in thresholds]].values
+    assert (np.diff(hours, axis=1) <= 0).all()
+    assert ((hours[:, 0] > 0) == exposed).all()
+
+
+def test_csv_portfolio_output_matches_parquet(maria, tmp_path):
+    locations_file = str(tmp_path / 'locations.parquet')
+    rng = np.random.default_rng(1)
+    pd.DataFrame({'lat': rng.uniform(17.0, 19.0, 5000), 'lon': rng.uniform(-68.0, -65.0, 5000)}).to_parquet(
+        locations_file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        portfolio.generate_portfolio_exposure(maria, locations_file, str(tmp_path / 'exposure.parquet'),
+                                              chunk_size=1000)
+        portfolio.generate_portfolio_exposure(maria, locations_file, str(tmp_path / 'exposure.csv'), chunk_size=1700)
+    parquet = pd.read_parquet(str(tmp_path / 'exposure.parquet'))
+    csv = pd.read_csv(str(tmp_path / 'exposure.csv'), parse_dates=['peak_time'])
+    pd.testing.assert_frame_equal(csv, parquet, check_dtype=False)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+
+# from local lib
+from src.raincoat_takehome_science.data.save_to_raster import COGSwathWriter, ZarrSwathWriter
+
+
+@pytest.mark.parametrize('writer_class, name', [(COGSwathWriter, 's.tif'), (ZarrSwathWriter, 's.zarr')])
+def test_export_creates_missing_directories(tmp_path, writer_class, name):
+    pytest.importorskip('rasterio' if writer_class is COGSwathWriter else 'zarr')
+    to_file = str(tmp_path / 'out' / 'dir' / name)
+    lat_axis, lon_axis = np.linspace(17.5, 18.5, 11), np.linspace(-67.5, -65.5, 21)
+    with contextlib.redirect_stdout(io.StringIO()):
+        with writer_class(to_file, lat_axis, lon_axis, 16) as writer:
+            writer.write_tile(slice(None), slice(None), np.ones((len(lon_axis), len(lat_axis))))
+    assert os.path.exists(to_file)
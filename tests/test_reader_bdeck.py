@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+
+import pandas as pd
+
+# from local lib
+from src.raincoat_takehome_science.data.cache import ProductCache
+from src.raincoat_takehome_science.data.reader_bdeck import generate_intermediate_data
+
+EXTERNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'external', 'bal152017.dat')
+
+
+def test_outdated_interim_file_is_regenerated(tmp_path):
+    interim_file = tmp_path / 'bal152017.dat'
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = generate_intermediate_data(EXTERNAL_FILE, str(tmp_path))
+    content = interim_file.read_text()
+
+    # Written by an older conversion, without the storm motion columns
+    interim_file.write_text(df.drop(columns=['DIR', 'SPEED']).to_csv(index=False))
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_intermediate_data(EXTERNAL_FILE, str(tmp_path))
+    assert interim_file.read_text() == content
+
+    modified = os.stat(str(interim_file)).st_mtime_ns
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        generate_intermediate_data(EXTERNAL_FILE, str(tmp_path))
+    assert os.stat(str(interim_file)).st_mtime_ns == modified
+    assert 'No need to save' in output.getvalue()
+
+
+def test_cache_hit_writes_the_interim_file(tmp_path):
+    cache = ProductCache(str(tmp_path / 'cache'))
+    for run in ['fresh', 'cached']:
+        (tmp_path / run).mkdir()
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = generate_intermediate_data(EXTERNAL_FILE, str(tmp_path / run), cache=cache)
+
+    assert cache.stats()['converted_track']['hits'] == 1
+    assert (tmp_path / 'cached' / 'bal152017.dat').read_text() == (tmp_path / 'fresh' / 'bal152017.dat').read_text()
+    pd.testing.assert_frame_equal(pd.read_csv(str(tmp_path / 'cached' / 'bal152017.dat'), parse_dates=['YYYYMMDDHH']),
+                                  df)
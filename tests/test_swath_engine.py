@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+import src.raincoat_takehome_science.data.wind_models as wind_models
+from src.raincoat_takehome_science.data.data_processor import generate_swath_data
+
+INTERIM_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'interim', 'bal152017.dat')
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+WIND_THRESHOLD = 17.49
+MODELS = [('jelesnianski', {}), ('holland1980', {'b': 1.8}), ('willoughby', {}), ('rankine', {})]
+
+
+@pytest.fixture(scope='module')
+def maria():
+    return pd.read_csv(INTERIM_FILE)
+
+
+def _swath(df, grid_resolution=0.01, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return generate_swath_data(df, PUERTO_RICO, grid_resolution, **kwargs)[0]
+
+
+def test_vectorized_engine_matches_geodesic_reference(maria):
+    reference = _swath(maria, 0.1, engine='geodesic')
+    swath = _swath(maria, 0.1)
+    assert (np.abs(swath - reference) <= swath_engine.SWATH_RELATIVE_TOLERANCE * reference).all()
+
+
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+@pytest.mark.parametrize('options', [{'tile_size': 37}, {'workers': 2}, {'workers': 2, 'tile_size': 37}])
+@pytest.mark.parametrize('wind_threshold', [None, WIND_THRESHOLD])
+def test_tiled_and_parallel_swaths_match_serial(maria, dtype, options, wind_threshold):
+    serial = _swath(maria, wind_threshold=wind_threshold, dtype=dtype)
+    swath = _swath(maria, wind_threshold=wind_threshold, dtype=dtype, **options)
+    assert swath.dtype == serial.dtype
+    np.testing.assert_array_equal(swath, serial)
+
+
+@pytest.mark.parametrize('wind_model, model_params', MODELS)
+def test_pruned_swath_matches_thresholded_swath(maria, wind_model, model_params):
+    swath = _swath(maria, wind_model=wind_model, model_params=model_params)
+    pruned = _swath(maria, wind_model=wind_model, model_params=model_params, wind_threshold=WIND_THRESHOLD)
+    swath[swath < WIND_THRESHOLD] = 0.0
+    np.testing.assert_array_equal(pruned, swath)
+
+
+@pytest.mark.parametrize('wind_model, model_params', MODELS)
+def test_wind_models_match_scalar_reference(wind_model, model_params):
+    reference = wind_models.get_wind_model(wind_model).reference
+    profile = wind_models.wind_profile(wind_model, **model_params)
+    r = np.concatenate([[0.0], np.geomspace(1.0, 2e6, 400)])
+    for rmax, vmax in [(1e4, 20.0), (3.7e4, 45.0), (9e4, 70.0)]:
+        expected = [reference(x, rmax, vmax, **model_params) for x in r]
+        np.testing.assert_allclose(profile(r, rmax, vmax), expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize('wind_model, model_params', MODELS)
+@pytest.mark.parametrize('wind_threshold', [None, WIND_THRESHOLD])
+@pytest.mark.parametrize('asymmetric', [False, True])
+def test_float32_swath_matches_float64(maria, wind_model, model_params, wind_threshold, asymmetric):
+    kwargs = dict(wind_model=wind_model, model_params=model_params, wind_threshold=wind_threshold,
+                  asymmetric=asymmetric)
+    swath = _swath(maria, **kwargs)
+    single = _swath(maria, dtype='float32', **kwargs)
+    assert single.dtype == np.float32
+    difference = np.abs(single.astype(float) - swath)
+    if wind_threshold is not None:
+        # Cells within the tolerance of the threshold may be cut by one precision only
+        near_threshold = np.abs(np.maximum(single, swath) - wind_threshold) <= swath_engine.FLOAT32_WIND_TOLERANCE
+        difference = difference[~near_threshold]
+    assert difference.max() <= swath_engine.FLOAT32_WIND_TOLERANCE
+
+
+def test_distance_matrix_matches_great_circle_distances():
+    distance = pytest.importorskip('geopy.distance')
+    lat_axis, lon_axis = np.linspace(17.5, 18.5, 7), np.linspace(-67.5, -65.5, 9)
+    lats, lons = np.array([12.4, 18.0, 25.3]), np.array([-53.1, -66.0, -71.8])
+    distances = swath_engine.haversine_distances(lat_axis, lon_axis, lats, lons)
+    assert distances.shape == (len(lats), len(lon_axis), len(lat_axis))
+
+    grid_lat, grid_lon = np.meshgrid(lat_axis, lon_axis)
+    for i in range(len(lats)):
+        expected = [distance.great_circle((lat, lon), (lats[i], lons[i]), radius=swath_engine.EARTH_RADIUS / 1e3).m
+                    for lat, lon in zip(grid_lat.ravel(), grid_lon.ravel())]
+        np.testing.assert_allclose(distances[i].ravel(), expected, rtol=1e-9, atol=1e-3)
+        np.testing.assert_allclose(distances[i], swath_engine.haversine_point_distances(grid_lat, grid_lon, lats[i],
+                                                                                        lons[i]), rtol=1e-9, atol=1e-3)
+
+
+@pytest.mark.parametrize('tile_size', [1, 7, (5, 64), 1000])
+def test_tiles_cover_the_grid_once(tile_size):
+    covered = np.zeros((23, 41), dtype=int)
+    for rows, cols in swath_engine.iter_tiles(covered.shape, tile_size):
+        covered[rows, cols] += 1
+    assert (covered == 1).all()
+
+
+def test_tiled_swath_bounds_memory_and_maps_to_file(maria, tmp_path):
+    out_file = str(tmp_path / 'swath.npy')
+    tracemalloc.start()
+    try:
+        swath = _swath(maria, 0.005)
+        untiled_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        tiled = _swath(maria, 0.005, tile_size=32, out_file=out_file)
+        tiled_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert isinstance(tiled, np.memmap)
+    np.testing.assert_array_equal(np.load(out_file), swath)
+    assert tiled_peak * 4 < untiled_peak
+
+
+@pytest.mark.parametrize('options', [{'out_file': 'swath.npy'}, {'tile_size': 1000}])
+def test_parallel_swath_output_matches_serial(maria, tmp_path, options):
+    if 'out_file' in options:
+        options = dict(options, out_file=str(tmp_path / options['out_file']))
+    serial = _swath(maria, wind_threshold=WIND_THRESHOLD)
+    shared = set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+    swath = _swath(maria, wind_threshold=WIND_THRESHOLD, workers=3, **options)
+    # The shared memory of the output is released
+    assert (set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()) == shared
+    if 'out_file' in options:
+        assert isinstance(swath, np.memmap)
+        np.testing.assert_array_equal(np.load(options['out_file']), serial)
+    np.testing.assert_array_equal(swath, serial)
+
+
+@pytest.mark.parametrize('wind_model, model_params', MODELS)
+def test_influence_radius_bounds_the_wind_above_threshold(wind_model, model_params):
+    rmax, vmax = np.array([1e4, 3.7e4, 9e4, 3e4]), np.array([20.0, 45.0, 70.0, 15.0])
+    radius = wind_models.influence_radius(wind_model, rmax, vmax, WIND_THRESHOLD, **model_params)
+    profile = wind_models.wind_profile(wind_model, **model_params)
+    assert radius[-1] == 0.0
+    for r, rm, vm in zip(radius[:-1], rmax[:-1], vmax[:-1]):
+        beyond = np.geomspace(r, 100 * r, 200)
+        assert (profile(beyond, rm, vm) <= WIND_THRESHOLD).all()
+        assert profile(np.array([0.99 * r]), rm, vm)[0] > WIND_THRESHOLD
+
+
+def test_registered_wind_model_is_selected_by_name(maria):
+    def doubled_profile(r, rmax, vmax):
+        return 2.0 * wind_models.wind_profile()(r, rmax, vmax)
+
+    wind_models.register_wind_model('doubled', doubled_profile)(doubled_profile)
+    try:
+        swath = _swath(maria, 0.1, wind_model='doubled')
+    finally:
+        del wind_models.WIND_MODELS['doubled']
+    np.testing.assert_allclose(swath, 2.0 * _swath(maria, 0.1), rtol=1e-12)
+    with pytest.raises(ValueError, match='Unknown wind model'):
+        _swath(maria, 0.1, wind_model='doubled')
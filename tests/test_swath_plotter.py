@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+# from local lib
+import src.raincoat_takehome_science.plotting.swath_plotter as swath_plotter
+import src.raincoat_takehome_science.data.swath_engine as swath_engine
+
+PUERTO_RICO = {'lat_max': 18.5, 'lat_min': 17.5, 'lon_max': -65.5, 'lon_min': -67.5}
+
+matplotlib = pytest.importorskip('matplotlib')
+pytest.importorskip('cartopy')
+
+
+def test_default_figure_draws_the_swath_as_an_image(tmp_path, monkeypatch):
+    matplotlib.use('Agg')
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+    from matplotlib.image import AxesImage
+
+    lat_axis, lon_axis = swath_engine.build_grid_axes(PUERTO_RICO, 0.01)
+    grid_lat, grid_lon = np.meshgrid(lat_axis, lon_axis)
+    swath = 60.0 * np.exp(-((grid_lat - 18.0) ** 2 + (grid_lon + 66.0) ** 2))
+    images = []
+
+    def contourf(self, *args, **kwargs):
+        raise AssertionError('The figure is drawn with filled contours')
+
+    def savefig(self, path, *args, **kwargs):
+        images.extend(child for ax in self.axes for child in ax.get_children() if isinstance(child, AxesImage))
+        return save(self, path, *args, **kwargs)
+
+    save = Figure.savefig
+    monkeypatch.setattr(Axes, 'contourf', contourf)
+    monkeypatch.setattr(Figure, 'savefig', savefig)
+    # The Natural Earth overlays need a download
+    monkeypatch.setattr(swath_plotter, 'natural_earth_geometries', lambda *args, **kwargs: ())
+    path = str(tmp_path / 'swath.png')
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert swath_plotter.save_swath_map(swath, grid_lon, grid_lat, [-68., -65., 17., 19.], path) == path
+
+    assert len(images) == 1
+    # Rows of the image run from south to north
+    np.testing.assert_array_equal(images[0].get_array(), swath.T)
+    left, right, bottom, top = images[0].get_extent()
+    assert left < lon_axis[0] < lon_axis[-1] < right and bottom < lat_axis[0] < lat_axis[-1] < top